@@ -32,16 +32,16 @@ class RelayProjectConfigsEndpoint(Endpoint):
         # In the first iteration we fetch all configs that we know about
         # but only the project settings
         if project_ids:
-            for project in Project.objects.filter(pk__in=project_ids):
-                # for internal relays return the full, rich, configuration,
-                # for external relays return the minimal config
-                proj_config = config.get_project_config(
-                    project.id, relay.is_internal and full_config_requested
-                )
-
-                projects[six.text_type(project.id)] = proj_config
-
-                orgs.add(project.organization_id)
+            # for internal relays return the full, rich, configuration,
+            # for external relays return the minimal config. The configs are
+            # fetched from the cache with a single lookup.
+            project_configs = config.get_project_configs(
+                list(Project.objects.filter(pk__in=project_ids)),
+                relay.is_internal and full_config_requested,
+            )
+            for project_id, proj_config in six.iteritems(project_configs):
+                projects[six.text_type(project_id)] = proj_config
+                orgs.add(proj_config.project.organization_id)
 
         # In the second iteration we check if the project has access to
         # the org at all.
@@ -7,6 +7,7 @@ from datetime import datetime
 
 import six
 from django.utils.functional import cached_property
+from functools32 import lru_cache
 from parsimonious.expressions import Optional
 from parsimonious.exceptions import IncompleteParseError, ParseError
 from parsimonious.nodes import Node
@@ -25,6 +26,10 @@ from sentry.utils.snuba import Dataset, DATASETS, get_snuba_column_name
 
 WILDCARD_CHARS = re.compile(r"[\*]")
 
+# Number of parsed queries kept per process. Queries repeat a lot, since most
+# of them come from saved searches, dashboards and alert rules.
+PARSE_CACHE_SIZE = 1000
+
 
 def translate(pat):
     """Translate a shell PATTERN to a regular expression.
@@ -139,6 +144,17 @@ spaces               = ~r"\ *"
 )
 
 
+# Queries which only consist of tokens matching these expressions can be parsed
+# without the grammar (see ``SearchVisitor.parse_simple_query``.)
+SIMPLE_QUERY_RE = re.compile(r"(?:[^\s\"()^]+(?: [^\s\"()^]+)*)?\Z")
+SIMPLE_FILTER_RE = re.compile(r"(!?)([a-zA-Z0-9_\.-]+):(.*)")
+SIMPLE_WORD_RE = re.compile(r"[^:<>=!]+\Z")
+# Values of filters that may be parsed as a date or numeric filter.
+AMBIGUOUS_VALUE_RE = re.compile(r"[<>=!+-]|[0-9]+\Z|\d{4}-\d{2}-\d{2}")
+# Relative dates are resolved at parse time, so the results of queries which
+# may contain them can't be cached.
+REL_DATE_RE = re.compile(r"[\+\-][0-9]+[wdhm]")
+
 # Create the known set of fields from the issue properties
 # and the transactions and events dataset mapping definitions.
 SEARCH_MAP = {
@@ -292,6 +308,50 @@ class SearchVisitor(NodeVisitor):
 
         return filter(is_not_space, children)
 
+    def parse_simple_query(self, query):
+        """
+        Parses queries that consist of nothing but ``key:value`` filters and
+        free text separated by single spaces, which is what the vast majority
+        of queries look like, without running the grammar. Returns ``None``
+        for any query that might be parsed differently by the grammar.
+        """
+        if not SIMPLE_QUERY_RE.match(query):
+            return None
+
+        filters = []
+        words = []
+        for token in query.split(" ") if query else ():
+            if token.startswith((SearchBoolean.BOOLEAN_OR, SearchBoolean.BOOLEAN_AND)):
+                return None
+
+            if ":" not in token:
+                if not SIMPLE_WORD_RE.match(token):
+                    return None
+                words.append(token)
+                continue
+
+            match = SIMPLE_FILTER_RE.match(token)
+            if match is None:
+                return None
+            negation, key, value = match.groups()
+            if key in ("has", "is") or AMBIGUOUS_VALUE_RE.match(value):
+                return None
+
+            if words:
+                filters.append(
+                    SearchFilter(SearchKey("message"), "=", SearchValue(" ".join(words)))
+                )
+                words = []
+            search_key = SearchKey(self.key_mappings_lookup.get(key, key))
+            filters.append(
+                self._handle_basic_filter(search_key, "!=" if negation else "=", SearchValue(value))
+            )
+
+        if words:
+            filters.append(SearchFilter(SearchKey("message"), "=", SearchValue(" ".join(words))))
+
+        return filters
+
     def visit_search(self, node, children):
         return self.flatten(children)
 
@@ -504,6 +564,33 @@ class SearchVisitor(NodeVisitor):
 
 
 def parse_search_query(query):
+    return parse_query_with_visitor(query, SearchVisitor)
+
+
+def parse_query_with_visitor(query, visitor_cls):
+    """
+    Parses a search query into a list of ``SearchFilter`` (and
+    ``SearchBoolean``) terms using the given ``SearchVisitor`` class.
+
+    Results are cached per process, unless the query may contain relative
+    dates.
+    """
+    if REL_DATE_RE.search(query):
+        return _parse_query(query, visitor_cls)
+    return list(_parse_query_cached(query, visitor_cls))
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_query_cached(query, visitor_cls):
+    return tuple(_parse_query(query, visitor_cls))
+
+
+def _parse_query(query, visitor_cls):
+    visitor = visitor_cls()
+    result = visitor.parse_simple_query(query)
+    if result is not None:
+        return result
+
     try:
         tree = event_search_grammar.parse(query)
     except IncompleteParseError as e:
@@ -514,7 +601,7 @@ def parse_search_query(query):
                 "This is commonly caused by unmatched-parentheses. Enclose any text in double quotes.",
             )
         )
-    return SearchVisitor().visit(tree)
+    return visitor.visit(tree)
 
 
 def convert_search_boolean_to_snuba_query(search_boolean):
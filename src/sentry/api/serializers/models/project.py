@@ -163,13 +163,17 @@ class ProjectSerializer(Serializer):
         from sentry.features.base import ProjectFeature
 
         # Retrieve all registered organization features
-        project_features = features.all(feature_type=ProjectFeature).keys()
+        project_features = [
+            feature_name
+            for feature_name in features.all(feature_type=ProjectFeature).keys()
+            if feature_name.startswith("projects:")
+        ]
         feature_list = set()
 
-        for feature_name in project_features:
-            if not feature_name.startswith("projects:"):
-                continue
-            if features.has(feature_name, obj, actor=user):
+        for feature_name, enabled in six.iteritems(
+            features.has_many(project_features, obj, actor=user)
+        ):
+            if enabled:
                 # Remove the project scope prefix
                 feature_list.add(feature_name[len("projects:") :])
 
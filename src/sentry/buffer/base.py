@@ -32,7 +32,7 @@ class Buffer(Service):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "incr_multi", "process", "process_pending", "validate")
 
     def incr(self, model, columns, filters, extra=None):
         """
@@ -42,6 +42,13 @@ class Buffer(Service):
             kwargs={"model": model, "columns": columns, "filters": filters, "extra": extra}
         )
 
+    def incr_multi(self, items):
+        """
+        >>> incr_multi([(Group, {'times_seen': 1}, {'pk': group.pk}, None)])
+        """
+        for model, columns, filters, extra in items:
+            self.incr(model, columns, filters, extra)
+
     def process_pending(self, partition=None):
         return []
 
@@ -114,19 +114,39 @@ class RedisBuffer(Buffer):
         return result
 
     def _dump_value(self, value):
-        if isinstance(value, six.string_types):
+        if isinstance(value, six.binary_type):
+            type_ = "s"
+            value = value.decode("utf-8")
+        elif isinstance(value, six.text_type):
             type_ = "s"
         elif isinstance(value, datetime):
             type_ = "d"
             value = value.strftime("%s.%f")
-        elif isinstance(value, int):
+        elif isinstance(value, bool):
+            raise TypeError(type(value))
+        elif isinstance(value, six.integer_types):
             type_ = "i"
         elif isinstance(value, float):
             type_ = "f"
+            value = repr(value)
         else:
             raise TypeError(type(value))
         return (type_, six.text_type(value))
 
+    def _encode_values(self, values):
+        try:
+            return json.dumps(self._dump_values(values))
+        except (TypeError, ValueError):
+            return pickle.dumps(values)
+
+    def _encode_value(self, value):
+        # Values that can't be represented in JSON (such as query
+        # expressions) are still pickled.
+        try:
+            return json.dumps(self._dump_value(value))
+        except (TypeError, ValueError):
+            return pickle.dumps(value)
+
     def _load_values(self, payload):
         result = {}
         for k, (t, v) in six.iteritems(payload):
@@ -155,41 +175,50 @@ class RedisBuffer(Buffer):
             - Perform a set (last write wins) on extra
         - Add hashmap key to pending flushes
         """
-        # TODO(dcramer): longer term we'd rather not have to serialize values
-        # here (unless it's to JSON)
-        key = self._make_key(model, filters)
-        pending_key = self._make_pending_key_from_key(key)
-        # We can't use conn.map() due to wanting to support multiple pending
-        # keys (one per Redis partition)
-        conn = self.cluster.get_local_client_for_key(key)
-
-        pipe = conn.pipeline()
-        pipe.hsetnx(key, "m", "%s.%s" % (model.__module__, model.__name__))
-        # TODO(dcramer): once this goes live in production, we can kill the pickle path
-        # (this is to ensure a zero downtime deploy where we can transition event processing)
-        pipe.hsetnx(key, "f", pickle.dumps(filters))
-        # pipe.hsetnx(key, 'f', json.dumps(self._dump_values(filters)))
-        for column, amount in six.iteritems(columns):
-            pipe.hincrby(key, "i+" + column, amount)
-
-        if extra:
-            # Group tries to serialize 'score', so we'd need some kind of processing
-            # hook here
-            # e.g. "update score if last_seen or times_seen is changed"
-            for column, value in six.iteritems(extra):
-                # TODO(dcramer): once this goes live in production, we can kill the pickle path
-                # (this is to ensure a zero downtime deploy where we can transition event processing)
-                pipe.hset(key, "e+" + column, pickle.dumps(value))
-                # pipe.hset(key, 'e+' + column, json.dumps(self._dump_value(value)))
-        pipe.expire(key, self.key_expire)
-        pipe.zadd(pending_key, time(), key)
-        pipe.execute()
-
-        metrics.incr(
-            "buffer.incr",
-            skip_internal=True,
-            tags={"module": model.__module__, "model": model.__name__},
-        )
+        self.incr_multi([(model, columns, filters, extra)])
+
+    def incr_multi(self, items):
+        """
+        Performs the increments for a sequence of ``(model, columns,
+        filters, extra)`` tuples (see ``incr``) with a single pipeline for
+        each Redis host that they are routed to.
+        """
+        router = self.cluster.get_router()
+        pipes = {}
+
+        for model, columns, filters, extra in items:
+            key = self._make_key(model, filters)
+            pending_key = self._make_pending_key_from_key(key)
+            # We can't use conn.map() due to wanting to support multiple
+            # pending keys (one per Redis partition)
+            host_id = router.get_host_for_key(key)
+            pipe = pipes.get(host_id)
+            if pipe is None:
+                pipe = pipes[host_id] = self.cluster.get_local_client(host_id).pipeline()
+
+            pipe.hsetnx(key, "m", "%s.%s" % (model.__module__, model.__name__))
+            pipe.hsetnx(key, "f", self._encode_values(filters))
+            for column, amount in six.iteritems(columns):
+                pipe.hincrby(key, "i+" + column, amount)
+
+            if extra:
+                # Group tries to serialize 'score', so we'd need some kind of processing
+                # hook here
+                # e.g. "update score if last_seen or times_seen is changed"
+                for column, value in six.iteritems(extra):
+                    pipe.hset(key, "e+" + column, self._encode_value(value))
+            pipe.expire(key, self.key_expire)
+            pipe.zadd(pending_key, time(), key)
+
+        for pipe in six.itervalues(pipes):
+            pipe.execute()
+
+        for model, _, _, _ in items:
+            metrics.incr(
+                "buffer.incr",
+                skip_internal=True,
+                tags={"module": model.__module__, "model": model.__name__},
+            )
 
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
@@ -212,13 +241,17 @@ class RedisBuffer(Buffer):
 
         try:
             keycount = 0
+            oldest = None
             with self.cluster.all() as conn:
-                results = conn.zrange(pending_key, 0, -1)
+                results = conn.zrange(pending_key, 0, -1, withscores=True)
 
             with self.cluster.all() as conn:
-                for host_id, keys in six.iteritems(results.value):
-                    if not keys:
+                for host_id, items in six.iteritems(results.value):
+                    if not items:
                         continue
+                    keys = [key for key, _ in items]
+                    # Keys are ordered by the time they were last updated.
+                    oldest = items[0][1] if oldest is None else min(oldest, items[0][1])
                     keycount += len(keys)
                     for key in keys:
                         pending_buffer.append(key)
@@ -231,6 +264,10 @@ class RedisBuffer(Buffer):
                 process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
 
             metrics.timing("buffer.pending-size", keycount)
+            if oldest is not None:
+                # The time since the least recently updated key was last
+                # written to, as a lower bound for how far flushing lags behind.
+                metrics.timing("buffer.pending-lag", time() - oldest)
         finally:
             client.delete(lock_key)
 
@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import six
+
 from django.conf import settings
 
 from threading import local
@@ -19,6 +21,10 @@ class BaseCache(local):
     def set(self, key, value, timeout, version=None, raw=False):
         raise NotImplementedError
 
+    def set_many(self, values, timeout, version=None, raw=False):
+        for key, value in six.iteritems(values):
+            self.set(key, value, timeout, version=version, raw=raw)
+
     def delete(self, key, version=None):
         raise NotImplementedError
 
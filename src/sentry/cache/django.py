@@ -9,6 +9,9 @@ class DjangoCache(BaseCache):
     def set(self, key, value, timeout, version=None, raw=False):
         cache.set(key, value, timeout, version=version or self.version)
 
+    def set_many(self, values, timeout, version=None, raw=False):
+        cache.set_many(values, timeout, version=version or self.version)
+
     def delete(self, key, version=None):
         cache.delete(key, version=version or self.version)
 
@@ -1,5 +1,9 @@
 from __future__ import absolute_import
 
+import six
+
+from contextlib import contextmanager
+
 from sentry.utils import json
 from sentry.utils.redis import get_cluster_from_options, redis_clusters
 
@@ -18,15 +22,31 @@ class CommonRedisCache(BaseCache):
         self.client = client
         BaseCache.__init__(self, **options)
 
-    def set(self, key, value, timeout, version=None, raw=False):
+    @contextmanager
+    def batch_client(self):
+        """
+        Yields a client that buffers commands where the backend allows it.
+        All commands are sent once the context manager exits.
+        """
+        yield self.client
+
+    def _set(self, client, key, value, timeout, version=None, raw=False):
         key = self.make_key(key, version=version)
         v = json.dumps(value) if not raw else value
         if len(v) > self.max_size:
             raise ValueTooLarge("Cache key too large: %r %r" % (key, len(v)))
         if timeout:
-            self.client.setex(key, int(timeout), v)
+            client.setex(key, int(timeout), v)
         else:
-            self.client.set(key, v)
+            client.set(key, v)
+
+    def set(self, key, value, timeout, version=None, raw=False):
+        self._set(self.client, key, value, timeout, version=version, raw=raw)
+
+    def set_many(self, values, timeout, version=None, raw=False):
+        with self.batch_client() as client:
+            for key, value in six.iteritems(values):
+                self._set(client, key, value, timeout, version=version, raw=raw)
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
@@ -46,6 +66,9 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def batch_client(self):
+        return self.client.map()
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
@@ -55,3 +78,9 @@ class RedisClusterCache(CommonRedisCache):
     def __init__(self, cluster_id, **options):
         client = redis_clusters.get(cluster_id)
         CommonRedisCache.__init__(self, client=client, **options)
+
+    @contextmanager
+    def batch_client(self):
+        pipeline = self.client.pipeline(transaction=False)
+        yield pipeline
+        pipeline.execute()
@@ -543,6 +543,7 @@ CELERY_IMPORTS = (
     "sentry.tasks.ping",
     "sentry.tasks.post_process",
     "sentry.tasks.process_buffer",
+    "sentry.tasks.relay",
     "sentry.tasks.reports",
     "sentry.tasks.reprocessing",
     "sentry.tasks.scheduler",
@@ -581,6 +582,7 @@ CELERY_QUEUES = [
     Queue("integrations", routing_key="integrations"),
     Queue("merge", routing_key="merge"),
     Queue("options", routing_key="options"),
+    Queue("relay_config", routing_key="relay_config"),
     Queue("reports.deliver", routing_key="reports.deliver"),
     Queue("reports.prepare", routing_key="reports.prepare"),
     Queue("search", routing_key="search"),
@@ -682,6 +684,12 @@ CELERYBEAT_SCHEDULE = {
         ),
         "options": {"expires": 60 * 60 * 3},
     },
+    "schedule-daily-organization-report-statistics": {
+        "task": "sentry.tasks.reports.prepare_statistics",
+        # After sentry.tasks.reports.STATISTICS_DELAY has passed.
+        "schedule": crontab(minute=0, hour=4),
+        "options": {"expires": 60 * 60 * 3},
+    },
     "schedule-vsts-integration-subscription-check": {
         "task": "sentry.tasks.integrations.kickoff_vsts_subscription_check",
         "schedule": timedelta(hours=6),
@@ -1032,6 +1040,12 @@ CACHE_VERSION = 1
 SENTRY_DIGESTS = "sentry.digests.backends.dummy.DummyBackend"
 SENTRY_DIGESTS_OPTIONS = {}
 
+# Similarity index signatures. The default signatures match the ones in the
+# existing index. Signatures built with a single hash per feature (which are
+# only faster with NumPy installed) are written to a separate index when this
+# is disabled, starting out empty.
+SENTRY_SIMILARITY_COMPATIBLE_SIGNATURES = True
+
 # Quota backend
 SENTRY_QUOTAS = "sentry.quotas.Quota"
 SENTRY_QUOTA_OPTIONS = {}
@@ -1046,6 +1060,14 @@ SENTRY_DEFAULT_MAX_EVENTS_PER_MINUTE = "90%"
 # Snuba configuration
 SENTRY_SNUBA = os.environ.get("SNUBA", "http://localhost:1218")
 
+# Cache the results of identical snuba queries for a short amount of time and
+# share identical queries that are in flight within the same process
+SENTRY_SNUBA_CACHE_ENABLED = False
+
+# How long (in seconds) snuba query results are cached, depending on how long
+# ago the end of the queried time window is, as (max age, ttl) pairs
+SENTRY_SNUBA_CACHE_TTLS = ((60, 5), (60 * 60, 30), (24 * 60 * 60, 120), (None, 300))
+
 # Node storage backend
 SENTRY_NODESTORE = "sentry.nodestore.django.DjangoNodeStorage"
 SENTRY_NODESTORE_OPTIONS = {}
@@ -1127,6 +1149,20 @@ SENTRY_SOURCE_FETCH_SOCKET_TIMEOUT = 2
 # Maximum content length for source files before we abort fetching
 SENTRY_SOURCE_FETCH_MAX_SIZE = 40 * 1024 * 1024
 
+# Number of threads used to fetch remote source files concurrently
+SENTRY_SOURCE_FETCH_CONCURRENCY = 10
+
+# Maximum number of concurrent requests to a single host when fetching the
+# remote source files of an event
+SENTRY_SOURCE_FETCH_HOST_CONCURRENCY = 4
+
+# Total time (in seconds) spent on fetching the remote source files of an event
+SENTRY_SOURCE_FETCH_DEADLINE = 30
+
+# Maximum total size (in bytes of the raw files) of parsed sources and
+# sourcemaps kept in memory by each worker process
+SENTRY_JS_PARSED_SOURCE_CACHE_SIZE = 100 * 1024 * 1024
+
 # Fields which managed users cannot change via Sentry UI. Username and password
 # cannot be changed by managed users. Optionally include 'email' and
 # 'name' in SENTRY_MANAGED_USER_FIELDS.
@@ -12,8 +12,6 @@ import zlib
 
 from django.core.exceptions import SuspiciousOperation
 from django.utils.crypto import constant_time_compare
-from gzip import GzipFile
-from six import BytesIO
 from time import time
 
 from sentry.attachments import attachment_cache
@@ -23,7 +21,6 @@ from sentry.tasks.store import preprocess_event, preprocess_event_from_reprocess
 from sentry.utils import json
 from sentry.utils.auth import parse_auth_header
 from sentry.utils.http import origin_from_request
-from sentry.utils.strings import decompress
 from sentry.utils.sdk import configure_scope
 from sentry.utils.canonical import CANONICAL_TYPES
 
@@ -56,6 +53,10 @@ class APIForbidden(APIError):
     http_status = 403
 
 
+class APIPayloadTooLarge(APIForbidden):
+    msg = "Event size exceeded the maximum size after decompression"
+
+
 class APIRateLimited(APIError):
     http_status = 429
     msg = "Creation of this event was denied due to rate limiting"
@@ -257,9 +258,48 @@ def cache_key_for_event(data):
     return u"e:{1}:{0}".format(data["project"], data["event_id"])
 
 
-def decompress_deflate(encoded_data):
+def _decompress(encoded_data, wbits=zlib.MAX_WBITS, max_size=None):
+    """
+    Decompresses zlib, deflate or (with ``wbits=16 + zlib.MAX_WBITS``) gzip
+    data. The payload is inflated incrementally, so that decompression stops
+    with ``APIPayloadTooLarge`` as soon as it would exceed ``max_size`` bytes.
+    """
+    chunks = []
+    size = 0
+    while True:
+        decompressor = zlib.decompressobj(wbits)
+        # A ``max_length`` of 0 means that the output is unbounded.
+        max_length = max_size - size + 1 if max_size is not None else 0
+        chunk = decompressor.decompress(encoded_data, max_length)
+        if decompressor.unconsumed_tail:
+            raise APIPayloadTooLarge()
+        # Input after the end of the stream is moved to ``unused_data``, so a
+        # trailing byte tells complete streams apart from truncated ones.
+        if not decompressor.unused_data:
+            chunk += decompressor.decompress(b"\x00")
+            if not decompressor.unused_data:
+                raise zlib.error(
+                    "Error -5 while decompressing data: incomplete or truncated stream"
+                )
+        size += len(chunk)
+        if max_size is not None and size > max_size:
+            raise APIPayloadTooLarge()
+        chunks.append(chunk)
+
+        # Like ``GzipFile``, read concatenated gzip members and ignore
+        # trailing zero padding.
+        encoded_data = decompressor.unused_data
+        if wbits <= zlib.MAX_WBITS or not encoded_data.strip(b"\x00"):
+            break
+
+    return b"".join(chunks)
+
+
+def decompress_deflate(encoded_data, max_size=None):
     try:
-        return zlib.decompress(encoded_data).decode("utf-8")
+        return _decompress(encoded_data, max_size=max_size).decode("utf-8")
+    except APIError:
+        raise
     except Exception as e:
         # This error should be caught as it suggests that there's a
         # bug somewhere in the client's code.
@@ -267,14 +307,11 @@ def decompress_deflate(encoded_data):
         raise APIError("Bad data decoding request (%s, %s)" % (type(e).__name__, e))
 
 
-def decompress_gzip(encoded_data):
+def decompress_gzip(encoded_data, max_size=None):
     try:
-        fp = BytesIO(encoded_data)
-        try:
-            f = GzipFile(fileobj=fp)
-            return f.read().decode("utf-8")
-        finally:
-            f.close()
+        return _decompress(encoded_data, 16 + zlib.MAX_WBITS, max_size).decode("utf-8")
+    except APIError:
+        raise
     except Exception as e:
         # This error should be caught as it suggests that there's a
         # bug somewhere in the client's code.
@@ -282,12 +319,15 @@ def decompress_gzip(encoded_data):
         raise APIError("Bad data decoding request (%s, %s)" % (type(e).__name__, e))
 
 
-def decode_and_decompress_data(encoded_data):
+def decode_and_decompress_data(encoded_data, max_size=None):
     try:
+        encoded_data = base64.b64decode(encoded_data)
         try:
-            return decompress(encoded_data).decode("utf-8")
+            return _decompress(encoded_data, max_size=max_size).decode("utf-8")
         except zlib.error:
-            return base64.b64decode(encoded_data).decode("utf-8")
+            return encoded_data.decode("utf-8")
+    except APIError:
+        raise
     except Exception as e:
         # This error should be caught as it suggests that there's a
         # bug somewhere in the client's code.
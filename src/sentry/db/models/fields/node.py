@@ -19,7 +19,7 @@ from sentry.utils.canonical import CANONICAL_TYPES, CanonicalKeyDict
 
 from .gzippeddict import GzippedDictField
 
-__all__ = ("NodeField", "NodeData")
+__all__ = ("NodeField", "NodeData", "NodeBatch")
 
 logger = logging.getLogger("sentry")
 
@@ -38,6 +38,10 @@ class NodeData(collections.MutableMapping):
         data={...} means, this is an object that should be saved to nodestore.
     """
 
+    # The ``NodeBatch`` this node will be loaded with, if its loading has been
+    # deferred.
+    batch = None
+
     def __init__(self, field, id, data=None, wrapper=None):
         self.field = field
         self.id = id
@@ -58,6 +62,7 @@ class NodeData(collections.MutableMapping):
         # collection types.  For isntance we have events where this is a
         # CanonicalKeyDict
         data.pop("data", None)
+        data.pop("batch", None)
         data["_node_data_CANONICAL"] = isinstance(data["_node_data"], CANONICAL_TYPES)
         data["_node_data"] = dict(data["_node_data"].items())
         return data
@@ -108,6 +113,10 @@ class NodeData(collections.MutableMapping):
         if self._node_data is not None:
             return self._node_data
 
+        elif self.id and self.batch is not None:
+            self.batch.load()
+            return self._node_data
+
         elif self.id:
             warnings.warn("You should populate node data before accessing it.")
             self.bind_data(nodestore.get(self.id) or {})
@@ -159,6 +168,39 @@ class NodeData(collections.MutableMapping):
         nodestore.set(self.id, to_write)
 
 
+class NodeBatch(object):
+    """
+    Defers loading of a set of nodes until the data of any one of them is
+    accessed, at which point all of the pending nodes are fetched with a
+    single ``nodestore.get_multi`` call.
+
+    >>> batch = NodeBatch()
+    >>> for event in events:
+    >>>     batch.add(event, event.data)
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def add(self, instance, node):
+        if node.id and node._node_data is None:
+            node.batch = self
+            self.pending.append((instance, node))
+
+    def load(self):
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+
+        node_results = nodestore.get_multi(list(set(node.id for _, node in pending)))
+
+        for instance, node in pending:
+            node.batch = None
+            if node._node_data is None:
+                data = node_results.get(node.id) or {}
+                node.bind_data(data, ref=node.get_ref(instance))
+
+
 class NodeField(GzippedDictField):
     """
     Similar to the gzippedictfield except that it stores a reference
@@ -5,6 +5,7 @@ import six
 import threading
 import weakref
 
+from collections import OrderedDict
 from contextlib import contextmanager
 
 from django.conf import settings
@@ -318,6 +319,121 @@ class BaseManager(Manager):
         else:
             return self.get(**kwargs)
 
+    def get_many_from_cache(self, field, values):
+        """
+        Wrapper around ``QuerySet.filter(field__in=values)`` which supports
+        caching of the intermediate values, like ``get_from_cache``.
+
+        Each value is looked up in the local cache, then all remaining values
+        with a single fetch from the shared cache, and finally all values
+        that are still missing with a single query. Both caches are populated
+        with the results. Returns a list of the instances that were found, in
+        the order of ``values``.
+        """
+        pk_name = self.model._meta.pk.name
+        if field == "pk":
+            field = pk_name
+
+        # Kill __exact since it's the default behavior
+        if field.endswith("__exact"):
+            field = field.split("__exact", 1)[0]
+
+        # We store everything by key references (vs instances)
+        values = [value.pk if isinstance(value, Model) else value for value in values]
+
+        if not self.cache_fields or (field not in self.cache_fields and field != pk_name):
+            results = {
+                six.text_type(self.__value_for_field(instance, field)): instance
+                for instance in self.filter(**{field + "__in": values})
+            }
+            values = OrderedDict.fromkeys(six.text_type(value) for value in values)
+            return [results[value] for value in values if value in results]
+
+        cache_keys = OrderedDict(
+            (self.__get_lookup_cache_key(**{field: value}), value) for value in values
+        )
+        results = {}
+
+        local_cache = self._get_local_cache()
+        if local_cache is not None:
+            for k in cache_keys:
+                result = local_cache.get(k)
+                if result is not None:
+                    results[k] = result
+
+        missing = [k for k in cache_keys if k not in results]
+        if missing:
+            cached = cache.get_many(missing, version=self.cache_version)
+            if field != pk_name:
+                # Lookups by any other field store references to the primary
+                # key, so we need to resolve the referenced instances.
+                instances = {
+                    instance.pk: instance
+                    for instance in self.get_many_from_cache(pk_name, set(cached.values()))
+                }
+                for cache_key, pk in six.iteritems(cached):
+                    if pk in instances:
+                        results[cache_key] = instances[pk]
+            else:
+                db = router.db_for_read(self.model)
+                for cache_key, retval in six.iteritems(cached):
+                    if not isinstance(retval, self.model) or six.text_type(
+                        retval.pk
+                    ) != six.text_type(cache_keys[cache_key]):
+                        if settings.DEBUG:
+                            raise ValueError("Unexpected value returned from cache")
+                        logger.error("Cache response returned invalid value %r", retval)
+                        continue
+                    retval._state.db = db
+                    results[cache_key] = retval
+
+            missing = [k for k in missing if k not in results]
+
+        if missing:
+            instances = list(self.filter(**{field + "__in": [cache_keys[k] for k in missing]}))
+            self.__cache_many(instances)
+            for instance in instances:
+                cache_key = self.__get_lookup_cache_key(
+                    **{field: self.__value_for_field(instance, field)}
+                )
+                results[cache_key] = instance
+
+        if local_cache is not None:
+            local_cache.update(results)
+
+        return [results[k] for k in cache_keys if k in results]
+
+    def __cache_many(self, instances):
+        """
+        Pushes a list of instances into the cache (in the same way as
+        ``__post_save``) with a single write.
+        """
+        pk_name = self.model._meta.pk.name
+        values = {}
+        for instance in instances:
+            for key in self.cache_fields:
+                if key in ("pk", pk_name):
+                    continue
+                # store pointers
+                value = self.__value_for_field(instance, key)
+                values[self.__get_lookup_cache_key(**{key: value})] = instance.pk
+
+            values[self.__get_lookup_cache_key(**{pk_name: instance.pk})] = instance
+
+        if not values:
+            return
+
+        # Ensure we don't serialize the database into the cache
+        dbs = [(instance, instance._state.db) for instance in instances]
+        for instance in instances:
+            instance._state.db = None
+        try:
+            cache.set_many(values, timeout=self.cache_ttl, version=self.cache_version)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+        for instance, db in dbs:
+            instance._state.db = db
+
     def create_or_update(self, **kwargs):
         return create_or_update(self.model, **kwargs)
 
@@ -2,6 +2,7 @@ from __future__ import absolute_import, print_function
 
 import logging
 import re
+import time
 
 from sentry.constants import ObjectStatus
 from sentry.utils.query import bulk_delete_objects
@@ -33,14 +34,24 @@ class BaseDeletionTask(object):
 
     DEFAULT_CHUNK_SIZE = 100
 
+    # Bounds for chunk sizes adapted to ``target_latency``.
+    ADAPTIVE_CHUNK_SIZES = (1, 1000)
+
     def __init__(
-        self, manager, skip_models=None, transaction_id=None, actor_id=None, chunk_size=None
+        self,
+        manager,
+        skip_models=None,
+        transaction_id=None,
+        actor_id=None,
+        chunk_size=None,
+        target_latency=None,
     ):
         self.manager = manager
         self.skip_models = set(skip_models) if skip_models else None
         self.transaction_id = transaction_id
         self.actor_id = actor_id
         self.chunk_size = chunk_size if chunk_size is not None else self.DEFAULT_CHUNK_SIZE
+        self.target_latency = target_latency
 
     def __repr__(self):
         return "<%s: skip_models=%s transaction_id=%s actor_id=%s>" % (
@@ -57,6 +68,24 @@ class BaseDeletionTask(object):
         """
         raise NotImplementedError
 
+    def adapt_chunk_size(self, size, duration):
+        """
+        Returns the size of the next chunk, given that deleting a chunk of
+        ``size`` rows took ``duration`` seconds. If a ``target_latency`` is
+        set, the size is scaled towards taking that long (by at most a
+        factor of two at a time, within ``ADAPTIVE_CHUNK_SIZES``.)
+        """
+        if not self.target_latency:
+            return size
+
+        min_size, max_size = self.ADAPTIVE_CHUNK_SIZES
+        if duration > 0:
+            target = int(size * self.target_latency / duration)
+        else:
+            target = size * 2
+        target = max(size // 2, min(size * 2, target))
+        return max(min_size, min(max_size, target))
+
     def get_child_relations(self, instance):
         # TODO(dcramer): it'd be nice if we collected the default relationships
         return [
@@ -82,6 +111,19 @@ class BaseDeletionTask(object):
             filter(lambda rel: rel.params.get("model") not in self.skip_models, child_relations)
         )
 
+    def get_relations(self, instance):
+        """
+        Returns all relations of a single instance, in the order they are
+        deleted by ``delete_bulk``.
+        """
+        child_relations = self.get_child_relations_bulk([instance])
+        child_relations = self.extend_relations_bulk(child_relations, [instance])
+        relations = self.filter_relations(child_relations) or []
+
+        child_relations = self.get_child_relations(instance)
+        child_relations = self.extend_relations(child_relations, instance)
+        return relations + (self.filter_relations(child_relations) or [])
+
     def delete_bulk(self, instance_list):
         """
         Delete a batch of objects bound to this task.
@@ -145,6 +187,7 @@ class ModelDeletionTask(BaseDeletionTask):
         self.query = query
         self.query_limit = query_limit or self.DEFAULT_QUERY_LIMIT or self.chunk_size
         self.order_by = order_by
+        self.rows_deleted = 0
 
     def __repr__(self):
         return "<%s: model=%s query=%s order_by=%s transaction_id=%s actor_id=%s>" % (
@@ -173,9 +216,9 @@ class ModelDeletionTask(BaseDeletionTask):
         Deletes a chunk of this instance's data. Return ``True`` if there is
         more work, or ``False`` if the entity has been removed.
         """
-        query_limit = self.query_limit
         remaining = self.chunk_size
         while remaining > 0:
+            query_limit = self.query_limit
             queryset = getattr(self.model, self.manager_name).filter(**self.query)
             if self.order_by:
                 queryset = queryset.order_by(self.order_by)
@@ -195,7 +238,10 @@ class ModelDeletionTask(BaseDeletionTask):
             if not queryset:
                 return False
 
-            self.delete_bulk(queryset)
+            start = time.time()
+            if not self.delete_bulk(queryset):
+                self.rows_deleted += len(queryset)
+            self.query_limit = self.adapt_chunk_size(query_limit, time.time() - start)
             remaining -= query_limit
         return True
 
@@ -248,6 +294,7 @@ class BulkModelDeletionTask(ModelDeletionTask):
     """
 
     DEFAULT_CHUNK_SIZE = 10000
+    ADAPTIVE_CHUNK_SIZES = (1000, 100000)
 
     def __init__(self, manager, model, query, partition_key=None, **kwargs):
         super(BulkModelDeletionTask, self).__init__(manager, model, query, **kwargs)
@@ -258,6 +305,7 @@ class BulkModelDeletionTask(ModelDeletionTask):
         return self.delete_instance_bulk()
 
     def delete_instance_bulk(self):
+        start = time.time()
         try:
             return bulk_delete_objects(
                 model=self.model,
@@ -267,6 +315,7 @@ class BulkModelDeletionTask(ModelDeletionTask):
                 **self.query
             )
         finally:
+            self.chunk_size = self.adapt_chunk_size(self.chunk_size, time.time() - start)
             # Don't log Group and Event child object deletions.
             model_name = self.model.__name__
             if not _leaf_re.search(model_name):
@@ -0,0 +1,161 @@
+from __future__ import absolute_import
+
+import time
+
+from sentry.utils import json, redis
+
+
+class DeletionProgress(object):
+    """
+    Tracks the progress of a sharded deletion (see
+    ``sentry.tasks.deletion.run_deletion``) in a Redis hash, so that shard
+    workers can report the rows they deleted concurrently.
+
+    The relations of the deleted object are deleted one after another (in
+    the order of the deletion task's child relations), each one by one or
+    more shards. Progress is kept for a while after the deletion finished.
+    """
+
+    ttl = 60 * 60 * 24 * 7
+
+    def __init__(self, guid, cluster=None):
+        self.key = u"deletion-progress:{}".format(guid)
+        self.cluster = cluster if cluster is not None else redis.clusters.get("default")
+
+    def _get_client(self):
+        return self.cluster.get_local_client_for_key(self.key)
+
+    def _update(self, client, mapping):
+        with client.pipeline() as pipe:
+            pipe.hmset(self.key, mapping)
+            pipe.expire(self.key, self.ttl)
+            pipe.execute()
+
+    def exists(self):
+        return bool(self._get_client().exists(self.key))
+
+    def start(self, relations):
+        """
+        Starts tracking a deletion, given the names of its relations.
+        """
+        self._update(
+            self._get_client(),
+            {"relations": json.dumps(relations), "phase": 0, "started": time.time()},
+        )
+
+    def start_relation(self, phase, count):
+        """
+        Advances to the relation at ``phase``. Unless the relation has been
+        started before, ``count`` is called to get the number of rows to
+        delete (or ``None`` if that is not known.)
+        """
+        client = self._get_client()
+        if client.hexists(self.key, "total:%d" % phase):
+            return
+        self._update(client, {"phase": phase, "total:%d" % phase: json.dumps(count())})
+
+    def get_phase(self):
+        """
+        Returns the index of the relation that is currently being deleted.
+        """
+        return int(self._get_client().hget(self.key, "phase") or 0)
+
+    def start_shards(self, phase, shards):
+        self._update(
+            self._get_client(),
+            {"shards:%d" % phase: shards, "shards_done:%d" % phase: 0, "phase": phase},
+        )
+
+    def record(self, phase, deleted):
+        if deleted:
+            self._get_client().hincrby(self.key, "deleted:%d" % phase, deleted)
+
+    def finish_shard(self, phase):
+        """
+        Marks a shard of a relation as done, returning whether it was the
+        last shard of that relation to finish.
+        """
+        client = self._get_client()
+        with client.pipeline() as pipe:
+            pipe.hincrby(self.key, "shards_done:%d" % phase, 1)
+            pipe.hget(self.key, "shards:%d" % phase)
+            done, shards = pipe.execute()
+        return done == int(shards or 0)
+
+    def finish_relation(self, phase):
+        """
+        Marks a relation as deleted, advancing to the next one. Rows that
+        weren't recorded by the shards (such as rows of bulk deletions, or
+        rows removed by the cascades of other relations) count as deleted.
+        """
+        client = self._get_client()
+        with client.pipeline() as pipe:
+            pipe.hget(self.key, "total:%d" % phase)
+            pipe.hget(self.key, "deleted:%d" % phase)
+            total, deleted = pipe.execute()
+        total = json.loads(total or "null") or 0
+        deleted = max(int(deleted or 0), total)
+        self._update(client, {"phase": phase + 1, "deleted:%d" % phase: deleted})
+
+    def finish(self):
+        self._update(self._get_client(), {"finished": time.time()})
+
+    def get_status(self):
+        """
+        Returns the progress of the deletion, or ``None`` if it isn't tracked:
+
+        >>> {
+        >>>     'phase': 1,
+        >>>     'finished': False,
+        >>>     'deleted': 1200,
+        >>>     'total': 5000,
+        >>>     'eta': 38.5,
+        >>>     'relations': [
+        >>>         {'name': 'sentry.Group', 'total': 200, 'deleted': 200,
+        >>>          'shards': 4, 'shards_done': 4},
+        >>>         {'name': 'sentry.Event', 'total': 4800, 'deleted': 1000,
+        >>>          'shards': 4, 'shards_done': 1},
+        >>>     ],
+        >>> }
+
+        The rows of a relation are only counted once it is started, so
+        ``total`` covers the relations up to the current phase. ``eta`` is
+        the estimated number of seconds until those rows are deleted, based
+        on the rate they were deleted at so far.
+        """
+        values = self._get_client().hgetall(self.key)
+        if not values:
+            return None
+
+        phase = int(values.get("phase", 0))
+        relations = []
+        deleted = total = 0
+        for index, name in enumerate(json.loads(values["relations"])):
+            count = json.loads(values.get("total:%d" % index, "null"))
+            relation = {
+                "name": name,
+                "total": count,
+                "deleted": int(values.get("deleted:%d" % index, 0)),
+                "shards": int(values.get("shards:%d" % index, 0)),
+                "shards_done": int(values.get("shards_done:%d" % index, 0)),
+            }
+            relations.append(relation)
+            deleted += relation["deleted"]
+            total += count or 0
+
+        finished = "finished" in values
+        eta = None
+        if finished:
+            eta = 0
+        elif deleted:
+            rate = deleted / (time.time() - float(values["started"]))
+            eta = max(total - deleted, 0) / rate
+
+        return {
+            "phase": phase,
+            "finished": finished,
+            "deleted": deleted,
+            "total": total,
+            "eta": eta,
+            "relations": relations,
+        }
@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import copy
 import functools
 import itertools
 import logging
@@ -11,7 +12,7 @@ from six.moves import reduce
 from sentry.app import tsdb
 from sentry.digests import Record
 from sentry.models import Project, Group, GroupStatus, Rule
-from sentry.utils.dates import to_timestamp
+from sentry.utils.dates import to_datetime, to_timestamp
 
 logger = logging.getLogger("sentry.digests")
 
@@ -67,6 +68,94 @@ def fetch_state(project, records):
     }
 
 
+def fetch_state_bulk(digests):
+    """
+    Fetches the state for many digests at once, given a sequence of
+    ``(project, records)`` pairs (with at least one record each.) Returns a
+    list of states (as returned by ``fetch_state``) in the same order.
+
+    Groups and rules are loaded with a single query each. Event counts are
+    fetched with one ``get_range`` call per rollup covering all digests,
+    which is then summed over the series of each digest, and user counts
+    with one call per distinct series.
+    """
+    digests = list(digests)
+    if not digests:
+        return []
+
+    groups = Group.objects.in_bulk(
+        set(record.value.event.group_id for _, records in digests for record in records)
+    )
+    rules = Rule.objects.in_bulk(
+        set(
+            itertools.chain.from_iterable(
+                record.value.rules for _, records in digests for record in records
+            )
+        )
+    )
+
+    windows = []
+    ranges = {}
+    totals = {}
+    for project, records in digests:
+        start = records[-1].datetime
+        end = records[0].datetime
+        rollup, series = tsdb.get_optimal_rollup_series(start, end)
+        series = tuple(series)
+        group_ids = set(record.value.event.group_id for record in records) & set(groups)
+        windows.append((rollup, series, group_ids))
+
+        keys, timestamps, range_end = ranges.get(rollup, (set(), set(), end))
+        ranges[rollup] = (keys | group_ids, timestamps.union(series), max(end, range_end))
+
+        # Distinct counts can't be summed, but are the same for any window
+        # with the same series.
+        window_start, window_end, keys = totals.get((rollup, series), (start, end, set()))
+        totals[(rollup, series)] = (window_start, window_end, keys | group_ids)
+
+    event_counts = {}
+    for rollup, (keys, timestamps, end) in six.iteritems(ranges):
+        if keys and timestamps:
+            # Starting at the earliest bucket ensures the range contains the
+            # series of every digest.
+            event_counts[rollup] = tsdb.get_range(
+                tsdb.models.group, list(keys), to_datetime(min(timestamps)), end, rollup=rollup
+            )
+
+    user_counts = {}
+    for (rollup, series), (start, end, keys) in six.iteritems(totals):
+        if keys:
+            user_counts[(rollup, series)] = tsdb.get_distinct_counts_totals(
+                tsdb.models.users_affected_by_group, list(keys), start, end, rollup=rollup
+            )
+
+    states = []
+    for (project, records), (rollup, series, group_ids) in zip(digests, windows):
+        timestamps = set(series)
+        rule_ids = set(itertools.chain.from_iterable(record.value.rules for record in records))
+        states.append(
+            {
+                "project": project,
+                # Groups are modified when the state is attached, so every
+                # digest gets its own copies.
+                "groups": {id: copy.copy(groups[id]) for id in group_ids},
+                "rules": {id: rules[id] for id in rule_ids if id in rules},
+                "event_counts": {
+                    id: sum(
+                        count
+                        for timestamp, count in event_counts.get(rollup, {}).get(id, ())
+                        if timestamp in timestamps
+                    )
+                    for id in group_ids
+                },
+                "user_counts": {
+                    id: user_counts.get((rollup, series), {}).get(id, 0) for id in group_ids
+                },
+            }
+        )
+    return states
+
+
 def attach_state(project, groups, rules, event_counts, user_counts):
     for id, group in six.iteritems(groups):
         assert group.project_id == project.id, "Group must belong to Project"
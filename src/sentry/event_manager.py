@@ -218,16 +218,34 @@ def add_meta_errors(errors, meta):
             errors.append(error)
 
 
+def _decompress_event(data, content_encoding, max_size=None):
+    """
+    Decompresses and decodes a binary event payload into its JSON string.
+    """
+    if content_encoding == "gzip":
+        return decompress_gzip(data, max_size=max_size)
+    elif content_encoding == "deflate":
+        return decompress_deflate(data, max_size=max_size)
+    elif data[0] != b"{":
+        return decode_and_decompress_data(data, max_size=max_size)
+    return decode_data(data)
+
+
+def _has_legacy_keys(json_string):
+    """
+    Checks whether an event payload may use legacy interface names, or the
+    ``message`` alias next to ``logentry``. ``CanonicalKeyDict`` resolves these
+    differently than the normalizer, so such payloads are parsed in Python.
+    Matches in nested data only cause the event to be parsed unnecessarily.
+    """
+    return u'"sentry.interfaces.' in json_string or (
+        u'"logentry"' in json_string and u'"message"' in json_string
+    )
+
+
 def _decode_event(data, content_encoding):
     if isinstance(data, six.binary_type):
-        if content_encoding == "gzip":
-            data = decompress_gzip(data)
-        elif content_encoding == "deflate":
-            data = decompress_deflate(data)
-        elif data[0] != b"{":
-            data = decode_and_decompress_data(data)
-        else:
-            data = decode_data(data)
+        data = _decompress_event(data, content_encoding)
     if isinstance(data, six.text_type):
         data = safely_load_json_string(data)
 
@@ -254,8 +272,18 @@ class EventManager(object):
         is_renormalize=False,
         remove_other=None,
         project_config=None,
+        max_decompressed_size=None,
     ):
-        self._data = _decode_event(data, content_encoding=content_encoding)
+        if isinstance(data, six.binary_type):
+            data = _decompress_event(data, content_encoding, max_size=max_decompressed_size)
+
+        # JSON objects are passed to the normalizer as strings, and are only
+        # parsed in Python if the event data is accessed before normalization.
+        self._raw_data = None
+        if isinstance(data, six.text_type) and data[:1] == u"{" and not _has_legacy_keys(data):
+            self._raw_data = data
+        else:
+            self._data = _decode_event(data, content_encoding=None)
         self.version = version
         self._project = project
         # if not explicitly specified try to get the grouping from project_config
@@ -275,6 +303,17 @@ class EventManager(object):
         self._normalized = False
         self.project_config = project_config
 
+    @property
+    def _data(self):
+        if self._raw_data is not None:
+            self._data = _decode_event(self._raw_data, content_encoding=None)
+        return self._event_data
+
+    @_data.setter
+    def _data(self, data):
+        self._raw_data = None
+        self._event_data = data
+
     def process_csp_report(self):
         """Only called from the CSP report endpoint."""
         data = self._data
@@ -331,6 +370,7 @@ class EventManager(object):
             raise RuntimeError("Already normalized")
         self._normalized = True
 
+        from semaphore import SemaphoreError
         from semaphore.processing import StoreNormalizer
 
         rust_normalizer = StoreNormalizer(
@@ -346,7 +386,17 @@ class EventManager(object):
             **DEFAULT_STORE_NORMALIZER_ARGS
         )
 
-        self._data = CanonicalKeyDict(rust_normalizer.normalize_event(dict(self._data)))
+        if self._raw_data is not None:
+            try:
+                data = rust_normalizer.normalize_event(raw_event=self._raw_data)
+            except SemaphoreError:
+                # Parse the event in Python instead, which reports invalid
+                # payloads as ``APIError``.
+                data = rust_normalizer.normalize_event(dict(self._data))
+        else:
+            data = rust_normalizer.normalize_event(dict(self._data))
+
+        self._data = CanonicalKeyDict(data)
 
     def should_filter(self):
         """
@@ -773,23 +823,34 @@ class EventManager(object):
             tsdb.record_multi(counters, timestamp=event.datetime, environment_id=environment.id)
 
         if release:
+            # The release counters of the event are sent to the buffer at once.
+            buffer_incrs = []
             if is_new:
-                buffer.incr(
-                    ReleaseProject,
-                    {"new_groups": 1},
-                    {"release_id": release.id, "project_id": project.id},
+                buffer_incrs.append(
+                    (
+                        ReleaseProject,
+                        {"new_groups": 1},
+                        {"release_id": release.id, "project_id": project.id},
+                        None,
+                    )
                 )
             if is_new_group_environment:
-                buffer.incr(
-                    ReleaseProjectEnvironment,
-                    {"new_issues_count": 1},
-                    {
-                        "project_id": project.id,
-                        "release_id": release.id,
-                        "environment_id": environment.id,
-                    },
+                buffer_incrs.append(
+                    (
+                        ReleaseProjectEnvironment,
+                        {"new_issues_count": 1},
+                        {
+                            "project_id": project.id,
+                            "release_id": release.id,
+                            "environment_id": environment.id,
+                        },
+                        None,
+                    )
                 )
 
+            if buffer_incrs:
+                buffer.incr_multi(buffer_incrs)
+
         if not raw:
             if not project.first_event:
                 project.update(first_event=date)
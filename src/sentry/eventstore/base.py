@@ -3,6 +3,7 @@ from __future__ import absolute_import
 from enum import Enum
 
 from sentry import nodestore
+from sentry.db.models.fields.node import NodeBatch
 from sentry.utils.services import Service
 
 
@@ -126,6 +127,7 @@ class EventStorage(Service):
         "get_earliest_event_id",
         "get_latest_event_id",
         "bind_nodes",
+        "defer_nodes",
     )
 
     # The minimal list of columns we need to get from snuba to bootstrap an
@@ -242,3 +244,14 @@ class EventStorage(Service):
         for item, node in object_node_list:
             data = node_results.get(node.id) or {}
             node.bind_data(data, ref=node.get_ref(item))
+
+    def defer_nodes(self, object_list, node_name="data"):
+        """
+        For a list of Event objects, and a property name where we might find an
+        (unfetched) NodeData on those objects, defer fetching the data blobs
+        until any one of them is accessed, and then fetch all of them with a
+        single multi-get command to nodestore.
+        """
+        batch = NodeBatch()
+        for item in object_list:
+            batch.add(item, getattr(item, node_name))
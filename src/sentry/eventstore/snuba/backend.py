@@ -48,7 +48,9 @@ class SnubaEventStorage(EventStorage):
         )
 
         if "error" not in result:
-            return [SnubaEvent(evt) for evt in result["data"]]
+            events = [SnubaEvent(evt) for evt in result["data"]]
+            self.defer_nodes(events)
+            return events
 
         return []
 
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 import logging
 
+from sentry.celery import app
 from sentry.utils.services import Service
 from sentry.tasks.post_process import post_process_group
 
@@ -39,18 +40,37 @@ class EventStream(Service):
         is_new_group_environment,
         primary_hash,
         skip_consume=False,
+        producer=None,
     ):
         if skip_consume:
             logger.info("post_process.skip.raw_event", extra={"event_id": event.id})
         else:
-            post_process_group.delay(
-                event=event,
-                is_new=is_new,
-                is_regression=is_regression,
-                is_new_group_environment=is_new_group_environment,
-                primary_hash=primary_hash,
+            post_process_group.apply_async(
+                kwargs={
+                    "event": event,
+                    "is_new": is_new,
+                    "is_regression": is_regression,
+                    "is_new_group_environment": is_new_group_environment,
+                    "primary_hash": primary_hash,
+                },
+                producer=producer,
             )
 
+    def _dispatch_post_process_group_tasks(self, tasks):
+        """
+        Dispatches the post-processing tasks for a batch of events (given as
+        the keyword arguments for ``_dispatch_post_process_group_task``),
+        publishing all of them with the same producer.
+        """
+        if app.conf.CELERY_ALWAYS_EAGER:
+            for task_kwargs in tasks:
+                self._dispatch_post_process_group_task(**task_kwargs)
+            return
+
+        with app.producer_or_acquire() as producer:
+            for task_kwargs in tasks:
+                self._dispatch_post_process_group_task(producer=producer, **task_kwargs)
+
     def insert(
         self,
         group,
@@ -99,6 +119,8 @@ class EventStream(Service):
         synchronize_commit_group,
         commit_batch_size=100,
         initial_offset_reset="latest",
+        max_batch_size=1,
+        max_batch_time=100,
     ):
         assert not self.requires_post_process_forwarder()
         raise ForwarderNotRequired
@@ -69,6 +69,8 @@ class KafkaEventStream(SnubaProtocolEventStream):
         synchronize_commit_group,
         commit_batch_size=100,
         initial_offset_reset="latest",
+        max_batch_size=1,
+        max_batch_time=100,
     ):
         logger.debug("Starting post-process forwarder...")
 
@@ -175,33 +177,56 @@ class KafkaEventStream(SnubaProtocolEventStream):
         try:
             i = 0
             while True:
-                message = consumer.poll(0.1)
-                if message is None:
+                # Up to ``max_batch_size`` messages are consumed at once,
+                # waiting at most ``max_batch_time`` milliseconds for them.
+                messages = consumer.consume(max_batch_size, max_batch_time / 1000.0)
+                if not messages:
                     continue
 
-                error = message.error()
-                if error is not None:
-                    raise Exception(error)
+                metrics.timing("eventstream.forwarder.batch-size", len(messages))
 
-                key = (message.topic(), message.partition())
-                if key not in owned_partition_offsets:
-                    logger.warning("Skipping message for unowned partition: %r", key)
-                    continue
+                tasks = []
+                consumed_offsets = {}
+                with metrics.timer("eventstream.duration", instance="get_task_kwargs_for_messages"):
+                    for message in messages:
+                        error = message.error()
+                        if error is not None:
+                            raise Exception(error)
+
+                        key = (message.topic(), message.partition())
+                        if key not in owned_partition_offsets:
+                            logger.warning("Skipping message for unowned partition: %r", key)
+                            continue
 
-                i = i + 1
-                owned_partition_offsets[key] = message.offset() + 1
+                        i = i + 1
+                        consumed_offsets[key] = message.offset() + 1
 
-                with metrics.timer("eventstream.duration", instance="get_task_kwargs_for_message"):
-                    task_kwargs = get_task_kwargs_for_message(message.value())
+                        task_kwargs = get_task_kwargs_for_message(message.value())
+                        if task_kwargs is not None:
+                            tasks.append(task_kwargs)
 
-                if task_kwargs is not None:
+                if tasks:
                     with metrics.timer(
-                        "eventstream.duration", instance="dispatch_post_process_group_task"
+                        "eventstream.duration", instance="dispatch_post_process_group_tasks"
                     ):
-                        self._dispatch_post_process_group_task(**task_kwargs)
-
-                if i % commit_batch_size == 0:
+                        self._dispatch_post_process_group_tasks(tasks)
+
+                # The offsets are only advanced once the tasks of the batch
+                # have been dispatched.
+                owned_partition_offsets.update(consumed_offsets)
+
+                for topic, partition in consumed_offsets:
+                    lag = consumer.get_lag(topic, partition)
+                    if lag is not None:
+                        metrics.timing(
+                            "eventstream.forwarder.lag", lag, tags={"partition": partition}
+                        )
+
+                # Offsets are only committed for complete batches, once at
+                # least ``commit_batch_size`` messages have been processed.
+                if i >= commit_batch_size:
                     commit_offsets()
+                    i = 0
         except KeyboardInterrupt:
             pass
 
@@ -16,6 +16,8 @@ from confluent_kafka import (
 )
 
 from sentry.eventstream.kafka.state import (
+    InvalidState,
+    MessageNotReady,
     SynchronizedPartitionState,
     SynchronizedPartitionStateManager,
 )
@@ -342,6 +344,67 @@ class SynchronizedConsumer(object):
 
         return message
 
+    def consume(self, num_messages, timeout):
+        """
+        Consume up to ``num_messages`` messages, waiting at most ``timeout``
+        seconds for them.
+
+        Consuming a message of a batch can cause its partition to be paused
+        (once the local offset catches up with the remote offset), in which
+        case the remaining messages of that partition are discarded and the
+        partition is rewound to the first of them, so that they are consumed
+        again once the partition is resumed.
+        """
+        self.__check_commit_log_consumer_running()
+
+        messages = []
+        rewind = {}
+        for message in self.__consumer.consume(num_messages, timeout):
+            if message.error() is not None:
+                messages.append(message)
+                continue
+
+            key = (message.topic(), message.partition())
+            if key in rewind:
+                continue
+
+            try:
+                self.__partition_state_manager.validate_local_message(
+                    message.topic(), message.partition(), message.offset()
+                )
+            except (InvalidState, MessageNotReady):
+                logger.debug(
+                    "Discarding message for %r at offset %s until partition is resumed.",
+                    key,
+                    message.offset(),
+                )
+                rewind[key] = message.offset()
+                continue
+
+            self.__partition_state_manager.set_local_offset(
+                message.topic(), message.partition(), message.offset() + 1
+            )
+            self.__positions[key] = message.offset() + 1
+            messages.append(message)
+
+        for (topic, partition), offset in rewind.items():
+            self.__consumer.seek(TopicPartition(topic, partition, offset))
+
+        return messages
+
+    def get_lag(self, topic, partition):
+        """
+        Returns the number of messages in the partition that have been
+        committed by the synchronized consumer group but not consumed yet, or
+        ``None`` if either offset is not known.
+        """
+        state, offsets = self.__partition_state_manager.partitions.get(
+            (topic, partition), (None, None)
+        )
+        if offsets is None or offsets.local is None or offsets.remote is None:
+            return None
+        return max(offsets.remote - offsets.local, 0)
+
     def commit(self, *args, **kwargs):
         self.__check_commit_log_consumer_running()
 
@@ -116,4 +116,5 @@ requires_snuba = (
 add = default_manager.add
 get = default_manager.get
 has = default_manager.has
+has_many = default_manager.has_many
 all = default_manager.all
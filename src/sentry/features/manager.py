@@ -68,25 +68,88 @@ class FeatureManager(object):
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
         """
         actor = kwargs.pop("actor", None)
-        feature = self.get(name, *args, **kwargs)
+        return self.has_many([name], *args, actor=actor, **kwargs)[name]
 
-        # Check plugin feature handlers
-        rv = self._get_plugin_value(feature, actor)
-        if rv is not None:
-            return rv
+    def has_many(self, names, *args, **kwargs):
+        """
+        Determine which of a list of features are enabled for the same
+        context, returning a mapping of feature name to a boolean.
+
+        The plugin feature handlers are resolved only once for all features.
+        Within a request, the result of checking a feature for the same
+        arguments and actor is remembered for the rest of the request.
 
-        rv = settings.SENTRY_FEATURES.get(feature.name, False)
-        if rv is not None:
-            return rv
+        >>> FeatureManager.has_many(['organizations:a', 'organizations:b'], organization,
+        >>>                         actor=request.user)
+        """
+        actor = kwargs.pop("actor", None)
+        memo = self._get_request_memo()
+        handlers = None
+
+        results = {}
+        for name in names:
+            key = self._make_memo_key(name, args, kwargs, actor) if memo is not None else None
+            if key is not None and key in memo:
+                results[name] = memo[key]
+                continue
+
+            feature = self.get(name, *args, **kwargs)
+            if handlers is None:
+                handlers = self._get_plugin_handlers(memo)
+            rv = self._get_plugin_value(feature, actor, handlers)
+            if rv is None:
+                rv = settings.SENTRY_FEATURES.get(feature.name, False)
+            if rv is None:
+                # Features are by default disabled if no plugin or default enables them
+                rv = False
+
+            results[name] = rv
+            if key is not None:
+                memo[key] = rv
+
+        return results
+
+    def _get_request_memo(self):
+        from sentry.app import env
+
+        request = env.request
+        if request is None:
+            return None
 
-        # Features are by default disabled if no plugin or default enables them
-        return False
+        try:
+            memos = request._feature_memos
+        except AttributeError:
+            memos = request._feature_memos = {}
+        return memos.setdefault(id(self), {})
 
-    def _get_plugin_value(self, feature, actor):
+    def _make_memo_key(self, name, args, kwargs, actor):
+        key = (name, args, tuple(sorted(kwargs.items())), actor)
+        try:
+            hash(key)
+        except TypeError:
+            # e.g. unsaved model instances
+            return None
+        return key
+
+    def _get_plugin_handlers(self, memo=None):
+        # The handlers are remembered in the request memo under the ``None``
+        # key, which can't collide with the (tuple) keys of feature checks.
+        if memo is not None and None in memo:
+            return memo[None]
+
+        handlers = []
         for plugin in plugins.all(version=2):
-            handlers = safe_execute(plugin.get_feature_hooks, _with_transaction=False)
-            for handler in handlers or ():
-                rv = handler(feature, actor)
-                if rv is not None:
-                    return rv
+            handlers.extend(safe_execute(plugin.get_feature_hooks, _with_transaction=False) or ())
+
+        if memo is not None:
+            memo[None] = handlers
+        return handlers
+
+    def _get_plugin_value(self, feature, actor, handlers=None):
+        if handlers is None:
+            handlers = self._get_plugin_handlers()
+        for handler in handlers:
+            rv = handler(feature, actor)
+            if rv is not None:
+                return rv
         return None
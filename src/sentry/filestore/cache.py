@@ -0,0 +1,199 @@
+from __future__ import absolute_import
+
+import errno
+import logging
+import os
+import tempfile
+
+from hashlib import sha1
+from threading import Lock
+
+from django.core.files.base import File as FileObj
+
+from sentry.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Once the cache grows past its size limit, the least recently used entries
+# are evicted until it is below this fraction of the limit, so that eviction
+# does not have to run for every newly cached blob.
+EVICTION_TARGET = 0.9
+
+
+class LocalBlobCache(object):
+    """
+    A host local, size bounded cache of blob contents on disk, addressed by
+    the checksum of the contents.
+
+    Blobs are downloaded into a temporary file next to their final location
+    and then renamed into place, so that other processes sharing the cache
+    directory never observe partially written files. The modification time
+    of a file is updated whenever it is read, and the least recently used
+    files are evicted once the total size of the cache exceeds ``max_size``
+    bytes. Cached blobs are returned as regular files, which can be passed
+    to ``mmap`` directly.
+    """
+
+    def __init__(self, path, max_size):
+        self.path = path
+        self.max_size = max_size
+        self.size = None
+        self._lock = Lock()
+
+    def get_path(self, checksum):
+        return os.path.join(self.path, checksum[:2], checksum)
+
+    def open(self, checksum, fetch, name=None):
+        """
+        Returns a file object for the blob with the given checksum, calling
+        ``fetch`` to obtain a file object with the blob contents from the
+        underlying storage if it is not cached yet.
+        """
+        path = self.get_path(checksum)
+        try:
+            f = open(path, "rb")
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+        else:
+            metrics.incr("filestore.cache.hit")
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return FileObj(f, name)
+
+        metrics.incr("filestore.cache.miss")
+        with fetch() as src:
+            f = self.publish(checksum, src)
+        if f is None:
+            # The blob could not be cached, so it has to be read from the
+            # underlying storage again.
+            return fetch()
+
+        return FileObj(f, name)
+
+    def publish(self, checksum, src):
+        """
+        Atomically adds the contents of ``src`` to the cache, returning an
+        open file object with the cached contents, or ``None`` if the blob
+        could not be cached.
+
+        The file is opened before it is moved into place, so that it can be
+        read even if it is evicted right away, either because it is larger
+        than the eviction target or by another process.
+        """
+        path = self.get_path(checksum)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        size = 0
+        digest = sha1()
+        with tempfile.NamedTemporaryFile(prefix="._", dir=directory, delete=False) as dst:
+            try:
+                for chunk in iter(lambda: src.read(65536), b""):
+                    dst.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            except Exception:
+                os.remove(dst.name)
+                raise
+
+        if digest.hexdigest() != checksum:
+            logger.error("filestore.cache.checksum-mismatch", extra={"checksum": checksum})
+            os.remove(dst.name)
+            return None
+
+        f = open(dst.name, "rb")
+        try:
+            os.rename(dst.name, path)
+        except Exception:
+            f.close()
+            os.remove(dst.name)
+            raise
+        metrics.timing("filestore.cache.publish-size", size)
+
+        with self._lock:
+            if self.size is None:
+                self.size = self._scan()[1]
+            else:
+                self.size += size
+            evict = self.size > self.max_size
+
+        if evict:
+            self.evict()
+
+        return f
+
+    def _scan(self):
+        """
+        Returns a list of ``(mtime, size, path)`` tuples for all cached files,
+        as well as their total size.
+        """
+        entries = []
+        total = 0
+        for directory, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.startswith("._"):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return entries, total
+
+    def evict(self):
+        """
+        Removes the least recently used files until the total size of the
+        cache is below the eviction target.
+        """
+        # Other processes may be adding to or evicting from the same
+        # directory, so the size is recomputed from the files on disk.
+        entries, total = self._scan()
+        target = self.max_size * EVICTION_TARGET
+        evicted = 0
+        for mtime, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self.size = total
+
+        if evicted:
+            metrics.incr("filestore.cache.evict", amount=evicted)
+
+
+_cache = None
+_cache_lock = Lock()
+
+
+def get_blob_cache():
+    """
+    Returns the ``LocalBlobCache`` configured with the ``filestore.cache-path``
+    and ``filestore.cache-size`` options, or ``None`` if no cache path is set.
+    """
+    global _cache
+    from sentry import options
+
+    path = options.get("filestore.cache-path")
+    if not path:
+        return None
+
+    max_size = options.get("filestore.cache-size")
+    with _cache_lock:
+        if _cache is None or _cache.path != path or _cache.max_size != max_size:
+            _cache = LocalBlobCache(path, max_size)
+        return _cache
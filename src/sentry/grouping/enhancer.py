@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import os
+import re
 import six
 import base64
 import msgpack
@@ -16,7 +17,7 @@ from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.utils import get_rule_bool
 from sentry.utils.compat import implements_to_string
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import glob_match, translate
 from sentry.utils.safe import get_path
 
 
@@ -164,6 +165,184 @@ class Match(object):
         return cls(key, arg)
 
 
+def _get_literal_prefix(pattern):
+    for idx, c in enumerate(pattern):
+        if c in "*?[":
+            return pattern[:idx]
+    return pattern
+
+
+class FrameValues(object):
+    """The values of a single frame that matchers are tested against.  These
+    are derived lazily and only once per frame, no matter how many rules
+    look at them.
+    """
+
+    def __init__(self, frame_data, platform):
+        self.frame_data = frame_data
+        self.platform = platform
+        self._cache = {}
+
+    def get(self, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            rv = self._cache[key] = self._compute(key)
+            return rv
+
+    def _compute(self, key):
+        frame_data = self.frame_data
+        # Path matches are always case insensitive
+        if key in ("path", "package"):
+            if key == "package":
+                value = frame_data.get("package") or ""
+            else:
+                value = frame_data.get("abs_path") or frame_data.get("filename") or ""
+            normalized = value.lower().replace("\\", "/")
+            if value.startswith("/"):
+                return (normalized,)
+            return (normalized, "/" + normalized)
+
+        if key == "family":
+            return get_behavior_family_for_platform(frame_data.get("platform") or self.platform)
+
+        # all other matches are case sensitive
+        if key == "function":
+            from sentry.stacktraces.functions import get_function_name_for_frame
+
+            value = get_function_name_for_frame(frame_data, self.platform) or "<unknown>"
+        elif key == "module":
+            value = frame_data.get("module") or "<unknown>"
+        else:
+            # should not happen :)
+            value = "<unknown>"
+        return (value,)
+
+
+class CompiledMatch(object):
+    """A compiled version of all matches with the same key and pattern.  The
+    behavior is the same as `Match.matches_frame` except for the `app` key
+    which is not handled here as it depends on the current state of the
+    frame.
+    """
+
+    def __init__(self, key, pattern):
+        self.key = key
+        if key == "family":
+            self.families = frozenset(pattern.split(","))
+            return
+        if key in ("path", "package"):
+            pattern = pattern.lower().replace("\\", "/")
+            self.regex_source = translate(pattern, doublestar=True)
+        else:
+            self.regex_source = translate(pattern)
+        self.prefix = _get_literal_prefix(pattern)
+        self.regex = re.compile(r"(?ms)(?:%s)\Z" % self.regex_source)
+
+    def matches(self, values):
+        if self.key == "family":
+            return "all" in self.families or values.get("family") in self.families
+        for value in values.get(self.key):
+            if value.startswith(self.prefix) and self.regex.match(value) is not None:
+                return True
+        return False
+
+
+class CompiledRules(object):
+    """Precomputed matching structure for a list of rules.
+
+    Every distinct matcher is compiled once and evaluated at most once per
+    frame, no matter how many rules share it.  All patterns of a key are
+    additionally combined into a single regular expression that is used to
+    rule out all matchers of that key with one check.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.rule_matchers = []
+        matches = {}
+        for rule in rules:
+            if not rule.matchers:
+                self.rule_matchers.append(None)
+                continue
+            static = []
+            app = []
+            for matcher in rule.matchers:
+                if matcher.key == "app":
+                    app.append(get_rule_bool(matcher.pattern))
+                    continue
+                compiled = matches.get((matcher.key, matcher.pattern))
+                if compiled is None:
+                    compiled = matches[matcher.key, matcher.pattern] = CompiledMatch(
+                        matcher.key, matcher.pattern
+                    )
+                static.append(compiled)
+            self.rule_matchers.append((static, app))
+
+        sources = {}
+        for compiled in six.itervalues(matches):
+            if compiled.key != "family":
+                sources.setdefault(compiled.key, []).append(compiled.regex_source)
+        self.prefilters = {
+            key: re.compile(r"(?ms)(?:%s)\Z" % "|".join("(?:%s)" % x for x in key_sources))
+            for key, key_sources in six.iteritems(sources)
+        }
+
+    def _matches(self, compiled, values, results):
+        # Check the combined pattern of the key first, which rules out all
+        # matchers of that key at once.
+        prefilter = self.prefilters.get(compiled.key)
+        if prefilter is not None:
+            possible = results.get(compiled.key)
+            if possible is None:
+                possible = results[compiled.key] = any(
+                    prefilter.match(value) is not None for value in values.get(compiled.key)
+                )
+            if not possible:
+                return False
+        return compiled.matches(values)
+
+    def get_static_matches(self, frames, platform):
+        """Returns, for every rule, the indexes of all frames that are
+        matched by all matchers of the rule except for `app`.
+        """
+        rv = [[] for _ in self.rules]
+        for idx, frame in enumerate(frames):
+            values = FrameValues(frame, platform)
+            results = {}
+            for rule_idx, rule_matchers in enumerate(self.rule_matchers):
+                if rule_matchers is None:
+                    continue
+                for compiled in rule_matchers[0]:
+                    matched = results.get(compiled)
+                    if matched is None:
+                        matched = results[compiled] = self._matches(compiled, values, results)
+                    if not matched:
+                        break
+                else:
+                    rv[rule_idx].append(idx)
+        return rv
+
+    def iter_matching_frame_actions(self, frames, platform):
+        """Yields `(rule, idx, actions)` for every rule and frame that
+        matches, in the same order as testing every rule against every frame
+        with `Rule.get_matching_frame_actions`.
+        """
+        static_matches = self.get_static_matches(frames, platform)
+        for rule, rule_matchers, frame_indexes in izip(
+            self.rules, self.rule_matchers, static_matches
+        ):
+            app = rule_matchers and rule_matchers[1]
+            for idx in frame_indexes:
+                # The in-app flag might be changed by previous rules, so it
+                # is checked when the rule is applied.
+                if app and not all(
+                    ref_val is not None and ref_val == frames[idx].get("in_app") for ref_val in app
+                ):
+                    continue
+                yield rule, idx, rule.actions
+
+
 class Action(object):
     def apply_modifications_to_frame(self, frames, idx):
         pass
@@ -301,27 +480,38 @@ class Enhancements(object):
         if bases is None:
             bases = []
         self.bases = bases
+        self._compiled_rules = CompiledRules(rules)
+
+    def iter_compiled_rules(self):
+        for base in self.bases:
+            base = ENHANCEMENT_BASES.get(base)
+            if base:
+                for compiled_rules in base.iter_compiled_rules():
+                    yield compiled_rules
+        yield self._compiled_rules
+
+    def iter_matching_frame_actions(self, frames, platform):
+        for compiled_rules in self.iter_compiled_rules():
+            for rv in compiled_rules.iter_matching_frame_actions(frames, platform):
+                yield rv
 
     def apply_modifications_to_frame(self, frames, platform):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
-        for rule in self.iter_rules():
-            for idx, frame in enumerate(frames):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.apply_modifications_to_frame(frames, idx)
+        for rule, idx, actions in self.iter_matching_frame_actions(frames, platform):
+            for action in actions:
+                action.apply_modifications_to_frame(frames, idx)
 
     def update_frame_components_contributions(self, components, frames, platform):
         stacktrace_state = StacktraceState()
 
         # Apply direct frame actions and update the stack state alongside
-        for rule in self.iter_rules():
-            for idx, (component, frame) in enumerate(izip(components, frames)):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                    action.modify_stacktrace_state(stacktrace_state, rule)
+        matched_frames = frames[: len(components)]
+        for rule, idx, actions in self.iter_matching_frame_actions(matched_frames, platform):
+            for action in actions:
+                action.update_frame_components_contributions(components, frames, idx, rule=rule)
+                action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
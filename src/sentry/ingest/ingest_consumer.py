@@ -10,10 +10,11 @@ from django.core.cache import cache
 
 from sentry.coreapi import cache_key_for_event
 from sentry.cache import default_cache
+from sentry.db.models.manager import BaseManager
 from sentry.models import Project
 from sentry.signals import event_accepted
 from sentry.tasks.store import preprocess_event
-from sentry.utils import json
+from sentry.utils import json, metrics
 from sentry.utils.kafka import create_batching_kafka_consumer
 
 logger = logging.getLogger(__name__)
@@ -39,61 +40,127 @@ class ConsumerType(object):
         raise ValueError("Invalid consumer type", consumer_type)
 
 
+def _get_deduplication_key(project_id, event_id):
+    return "ev:{}:{}".format(project_id, event_id)
+
+
 class IngestConsumerWorker(AbstractBatchWorker):
+    """
+    Dispatches ingested events to ``preprocess_event``.
+
+    ``process_message`` only decodes the message, all cache and database
+    round trips are issued in bulk for the entire batch in ``flush_batch``.
+    """
+
     def process_message(self, message):
         message = msgpack.unpackb(message.value(), use_list=False)
-        payload = message["payload"]
-        start_time = float(message["start_time"])
-        event_id = message["event_id"]
-        project_id = message["project_id"]
-        remote_addr = message.get("remote_addr")
-
-        # check that we haven't already processed this event (a previous instance of the forwarder
-        # died before it could commit the event queue offset)
-        deduplication_key = "ev:{}:{}".format(project_id, event_id)
-        if cache.get(deduplication_key) is not None:
-            logger.warning(
-                "pre-process-forwarder detected a duplicated event" " with id:%s for project:%s.",
-                event_id,
-                project_id,
-            )
-            return True  # message already processed do not reprocess
+        return {
+            "payload": message["payload"],
+            "start_time": float(message["start_time"]),
+            "event_id": message["event_id"],
+            "project_id": message["project_id"],
+            "remote_addr": message.get("remote_addr"),
+        }
 
-        try:
-            project = Project.objects.get_from_cache(id=project_id)
-        except Project.DoesNotExist:
+    def flush_batch(self, batch):
+        with metrics.timer("ingest_consumer.flush_batch", tags={"phase": "dedup"}):
+            batch = self._deduplicate(batch)
+
+        with metrics.timer("ingest_consumer.flush_batch", tags={"phase": "projects"}):
+            projects = self._fetch_projects(batch)
+
+        with metrics.timer("ingest_consumer.flush_batch", tags={"phase": "cache"}):
+            events = self._cache_events(batch, projects)
+
+        with metrics.timer("ingest_consumer.flush_batch", tags={"phase": "dispatch"}):
+            self._dispatch_events(events)
+
+        metrics.timing("ingest_consumer.batch_size", len(events))
+
+    def _deduplicate(self, batch):
+        """
+        Drops messages for events that have already been processed (a
+        previous instance of the forwarder died before it could commit the
+        event queue offset), as well as duplicates within the batch.
+        """
+        keys = [_get_deduplication_key(msg["project_id"], msg["event_id"]) for msg in batch]
+        processed = cache.get_many(keys)
+
+        rv = []
+        seen = set()
+        for key, msg in zip(keys, batch):
+            if key in processed or key in seen:
+                logger.warning(
+                    "pre-process-forwarder detected a duplicated event"
+                    " with id:%s for project:%s.",
+                    msg["event_id"],
+                    msg["project_id"],
+                )
+                continue  # message already processed do not reprocess
+            seen.add(key)
+            rv.append(msg)
+
+        return rv
+
+    def _fetch_projects(self, batch):
+        project_ids = set(msg["project_id"] for msg in batch)
+        with BaseManager.local_cache():
+            projects = {
+                project.id: project
+                for project in Project.objects.get_many_from_cache("id", project_ids)
+            }
+        for project_id in project_ids - set(projects):
             logger.error("Project for ingested event does not exist: %s", project_id)
-            return True
-
-        # Parse the JSON payload. This is required to compute the cache key and
-        # call process_event. The payload will be put into Kafka raw, to avoid
-        # serializing it again.
-        # XXX: Do not use CanonicalKeyDict here. This may break preprocess_event
-        # which assumes that data passed in is a raw dictionary.
-        data = json.loads(payload)
+        return projects
+
+    def _cache_events(self, batch, projects):
+        events = []
+        values = {}
+        for msg in batch:
+            project = projects.get(msg["project_id"])
+            if project is None:
+                continue
+
+            # Parse the JSON payload. This is required to compute the cache key and
+            # call process_event. The payload will be put into Kafka raw, to avoid
+            # serializing it again.
+            # XXX: Do not use CanonicalKeyDict here. This may break preprocess_event
+            # which assumes that data passed in is a raw dictionary.
+            data = json.loads(msg["payload"])
+            cache_key = cache_key_for_event(data)
+            values[cache_key] = data
+            events.append((msg, project, cache_key, data))
 
         cache_timeout = 3600
-        cache_key = cache_key_for_event(data)
-        default_cache.set(cache_key, data, cache_timeout)
-
-        # Preprocess this event, which spawns either process_event or
-        # save_event. Pass data explicitly to avoid fetching it again from the
-        # cache.
-        preprocess_event(cache_key=cache_key, data=data, start_time=start_time, event_id=event_id)
-
-        # remember for an 1 hour that we saved this event (deduplication protection)
-        cache.set(deduplication_key, "", 3600)
+        default_cache.set_many(values, cache_timeout)
+        return events
+
+    def _dispatch_events(self, events):
+        for msg, _, cache_key, data in events:
+            # Preprocess this event, which spawns either process_event or
+            # save_event. Pass data explicitly to avoid fetching it again from the
+            # cache.
+            preprocess_event(
+                cache_key=cache_key,
+                data=data,
+                start_time=msg["start_time"],
+                event_id=msg["event_id"],
+            )
 
-        # emit event_accepted once everything is done
-        event_accepted.send_robust(
-            ip=remote_addr, data=data, project=project, sender=self.process_message
+        # remember for an 1 hour that we saved these events (deduplication protection)
+        cache.set_many(
+            {
+                _get_deduplication_key(msg["project_id"], msg["event_id"]): ""
+                for msg, _, _, _ in events
+            },
+            3600,
         )
 
-        # Return *something* so that it counts against batch size
-        return True
-
-    def flush_batch(self, batch):
-        pass
+        # emit event_accepted once everything is done
+        for msg, project, _, data in events:
+            event_accepted.send_robust(
+                ip=msg["remote_addr"], data=data, project=project, sender=self.process_message
+            )
 
     def shutdown(self):
         pass
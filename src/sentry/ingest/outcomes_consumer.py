@@ -23,6 +23,9 @@ import atexit
 import logging
 import multiprocessing.dummy
 import multiprocessing as _multiprocessing
+import six
+
+from collections import OrderedDict
 
 from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 
@@ -66,51 +69,118 @@ def is_signal_sent(project_id, event_id):
     return cache.get(key, None) is not None
 
 
-def _process_message(msg):
-    project_id = int(msg.get("project_id", 0))
-    if project_id == 0:
-        return  # no project. this is valid, so ignore silently.
+def mark_signals_sent(keys):
+    """
+    Remembers that signals were emitted for a list of ``(project_id,
+    event_id)`` tuples, like ``mark_signal_sent``.
+    """
+    if keys:
+        cache.set_many(
+            {_get_signal_cache_key(project_id, event_id): True for project_id, event_id in keys},
+            3600,
+        )
+
 
-    outcome = int(msg.get("outcome", -1))
-    if outcome not in (Outcome.FILTERED, Outcome.RATE_LIMITED):
-        return  # nothing to do here
+def get_signals_sent(keys):
+    """
+    Returns the set of ``(project_id, event_id)`` tuples out of ``keys`` that
+    signals were sent for previously.
+    """
+    cache_keys = {
+        _get_signal_cache_key(project_id, event_id): (project_id, event_id)
+        for project_id, event_id in keys
+    }
+    if not cache_keys:
+        return set()
+    return set(
+        cache_keys[key]
+        for key, value in six.iteritems(cache.get_many(list(cache_keys)))
+        if value is not None
+    )
 
-    event_id = msg.get("event_id")
-    if is_signal_sent(project_id=project_id, event_id=event_id):
-        return  # message already processed nothing left to do
 
-    try:
-        project = Project.objects.get_from_cache(id=project_id)
-    except Project.DoesNotExist:
-        logger.error("OutcomesConsumer could not find project with id: %s", project_id)
-        return
+def _get_outcomes(batch):
+    """
+    Returns the outcomes of a batch that signals need to be sent for, as an
+    ordered mapping of ``(project_id, event_id)`` to the outcome message.
+    """
+    outcomes = OrderedDict()
+    for msg in batch:
+        project_id = int(msg.get("project_id", 0))
+        if project_id == 0:
+            continue  # no project. this is valid, so ignore silently.
 
-    reason = msg.get("reason")
-    remote_addr = msg.get("remote_addr")
+        outcome = int(msg.get("outcome", -1))
+        if outcome not in (Outcome.FILTERED, Outcome.RATE_LIMITED):
+            continue  # nothing to do here
 
+        # Outcomes that are emitted more than once only send one signal.
+        outcomes.setdefault((project_id, msg.get("event_id")), msg)
+    return outcomes
+
+
+def _send_signal(signal):
+    project, outcome, reason, remote_addr, count = signal
     if outcome == Outcome.FILTERED:
-        event_filtered.send_robust(ip=remote_addr, project=project, sender=OutcomesConsumerWorker)
+        event_filtered.send_robust(
+            ip=remote_addr, project=project, count=count, sender=OutcomesConsumerWorker
+        )
     elif outcome == Outcome.RATE_LIMITED:
         event_dropped.send_robust(
-            ip=remote_addr, project=project, reason_code=reason, sender=OutcomesConsumerWorker
+            ip=remote_addr,
+            project=project,
+            reason_code=reason,
+            count=count,
+            sender=OutcomesConsumerWorker,
         )
 
-    # remember that we sent the signal just in case the processor dies before
-    mark_signal_sent(project_id=project_id, event_id=event_id)
+    metrics.incr(
+        "outcomes_consumer.signal_sent", amount=count, tags={"reason": reason, "outcome": outcome}
+    )
 
-    timestamp = msg.get("timestamp")
-    if timestamp is not None:
-        delta = to_datetime(time.time()).replace(tzinfo=None) - datetime.datetime.strptime(
-            timestamp, "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
-        metrics.timing("outcomes_consumer.timestamp_lag", delta.total_seconds())
 
-    metrics.incr("outcomes_consumer.signal_sent", tags={"reason": reason, "outcome": outcome})
+def _process_batch(batch, pool):
+    outcomes = _get_outcomes(batch)
+    if not outcomes:
+        return
 
+    # Outcomes that signals were sent for already are skipped.
+    sent = get_signals_sent(outcomes.keys())
 
-def _process_message_with_timer(message):
-    with metrics.timer("outcomes_consumer.process_message"):
-        return _process_message(message)
+    project_ids = set(key[0] for key in outcomes)
+    projects = {
+        project.id: project for project in Project.objects.get_many_from_cache("pk", project_ids)
+    }
+    for project_id in project_ids - set(projects):
+        logger.error("OutcomesConsumer could not find project with id: %s", project_id)
+
+    # Outcomes of the same kind are aggregated into a single signal with the
+    # number of outcomes.
+    signals = OrderedDict()
+    keys = []
+    now = to_datetime(time.time()).replace(tzinfo=None)
+    for key, msg in six.iteritems(outcomes):
+        project_id, event_id = key
+        if key in sent or project_id not in projects:
+            continue
+
+        signal_key = (project_id, int(msg["outcome"]), msg.get("reason"), msg.get("remote_addr"))
+        signals[signal_key] = signals.get(signal_key, 0) + 1
+        keys.append(key)
+
+        timestamp = msg.get("timestamp")
+        if timestamp is not None:
+            delta = now - datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+            metrics.timing("outcomes_consumer.timestamp_lag", delta.total_seconds())
+
+    signals = [
+        (projects[signal[0]],) + signal[1:] + (count,) for signal, count in six.iteritems(signals)
+    ]
+    for _ in pool.imap_unordered(_send_signal, signals):
+        pass
+
+    # remember that we sent the signals just in case the processor dies before
+    mark_signals_sent(keys)
 
 
 class OutcomesConsumerWorker(AbstractBatchWorker):
@@ -122,11 +192,9 @@ class OutcomesConsumerWorker(AbstractBatchWorker):
         return json.loads(message.value())
 
     def flush_batch(self, batch):
-        batch.sort(key=lambda msg: msg.get("project_id", 0) or 0)
-
-        with BaseManager.local_cache():
-            for _ in self.pool.imap_unordered(_process_message_with_timer, batch, chunksize=100):
-                pass
+        with metrics.timer("outcomes_consumer.process_batch"):
+            with BaseManager.local_cache():
+                _process_batch(batch, self.pool)
 
     def shutdown(self):
         pass
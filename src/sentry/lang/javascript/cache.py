@@ -1,10 +1,16 @@
 from __future__ import absolute_import, print_function
 
+import hashlib
+import threading
+
+from collections import OrderedDict
+from django.conf import settings
 from six import text_type
 from symbolic import SourceView
+from sentry.utils import metrics
 from sentry.utils.strings import codec_lookup
 
-__all__ = ["SourceCache", "SourceMapCache"]
+__all__ = ["SourceCache", "SourceMapCache", "ParsedSourceCache", "parsed_source_cache"]
 
 
 def is_utf8(codec):
@@ -12,6 +18,102 @@ def is_utf8(codec):
     return name in ("utf-8", "ascii")
 
 
+def get_checksum(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+class ParsedSourceCache(object):
+    """
+    A process wide LRU cache of parsed ``SourceView`` and ``SourceMapView``
+    objects, shared between all events processed by a worker.
+
+    Entries are keyed by the checksum of the raw file they were parsed from,
+    so that the same release artifact is only parsed once no matter how many
+    events reference it. The least recently used entries are evicted once
+    the total size of the raw files exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, key, kind="source"):
+        with self._lock:
+            try:
+                value, size = self._cache.pop(key)
+            except KeyError:
+                value = None
+            else:
+                # re-insert to mark the entry as most recently used
+                self._cache[key] = (value, size)
+
+        metrics.incr(
+            "sourcemaps.parsed_cache.%s" % ("miss" if value is None else "hit",),
+            tags={"kind": kind},
+        )
+        return value
+
+    def set(self, key, value, size, kind="source"):
+        if size > self.max_size:
+            return
+
+        evicted = 0
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._cache[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self.size -= evicted_size
+                evicted += 1
+
+        if evicted:
+            metrics.incr("sourcemaps.parsed_cache.evict", amount=evicted, tags={"kind": kind})
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
+
+
+parsed_source_cache = ParsedSourceCache(settings.SENTRY_JS_PARSED_SOURCE_CACHE_SIZE)
+
+
+def make_source_view(source, encoding=None):
+    """
+    Creates a ``SourceView`` from raw bytes, reusing a previously parsed view
+    of the same file from the process wide cache.
+    """
+    if isinstance(source, text_type):
+        source = source.encode("utf-8")
+        encoding = None
+
+    key = "source:%s:%s" % (get_checksum(source), encoding or "")
+    source_view = parsed_source_cache.get(key)
+    if source_view is not None:
+        return source_view
+
+    size = len(source)
+    # If an encoding is provided and it's not utf-8 compatible
+    # we try to re-encoding the source and create a source view
+    # from it.
+    if encoding is not None and not is_utf8(encoding):
+        try:
+            source = source.decode(encoding).encode("utf-8")
+        except UnicodeError:
+            pass
+    source_view = SourceView.from_bytes(source)
+    parsed_source_cache.set(key, source_view, size)
+    return source_view
+
+
 class SourceCache(object):
     def __init__(self):
         self._cache = {}
@@ -42,17 +144,7 @@ class SourceCache(object):
         url = self._get_canonical_url(url)
 
         if not isinstance(source, SourceView):
-            if isinstance(source, text_type):
-                source = source.encode("utf-8")
-            # If an encoding is provided and it's not utf-8 compatible
-            # we try to re-encoding the source and create a source view
-            # from it.
-            elif encoding is not None and not is_utf8(encoding):
-                try:
-                    source = source.decode(encoding).encode("utf-8")
-                except UnicodeError:
-                    pass
-            source = SourceView.from_bytes(source)
+            source = make_source_view(source, encoding)
         self._cache[url] = source
 
     def add_error(self, url, error):
@@ -5,10 +5,12 @@ __all__ = ["JavaScriptStacktraceProcessor"]
 import logging
 import re
 import sys
+import time
 import base64
 import six
 import zlib
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from django.conf import settings
 from os.path import splitext
 from requests.utils import get_encoding_from_headers
@@ -35,7 +37,7 @@ from sentry.utils.safe import get_path
 from sentry.utils import metrics
 from sentry.stacktraces.processing import StacktraceProcessor
 
-from .cache import SourceCache, SourceMapCache
+from .cache import SourceCache, SourceMapCache, get_checksum, parsed_source_cache
 
 # number of surrounding lines (on each side) to fetch
 LINES_OF_CONTEXT = 5
@@ -68,11 +70,25 @@ MAX_RESOURCE_FETCHES = 100
 
 logger = logging.getLogger(__name__)
 
+# Scrapes remote files for all events processed by this worker. The pool is
+# shared rather than scoped to an event so that fetches which outlive the
+# deadline of their event do not block it.
+_fetch_pool = ThreadPoolExecutor(max_workers=settings.SENTRY_SOURCE_FETCH_CONCURRENCY)
+
 
 class UnparseableSourcemap(http.BadSource):
     error_type = EventError.JS_INVALID_SOURCEMAP
 
 
+class FetchDeadlineExceeded(http.CannotFetch):
+    error_type = EventError.FETCH_TIMEOUT
+
+    def __init__(self, url):
+        http.CannotFetch.__init__(
+            self, {"url": http.expose_url(url), "timeout": settings.SENTRY_SOURCE_FETCH_DEADLINE}
+        )
+
+
 def trim_line(line, column=0):
     """
     Trims a line down to a goal of 140 characters, with a little
@@ -288,47 +304,78 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     else:
         result = None
 
-    cache_key = "source:cache:v4:%s" % (md5_text(url).hexdigest(),)
-
     if result is None:
         if not allow_scraping or not url.startswith(("http:", "https:")):
             error = {"type": EventError.JS_MISSING_SOURCE, "url": http.expose_url(url)}
             raise http.CannotFetch(error)
 
-        logger.debug("Checking cache for url %r", url)
-        result = cache.get(cache_key)
-        if result is not None:
-            # Previous caches would be a 3-tuple instead of a 4-tuple,
-            # so this is being maintained for backwards compatibility
-            try:
-                encoding = result[4]
-            except IndexError:
-                encoding = None
-            # We got a cache hit, but the body is compressed, so we
-            # need to decompress it before handing it off
-            result = http.UrlResult(
-                result[0], result[1], zlib.decompress(result[2]), result[3], encoding
-            )
+        result = get_cached_file(url)
 
     if result is None:
-        headers = {}
-        verify_ssl = False
-        if project and is_valid_origin(url, project=project):
-            verify_ssl = bool(project.get_option("sentry:verify_ssl", False))
-            token = project.get_option("sentry:token")
-            if token:
-                token_header = project.get_option("sentry:token_header") or "X-Sentry-Token"
-                headers[token_header] = token
-
+        headers, verify_ssl = get_fetch_options(url, project)
         with metrics.timer("sourcemaps.fetch"):
             result = http.fetch_file(url, headers=headers, verify_ssl=verify_ssl)
-            z_body = zlib.compress(result.body)
-            cache.set(
-                cache_key,
-                (url, result.headers, z_body, result.status, result.encoding),
-                get_max_age(result.headers),
-            )
+            cache_file(url, result)
+
+    return validate_file(url, result)
+
+
+def get_cached_file(url):
+    """
+    Returns the ``UrlResult`` of a url that has been scraped before from the
+    cache, or ``None``.
+    """
+    logger.debug("Checking cache for url %r", url)
+    result = cache.get(get_file_cache_key(url))
+    if result is None:
+        return None
+
+    # Previous caches would be a 3-tuple instead of a 4-tuple,
+    # so this is being maintained for backwards compatibility
+    try:
+        encoding = result[4]
+    except IndexError:
+        encoding = None
+    # We got a cache hit, but the body is compressed, so we
+    # need to decompress it before handing it off
+    return http.UrlResult(result[0], result[1], zlib.decompress(result[2]), result[3], encoding)
+
+
+def cache_file(url, result):
+    z_body = zlib.compress(result.body)
+    cache.set(
+        get_file_cache_key(url),
+        (url, result.headers, z_body, result.status, result.encoding),
+        get_max_age(result.headers),
+    )
 
+
+def get_file_cache_key(url):
+    return "source:cache:v4:%s" % (md5_text(url).hexdigest(),)
+
+
+def get_fetch_options(url, project=None):
+    """
+    Returns the headers and the ``verify_ssl`` flag to scrape ``url`` with.
+    They depend on the options of the project, so they have to be resolved
+    before the request is handed to the fetch pool.
+    """
+    headers = {}
+    verify_ssl = False
+    if project and is_valid_origin(url, project=project):
+        verify_ssl = bool(project.get_option("sentry:verify_ssl", False))
+        token = project.get_option("sentry:token")
+        if token:
+            token_header = project.get_option("sentry:token_header") or "X-Sentry-Token"
+            headers[token_header] = token
+    return headers, verify_ssl
+
+
+def validate_file(url, result):
+    """
+    Raises ``CannotFetch`` if the fetched file cannot be used as a source, and
+    otherwise returns it with a binary body.
+    """
     # If we did not get a 200 OK we just raise a cannot fetch here.
     if result.status != 200:
         raise http.CannotFetch(
@@ -401,13 +448,56 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
             url, project=project, release=release, dist=dist, allow_scraping=allow_scraping
         )
         body = result.body
+
+    return parse_sourcemap(url, body)
+
+
+def parse_sourcemap(url, body):
+    key = "sourcemap:%s" % (get_checksum(body),)
+    sourcemap_view = parsed_source_cache.get(key, kind="sourcemap")
+    if sourcemap_view is not None:
+        return sourcemap_view
+
     try:
-        return SourceMapView.from_json_bytes(body)
+        sourcemap_view = SourceMapView.from_json_bytes(body)
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(six.text_type(exc), exc_info=True)
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
+    parsed_source_cache.set(key, sourcemap_view, len(body), kind="sourcemap")
+    return sourcemap_view
+
+
+def fetch_sequentially(requests, deadline):
+    """
+    Scrapes the ``(url, headers, verify_ssl)`` requests one after another and
+    returns a list of ``(url, (result, error))`` tuples. Once the deadline has
+    passed the remaining urls are reported as timed out without being fetched.
+
+    This runs on the fetch pool, so everything that depends on the project
+    has to be resolved into the requests beforehand.
+    """
+    rv = []
+    for url, headers, verify_ssl in requests:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            rv.append((url, (None, FetchDeadlineExceeded(url))))
+            continue
+
+        try:
+            with metrics.timer("sourcemaps.fetch"):
+                result = http.fetch_file(
+                    url,
+                    headers=headers,
+                    verify_ssl=verify_ssl,
+                    timeout=min(timeout, settings.SENTRY_SOURCE_FETCH_SOCKET_TIMEOUT),
+                )
+            rv.append((url, (result, None)))
+        except http.BadSource as exc:
+            rv.append((url, (None, exc)))
+    return rv
+
 
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
@@ -469,6 +559,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
             "sentry:scrape_javascript", True
         ) is not False and self.project.get_option("sentry:scrape_javascript", True)
         self.fetch_count = 0
+        self.fetch_deadline = None
         self.sourcemaps_touched = set()
         self.cache = SourceCache()
         self.sourcemaps = SourceMapCache()
@@ -744,61 +835,171 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
         return self.cache.get(filename)
 
     def cache_source(self, filename):
+        self.cache_sources([filename])
+
+    def cache_sources(self, filenames):
+        """
+        Fetches the given source files and their sourcemaps into the source
+        and sourcemap caches.
+        """
         sourcemaps = self.sourcemaps
         cache = self.cache
 
-        self.fetch_count += 1
+        pending = []
+        for filename in filenames:
+            self.fetch_count += 1
 
-        if self.fetch_count > self.max_fetches:
-            cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
-            return
+            if self.fetch_count > self.max_fetches:
+                cache.add_error(filename, {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES})
+                continue
+
+            pending.append(filename)
 
         # TODO: respect cache-control/max-age headers to some extent
-        logger.debug("Fetching remote source %r", filename)
-        try:
-            result = fetch_file(
-                filename,
-                project=self.project,
-                release=self.release,
-                dist=self.dist,
-                allow_scraping=self.allow_scraping,
+        logger.debug("Fetching remote sources %r", pending)
+        pending_sourcemaps = {}
+        for filename, (result, error) in six.iteritems(self.fetch_files(pending)):
+            if error is not None:
+                cache.add_error(filename, error.data)
+                continue
+
+            cache.add(filename, result.body, result.encoding)
+            cache.alias(result.url, filename)
+
+            sourcemap_url = discover_sourcemap(result)
+            if not sourcemap_url:
+                continue
+
+            logger.debug(
+                "Found sourcemap %r for minified script %r", sourcemap_url[:256], result.url
             )
-        except http.BadSource as exc:
-            cache.add_error(filename, exc.data)
-            return
+            sourcemaps.link(filename, sourcemap_url)
+            if sourcemap_url in sourcemaps:
+                continue
 
-        cache.add(filename, result.body, result.encoding)
-        cache.alias(result.url, filename)
+            pending_sourcemaps.setdefault(sourcemap_url, []).append(filename)
 
-        sourcemap_url = discover_sourcemap(result)
-        if not sourcemap_url:
-            return
+        # pull down sourcemaps
+        fetched = self.fetch_files([url for url in pending_sourcemaps if not is_data_uri(url)])
+        for sourcemap_url, filenames in six.iteritems(pending_sourcemaps):
+            try:
+                if is_data_uri(sourcemap_url):
+                    sourcemap_view = fetch_sourcemap(sourcemap_url)
+                else:
+                    result, error = fetched[sourcemap_url]
+                    if error is not None:
+                        raise error
+                    sourcemap_view = parse_sourcemap(sourcemap_url, result.body)
+            except http.BadSource as exc:
+                for filename in filenames:
+                    cache.add_error(filename, exc.data)
+                continue
 
-        logger.debug("Found sourcemap %r for minified script %r", sourcemap_url[:256], result.url)
-        sourcemaps.link(filename, sourcemap_url)
-        if sourcemap_url in sourcemaps:
-            return
+            sourcemaps.add(sourcemap_url, sourcemap_view)
 
-        # pull down sourcemap
-        try:
-            sourcemap_view = fetch_sourcemap(
-                sourcemap_url,
-                project=self.project,
-                release=self.release,
-                dist=self.dist,
-                allow_scraping=self.allow_scraping,
-            )
-        except http.BadSource as exc:
-            cache.add_error(filename, exc.data)
-            return
+            # cache any inlined sources
+            for src_id, source_name in sourcemap_view.iter_sources():
+                source_view = sourcemap_view.get_sourceview(src_id)
+                if source_view is not None:
+                    self.cache.add(urljoin(sourcemap_url, source_name), source_view)
 
-        sourcemaps.add(sourcemap_url, sourcemap_view)
+    def fetch_files(self, urls):
+        """
+        Fetches all ``urls`` and returns a dictionary mapping each url to a
+        ``(result, error)`` tuple.
+
+        Release artifacts, cached files and the options to scrape with are
+        looked up on the calling thread since they are stored in the database
+        and the cache. Only the requests for files that need to be scraped are
+        sent concurrently on the fetch pool, with at most
+        ``SENTRY_SOURCE_FETCH_HOST_CONCURRENCY`` requests per host at a time.
+        Files that could not be fetched before the deadline of this event
+        passed are reported as timed out.
+        """
+        rv = {}
+        to_scrape = []
+        for url in urls:
+            if self.release is None:
+                to_scrape.append(url)
+                continue
 
-        # cache any inlined sources
-        for src_id, source_name in sourcemap_view.iter_sources():
-            source_view = sourcemap_view.get_sourceview(src_id)
-            if source_view is not None:
-                self.cache.add(urljoin(sourcemap_url, source_name), source_view)
+            try:
+                rv[url] = (
+                    fetch_file(
+                        url,
+                        project=self.project,
+                        release=self.release,
+                        dist=self.dist,
+                        allow_scraping=False,
+                    ),
+                    None,
+                )
+            except http.BadSource as exc:
+                if (
+                    self.allow_scraping
+                    and exc.data["type"] == EventError.JS_MISSING_SOURCE
+                    and url.startswith(("http:", "https:"))
+                ):
+                    to_scrape.append(url)
+                else:
+                    rv[url] = (None, exc)
+
+        requests_by_host = {}
+        for url in to_scrape:
+            if (
+                url[-3:] == "..."
+                or not self.allow_scraping
+                or not url.startswith(("http:", "https:"))
+            ):
+                error = {"type": EventError.JS_MISSING_SOURCE, "url": http.expose_url(url)}
+                rv[url] = (None, http.CannotFetch(error))
+                continue
+
+            result = get_cached_file(url)
+            if result is not None:
+                rv[url] = self.validate_scraped_file(url, result)
+                continue
+
+            headers, verify_ssl = get_fetch_options(url, self.project)
+            requests_by_host.setdefault(urlsplit(url).netloc, []).append((url, headers, verify_ssl))
+
+        if not requests_by_host:
+            return rv
+
+        if self.fetch_deadline is None:
+            self.fetch_deadline = time.time() + settings.SENTRY_SOURCE_FETCH_DEADLINE
+
+        futures = {}
+        for host_requests in six.itervalues(requests_by_host):
+            lanes = min(len(host_requests), settings.SENTRY_SOURCE_FETCH_HOST_CONCURRENCY)
+            for lane in range(lanes):
+                lane_requests = host_requests[lane::lanes]
+                future = _fetch_pool.submit(fetch_sequentially, lane_requests, self.fetch_deadline)
+                futures[future] = lane_requests
+
+        done, not_done = wait(futures, timeout=max(0, self.fetch_deadline - time.time()))
+        for future in done:
+            for url, (result, error) in future.result():
+                if error is None:
+                    cache_file(url, result)
+                    rv[url] = self.validate_scraped_file(url, result)
+                else:
+                    rv[url] = (None, error)
+        for future in not_done:
+            future.cancel()
+            for url, _, _ in futures[future]:
+                rv[url] = (None, FetchDeadlineExceeded(url))
+
+        if not_done:
+            metrics.incr("sourcemaps.fetch_deadline_exceeded", skip_internal=True)
+
+        return rv
+
+    def validate_scraped_file(self, url, result):
+        try:
+            return validate_file(url, result), None
+        except http.BadSource as exc:
+            return None, exc
 
     def populate_source_cache(self, frames):
         """
@@ -821,8 +1022,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
-        for idx, filename in enumerate(pending_file_list):
-            self.cache_source(filename=filename)
+        self.cache_sources(pending_file_list)
 
     def close(self):
         StacktraceProcessor.close(self)
@@ -1,13 +1,16 @@
 from __future__ import absolute_import
 
+import io
 import os
 import six
 import mmap
 import tempfile
 
+from bisect import bisect_right
+from collections import OrderedDict
 from hashlib import sha1
 from uuid import uuid4
-from threading import Semaphore
+from threading import Lock, Semaphore
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
@@ -20,6 +23,7 @@ from django.utils import timezone
 
 from sentry.app import locks
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, JSONField, Model
+from sentry.filestore.cache import get_blob_cache
 from sentry.tasks.files import delete_file as delete_file_task
 from sentry.utils import metrics
 from sentry.utils.retries import TimedRetryPolicy
@@ -32,6 +36,8 @@ DEFAULT_BLOB_SIZE = 1024 * 1024  # one mb
 CHUNK_STATE_HEADER = "__state"
 MULTI_BLOB_UPLOAD_CONCURRENCY = 8
 MAX_FILE_SIZE = 2 ** 31  # 2GB is the maximum offset supported by fileblob
+BLOB_CACHE_SIZE = getattr(settings, "SENTRY_FILE_BLOB_CACHE_SIZE", 64 * 1024 * 1024)  # 64mb
+RANGE_READ_CONCURRENCY = 4
 
 
 class nooplogger(object):
@@ -78,6 +84,52 @@ class AssembleChecksumMismatch(Exception):
     pass
 
 
+class BlobCache(object):
+    """
+    A process wide LRU cache of the contents of recently read blobs, keyed
+    by their checksum. The least recently used blobs are evicted once the
+    total size of the cached contents exceeds ``max_size`` bytes.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._cache = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, checksum):
+        with self._lock:
+            try:
+                contents = self._cache.pop(checksum)
+            except KeyError:
+                return None
+            # re-insert to mark the entry as most recently used
+            self._cache[checksum] = contents
+            return contents
+
+    def set(self, checksum, contents):
+        if len(contents) > self.max_size:
+            return
+
+        with self._lock:
+            old = self._cache.pop(checksum, None)
+            if old is not None:
+                self.size -= len(old)
+            self._cache[checksum] = contents
+            self.size += len(contents)
+            while self.size > self.max_size:
+                _, evicted = self._cache.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.size = 0
+
+
+blob_cache = BlobCache(BLOB_CACHE_SIZE)
+
+
 def get_storage():
     from sentry import options
 
@@ -294,6 +346,9 @@ class FileBlob(Model):
         assert self.path
 
         storage = get_storage()
+        disk_cache = get_blob_cache()
+        if disk_cache is not None and self.checksum:
+            return disk_cache.open(self.checksum, lambda: storage.open(self.path), self.path)
         return storage.open(self.path)
 
 
@@ -455,6 +510,7 @@ class ChunkedFileBlobIndexWrapper(object):
     def __init__(self, indexes, mode=None, prefetch=False, prefetch_to=None, delete=True):
         # eager load from database incase its a queryset
         self._indexes = list(indexes)
+        self._offsets = [idx.offset for idx in self._indexes]
         self._curfile = None
         self._curidx = None
         if prefetch:
@@ -486,7 +542,11 @@ class ChunkedFileBlobIndexWrapper(object):
         try:
             try:
                 self._curidx = six.next(self._idxiter)
-                self._curfile = self._curidx.blob.getfile()
+                contents = blob_cache.get(self._curidx.blob.checksum)
+                if contents is not None:
+                    self._curfile = io.BytesIO(contents)
+                else:
+                    self._curfile = self._curidx.blob.getfile()
             except StopIteration:
                 self._curidx = None
                 self._curfile = None
@@ -494,6 +554,16 @@ class ChunkedFileBlobIndexWrapper(object):
             if old_file is not None:
                 old_file.close()
 
+    def _find_index(self, pos):
+        """
+        Returns the position in ``self._indexes`` of the blob containing the
+        byte at ``pos``.
+        """
+        n = bisect_right(self._offsets, pos) - 1
+        if n < 0:
+            raise ValueError("Cannot seek to pos")
+        return n
+
     @property
     def size(self):
         return sum(i.blob.size for i in self._indexes)
@@ -548,14 +618,10 @@ class ChunkedFileBlobIndexWrapper(object):
 
         if pos < 0:
             raise IOError("Invalid argument")
-        for n, idx in enumerate(self._indexes[::-1]):
-            if idx.offset <= pos:
-                if idx != self._curidx:
-                    self._idxiter = iter(self._indexes[-(n + 1) :])
-                    self._nextidx()
-                break
-        else:
-            raise ValueError("Cannot seek to pos")
+        n = self._find_index(pos)
+        if self._indexes[n] != self._curidx:
+            self._idxiter = iter(self._indexes[n:])
+            self._nextidx()
         self._curfile.seek(pos - self._curidx.offset)
 
     def tell(self):
@@ -574,28 +640,63 @@ class ChunkedFileBlobIndexWrapper(object):
         if self.prefetched:
             return self._curfile.read(n)
 
-        result = bytearray()
+        result = []
 
         # Read to the end of the file
         if n < 0:
             while self._curfile is not None:
-                blob_result = self._curfile.read(32768)
-                if not blob_result:
-                    self._nextidx()
-                else:
-                    result.extend(blob_result)
+                blob_result = self._curfile.read()
+                if blob_result:
+                    result.append(blob_result)
+                self._nextidx()
 
         # Read until a certain number of bytes are read
         else:
             while n > 0 and self._curfile is not None:
-                blob_result = self._curfile.read(min(n, 32768))
+                blob_result = self._curfile.read(n)
                 if not blob_result:
                     self._nextidx()
                 else:
                     n -= len(blob_result)
-                    result.extend(blob_result)
+                    result.append(blob_result)
+
+        return b"".join(result)
+
+    def read_range(self, offset, length):
+        """
+        Reads ``length`` bytes starting at ``offset`` without changing the
+        current position, fetching only the blobs covering the range (in
+        parallel, and from the blob cache where possible.)
+        """
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        if offset < 0 or length < 0:
+            raise IOError("Invalid argument")
+
+        if length == 0 or not self._indexes:
+            return b""
+
+        first = self._find_index(offset)
+        last = self._find_index(offset + length - 1)
+        indexes = self._indexes[first : last + 1]
+
+        def fetch_blob(blob):
+            contents = blob_cache.get(blob.checksum)
+            if contents is None:
+                with blob.getfile() as f:
+                    contents = f.read()
+                blob_cache.set(blob.checksum, contents)
+            return contents
+
+        if len(indexes) == 1:
+            contents = [fetch_blob(indexes[0].blob)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(indexes), RANGE_READ_CONCURRENCY)) as exe:
+                contents = list(exe.map(fetch_blob, [idx.blob for idx in indexes]))
 
-        return bytes(result)
+        start = offset - indexes[0].offset
+        return b"".join(contents)[start : start + length]
 
 
 class FileBlobOwner(Model):
@@ -48,10 +48,12 @@ class OrganizationOptionManager(BaseManager):
             return
         inst.delete()
         self.reload_cache(organization.id)
+        self.update_relay_configs(organization.id)
 
     def set_value(self, organization, key, value):
         self.create_or_update(organization=organization, key=key, values={"value": value})
         self.reload_cache(organization.id)
+        self.update_relay_configs(organization.id)
 
     def get_all_values(self, organization):
         if isinstance(organization, models.Model):
@@ -78,11 +80,19 @@ class OrganizationOptionManager(BaseManager):
         self.__cache[organization_id] = result
         return result
 
+    def update_relay_configs(self, organization_id):
+        # Relay project configs are built from these options.
+        from sentry.tasks.relay import schedule_update_config_cache
+
+        schedule_update_config_cache(organization_id=organization_id)
+
     def post_save(self, instance, **kwargs):
         self.reload_cache(instance.organization_id)
+        self.update_relay_configs(instance.organization_id)
 
     def post_delete(self, instance, **kwargs):
         self.reload_cache(instance.organization_id)
+        self.update_relay_configs(instance.organization_id)
 
     def contribute_to_class(self, model, name):
         super(OrganizationOptionManager, self).contribute_to_class(model, name)
@@ -52,10 +52,12 @@ class ProjectOptionManager(BaseManager):
     def unset_value(self, project, key):
         self.filter(project=project, key=key).delete()
         self.reload_cache(project.id)
+        self.update_relay_configs(project.id)
 
     def set_value(self, project, key, value):
         inst, created = self.create_or_update(project=project, key=key, values={"value": value})
         self.reload_cache(project.id)
+        self.update_relay_configs(project.id)
         return created or inst > 0
 
     def get_all_values(self, project):
@@ -83,11 +85,19 @@ class ProjectOptionManager(BaseManager):
         self.__cache[project_id] = result
         return result
 
+    def update_relay_configs(self, project_id):
+        # Relay project configs are built from these options.
+        from sentry.tasks.relay import schedule_update_config_cache
+
+        schedule_update_config_cache(project_id=project_id)
+
     def post_save(self, instance, **kwargs):
         self.reload_cache(instance.project_id)
+        self.update_relay_configs(instance.project_id)
 
     def post_delete(self, instance, **kwargs):
         self.reload_cache(instance.project_id)
+        self.update_relay_configs(instance.project_id)
 
     def contribute_to_class(self, model, name):
         super(ProjectOptionManager, self).contribute_to_class(model, name)
@@ -53,6 +53,16 @@ class ScheduledDeletion(Model):
     def get_instance(self):
         return self.get_model().objects.get(pk=self.object_id)
 
+    def get_progress(self):
+        """
+        Returns the progress of a sharded deletion, or ``None`` if the
+        deletion hasn't started or doesn't run sharded (see
+        ``DeletionProgress.get_status``.)
+        """
+        from sentry.deletions.progress import DeletionProgress
+
+        return DeletionProgress(self.guid).get_status()
+
     def get_actor(self):
         from sentry.models import User
 
@@ -0,0 +1,129 @@
+from __future__ import absolute_import
+
+import copy
+import six
+
+from collections import OrderedDict
+from django.utils.module_loading import import_string
+
+from sentry.nodestore.base import NodeStorage
+from sentry.utils import metrics
+
+
+class CachedNodeStorage(NodeStorage):
+    """
+    Wraps another node storage backend with a bounded in-process LRU cache of
+    recently written and read nodes.
+
+    >>> CachedNodeStorage(
+    ...     backend='sentry.nodestore.django.DjangoNodeStorage',
+    ...     backend_options={},
+    ...     cache_size=1000,
+    ... )
+
+    Cached entries are invalidated when a node is set or deleted through this
+    instance. As with any other ``NodeStorage`` state, the cache is local to
+    the thread that populated it. Values are copied on the way in and out of
+    the cache, since callers (such as ``NodeData.bind_data``) modify the data
+    they are given.
+    """
+
+    def __init__(self, backend, backend_options=None, cache_size=1000):
+        if isinstance(backend, six.string_types):
+            backend = import_string(backend)(**(backend_options or {}))
+        self.backend = backend
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __getattr__(self, name):
+        # Expose any backend specific methods (such as ``bootstrap``.)
+        if name.startswith("_") or name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _cache_get(self, id):
+        try:
+            data = self._cache.pop(id)
+        except KeyError:
+            return None
+        # re-insert to mark the entry as most recently used
+        self._cache[id] = data
+        return copy.deepcopy(data)
+
+    def _cache_set(self, id, data):
+        self._cache.pop(id, None)
+        if data is None or self.cache_size <= 0:
+            return
+        self._cache[id] = copy.deepcopy(data)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def _cache_delete(self, id):
+        self._cache.pop(id, None)
+
+    def delete(self, id):
+        self._cache_delete(id)
+        self.backend.delete(id)
+
+    def delete_multi(self, id_list):
+        for id in id_list:
+            self._cache_delete(id)
+        self.backend.delete_multi(id_list)
+
+    def get(self, id):
+        data = self._cache_get(id)
+        if data is not None:
+            metrics.incr("nodestore.cache.hit")
+            return data
+
+        metrics.incr("nodestore.cache.miss")
+        data = self.backend.get(id)
+        self._cache_set(id, data)
+        return data
+
+    def get_multi(self, id_list):
+        rv = {}
+        missing = []
+        for id in id_list:
+            data = self._cache_get(id)
+            if data is None:
+                missing.append(id)
+            else:
+                rv[id] = data
+
+        if rv:
+            metrics.incr("nodestore.cache.hit", amount=len(rv))
+
+        if missing:
+            metrics.incr("nodestore.cache.miss", amount=len(missing))
+            results = self.backend.get_multi(missing)
+            for id, data in six.iteritems(results):
+                self._cache_set(id, data)
+                rv[id] = data
+
+        return rv
+
+    def set(self, id, data, ttl=None):
+        self._cache_delete(id)
+        self.backend.set(id, data, ttl=ttl)
+        self._cache_set(id, data)
+
+    def set_multi(self, values):
+        for id in values:
+            self._cache_delete(id)
+        self.backend.set_multi(values)
+        for id, data in six.iteritems(values):
+            self._cache_set(id, data)
+
+    def generate_id(self):
+        return self.backend.generate_id()
+
+    def cleanup(self, cutoff_timestamp):
+        self._cache.clear()
+        self.backend.cleanup(cutoff_timestamp)
+
+    def validate(self):
+        self.backend.validate()
+
+    def setup(self):
+        self.backend.setup()
@@ -87,6 +87,9 @@ register("beacon.anonymous", type=Bool, flags=FLAG_REQUIRED)
 # Filestore
 register("filestore.backend", default="filesystem", flags=FLAG_NOSTORE)
 register("filestore.options", default={"location": "/tmp/sentry-files"}, flags=FLAG_NOSTORE)
+# Host local disk cache for blobs read from the filestore (disabled if empty)
+register("filestore.cache-path", type=String, default="", flags=FLAG_ALLOW_EMPTY | FLAG_NOSTORE)
+register("filestore.cache-size", default=1024 * 1024 * 1024, flags=FLAG_NOSTORE)
 
 # Symbol server
 register("symbolserver.enabled", default=False, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
@@ -157,6 +160,10 @@ register("store.empty-interface-sample-rate", default=0.0)
 # regards to filter responses.
 register("store.lie-about-filter-status", default=False)
 
+# Maximum size of event payloads after decompression, compressed payloads are
+# rejected as soon as they inflate beyond it.
+register("store.max-decompressed-size", default=20 * 1024 * 1024)
+
 # Symbolicator refactors
 # - Disabling minidump stackwalking in endpoints
 register("symbolicator.minidump-refactor-projects-opt-in", type=Sequence, default=[])  # unused
@@ -181,6 +188,25 @@ register("post-process.error-hook-sample-rate", default=0.0)  # unused
 # True => kill switch to disable ingestion of transaction events for internal project.
 register("transaction-events.force-disable-internal-project", default=False)
 
+# Number of workers deleting the rows of each relation of a scheduled
+# deletion in parallel, and the time deleting a chunk of rows should take.
+register("deletions.shards", default=1)
+register("deletions.chunk-latency", default=1.0)
+
+# Number of digests delivered (with their state fetched in bulk) by a single
+# task, or 1 to deliver every digest in its own task.
+register("digests.delivery-batch-size", default=1)
+
+# Limits the number of organizations that (weekly or daily) report tasks are
+# scheduled for at once to this many every interval (in seconds), spreading
+# their load over time. A batch size of 0 schedules all of them at once.
+register("reports.prepare-batch-size", default=0)
+register("reports.prepare-batch-interval", default=60)
+
+# Number of events an unmerge task requests from Snuba at once (and processes
+# in batches of the task's batch size.)
+register("unmerge.page-size", default=5000)
+
 # Moving signals and TSDB into outcomes consumer
 register("outcomes.signals-in-consumer-sample-rate", default=0.0)
 register("outcomes.tsdb-in-consumer-sample-rate", default=0.0)
@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+
+from django.db.models.signals import post_delete, post_save
+
+from sentry.models import Organization, Project, ProjectKey
+from sentry.tasks.relay import schedule_update_config_cache
+
+
+def update_project_config_cache(instance, **kwargs):
+    schedule_update_config_cache(project_id=instance.project_id)
+
+
+def update_project_config_cache_for_project(instance, **kwargs):
+    schedule_update_config_cache(project_id=instance.id)
+
+
+def update_project_config_cache_for_organization(instance, **kwargs):
+    schedule_update_config_cache(organization_id=instance.id)
+
+
+post_save.connect(
+    update_project_config_cache,
+    sender=ProjectKey,
+    dispatch_uid="update_project_config_cache_projectkey",
+    weak=False,
+)
+post_delete.connect(
+    update_project_config_cache,
+    sender=ProjectKey,
+    dispatch_uid="update_project_config_cache_projectkey_delete",
+    weak=False,
+)
+post_save.connect(
+    update_project_config_cache_for_project,
+    sender=Project,
+    dispatch_uid="update_project_config_cache_project",
+    weak=False,
+)
+post_delete.connect(
+    update_project_config_cache_for_project,
+    sender=Project,
+    dispatch_uid="update_project_config_cache_project_delete",
+    weak=False,
+)
+post_save.connect(
+    update_project_config_cache_for_organization,
+    sender=Organization,
+    dispatch_uid="update_project_config_cache_organization",
+    weak=False,
+)
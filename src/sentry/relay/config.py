@@ -17,6 +17,8 @@ from sentry.models.organization import Organization
 from sentry.models.organizationoption import OrganizationOption
 from sentry.models.project import Project
 from sentry.models.projectoption import ProjectOption
+from sentry.utils import metrics
+from sentry.utils.cache import cache
 from sentry.utils.data_filters import FilterTypes, FilterStatKeys
 from sentry.utils.http import get_origins
 from sentry.utils.outcomes import track_outcome, Outcome
@@ -29,6 +31,16 @@ def get_project_key_config(project_key):
     return {"dsn": project_key.dsn_public}
 
 
+# Variants of the project config (``full_config`` and ``for_store``) stored
+# in the cache, and precomputed when the project changes.
+PROJECT_CONFIG_VARIANTS = ((True, False), (False, False), (True, True))
+# Changes to projects, their keys and options and to organizations and their
+# options rebuild the cached configs (see ``sentry.receivers.relay``). Quotas
+# may also depend on inputs that are not tracked (such as system options),
+# which are picked up once the cached configs expire.
+PROJECT_CONFIG_CACHE_TTL = 60 * 5
+
+
 def get_project_config(project_id, full_config=True, for_store=False):
     """
     Constructs the ProjectConfig information.
@@ -52,6 +64,94 @@ def get_project_config(project_id, full_config=True, for_store=False):
     with configure_scope() as scope:
         scope.set_tag("project", project.id)
 
+    return get_project_configs([project], full_config, for_store)[project.id]
+
+
+def get_project_configs(projects, full_config=True, for_store=False):
+    """
+    Returns a mapping of project id to ProjectConfig for a list of projects
+    (see ``get_project_config`` for the parameters.)
+
+    The serialized configs are materialized in the cache, so that they are
+    fetched with a single lookup instead of being rebuilt from the project
+    and organization options, keys and quotas for every request. Configs
+    that are missing from the cache are built and stored.
+    """
+    cache_keys = {
+        project.id: _get_project_config_cache_key(project.id, full_config, for_store)
+        for project in projects
+    }
+    cached = cache.get_many(cache_keys.values()) if cache_keys else {}
+
+    now = datetime.utcnow().replace(tzinfo=utc)
+    rv = {}
+    missing = {}
+    for project in projects:
+        cfg = cached.get(cache_keys[project.id])
+        if cfg is None:
+            cfg = missing[cache_keys[project.id]] = _build_project_config(
+                project, full_config, for_store
+            )
+        rv[project.id] = _make_project_config(project, cfg, full_config, now)
+
+    metrics.incr("relay.projectconfig.cache.hit", amount=len(rv) - len(missing))
+    if missing:
+        metrics.incr("relay.projectconfig.cache.miss", amount=len(missing))
+        cache.set_many(missing, PROJECT_CONFIG_CACHE_TTL)
+
+    return rv
+
+
+def update_project_configs(projects):
+    """
+    Rebuilds all variants of the cached configs of the given projects.
+    """
+    values = {}
+    for project in projects:
+        for full_config, for_store in PROJECT_CONFIG_VARIANTS:
+            key = _get_project_config_cache_key(project.id, full_config, for_store)
+            values[key] = _build_project_config(project, full_config, for_store)
+
+    if values:
+        cache.set_many(values, PROJECT_CONFIG_CACHE_TTL)
+
+
+def invalidate_project_configs(project_ids):
+    """
+    Removes all variants of the cached configs of the given projects.
+    """
+    keys = [
+        _get_project_config_cache_key(project_id, full_config, for_store)
+        for project_id in project_ids
+        for full_config in (True, False)
+        for for_store in (True, False)
+    ]
+    if keys:
+        cache.delete_many(keys)
+
+
+def _get_project_config_cache_key(project_id, full_config, for_store):
+    return u"relay-projectconfig:{}:{}:{}".format(
+        int(bool(full_config)), int(bool(for_store)), project_id
+    )
+
+
+def _make_project_config(project, cfg, full_config, now):
+    if full_config:
+        # Explicitly bind Organization so we don't implicitly query it later
+        # this just allows us to comfortably assure that `project.organization` is safe.
+        # This also allows us to pull the object from cache, instead of being
+        # implicitly fetched from database.
+        project.organization = Organization.objects.get_from_cache(id=project.organization_id)
+
+    return ProjectConfig(project, lastFetch=now, **cfg)
+
+
+def _build_project_config(project, full_config, for_store):
+    """
+    Builds the serialized (cacheable) config of a project, which excludes
+    the time it was fetched at.
+    """
     if for_store:
         project_keys = []
     else:
@@ -76,7 +176,6 @@ def get_project_config(project_id, full_config=True, for_store=False):
     cfg = {
         "disabled": project.status > 0,
         "slug": project.slug,
-        "lastFetch": now,
         "lastChange": project.get_option("sentry:relay-rev-lastchange", now),
         "rev": project.get_option("sentry:relay-rev", uuid.uuid4().hex),
         "publicKeys": public_keys,
@@ -91,16 +190,12 @@ def get_project_config(project_id, full_config=True, for_store=False):
 
     if not full_config:
         # This is all we need for external Relay processors
-        return ProjectConfig(project, **cfg)
+        return cfg
 
     # The organization id is only required for reporting when processing events
     # internally. Do not expose it to external Relays.
     cfg["organization_id"] = project.organization_id
 
-    # Explicitly bind Organization so we don't implicitly query it later
-    # this just allows us to comfortably assure that `project.organization` is safe.
-    # This also allows us to pull the object from cache, instead of being
-    # implicitly fetched from database.
     project.organization = Organization.objects.get_from_cache(id=project.organization_id)
 
     if project.organization is not None:
@@ -147,7 +242,7 @@ def get_project_config(project_id, full_config=True, for_store=False):
     project_cfg["grouping_config"] = get_grouping_config_dict_for_project(project)
     project_cfg["allowed_domains"] = list(get_origins(project))
 
-    return ProjectConfig(project, **cfg)
+    return cfg
 
 
 class _ConfigBase(object):
@@ -48,6 +48,9 @@ class BaseEventFrequencyCondition(EventCondition):
 
     def __init__(self, *args, **kwargs):
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        # Rates may be shared between conditions (of different rules) that
+        # are evaluated for the same event, to avoid querying them twice.
+        self.rates = kwargs.pop("rates", None)
 
         super(BaseEventFrequencyCondition, self).__init__(*args, **kwargs)
 
@@ -71,9 +74,17 @@ class BaseEventFrequencyCondition(EventCondition):
         raise NotImplementedError  # subclass must implement
 
     def get_rate(self, event, interval, environment_id):
+        key = (self.id, event.group_id, interval, environment_id)
+        if self.rates is not None and key in self.rates:
+            return self.rates[key]
+
         _, duration = intervals[interval]
         end = timezone.now()
-        return self.query(event, end - duration, end, environment_id=environment_id)
+        rate = self.query(event, end - duration, end, environment_id=environment_id)
+
+        if self.rates is not None:
+            self.rates[key] = rate
+        return rate
 
 
 class EventFrequencyCondition(BaseEventFrequencyCondition):
@@ -10,6 +10,7 @@ from django.utils import timezone
 
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.event_frequency import BaseEventFrequencyCondition
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
@@ -54,28 +55,64 @@ class RuleProcessor(object):
         self.has_reappeared = has_reappeared
 
         self.grouped_futures = {}
+        self.rates = {}
 
     def get_rules(self):
         return Rule.get_for_project(self.project.id)
 
+    def get_rule_status_cache_key(self, rule):
+        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
+
+    def get_rule_statuses(self, rules):
+        """
+        Returns the ``GroupRuleStatus`` of the group for each of the given
+        rules, keyed by rule id, using a single cache and database lookup.
+        """
+        cache_keys = {rule.id: self.get_rule_status_cache_key(rule) for rule in rules}
+        cached_statuses = cache.get_many(cache_keys.values())
+
+        statuses = {}
+        missing = []
+        for rule in rules:
+            status = cached_statuses.get(cache_keys[rule.id])
+            if status is None:
+                missing.append(rule)
+            else:
+                statuses[rule.id] = status
+
+        if missing:
+            for status in GroupRuleStatus.objects.filter(
+                group=self.group, rule_id__in=[rule.id for rule in missing]
+            ):
+                statuses[status.rule_id] = status
+
+            for rule in missing:
+                if rule.id not in statuses:
+                    statuses[rule.id], _ = GroupRuleStatus.objects.get_or_create(
+                        rule=rule, group=self.group, defaults={"project": self.project}
+                    )
+
+            cache.set_many({cache_keys[rule.id]: statuses[rule.id] for rule in missing}, 300)
+
+        return statuses
+
     def get_rule_status(self, rule):
-        key = "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
-        rule_status = cache.get(key)
-        if rule_status is None:
-            rule_status, _ = GroupRuleStatus.objects.get_or_create(
-                rule=rule, group=self.group, defaults={"project": self.project}
-            )
-            cache.set(key, rule_status, 300)
-        return rule_status
+        return self.get_rule_statuses([rule])[rule.id]
 
-    def condition_matches(self, condition, state, rule):
+    def get_condition(self, condition, rule):
         condition_cls = rules.get(condition["id"])
         if condition_cls is None:
             self.logger.warn("Unregistered condition %r", condition["id"])
             return
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
-        return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
+        if issubclass(condition_cls, BaseEventFrequencyCondition):
+            return condition_cls(self.project, data=condition, rule=rule, rates=self.rates)
+        return condition_cls(self.project, data=condition, rule=rule)
+
+    def condition_matches(self, condition, state):
+        if condition is None:
+            return
+        return safe_execute(condition.passes, self.event, state, _with_transaction=False)
 
     def get_state(self):
         return EventState(
@@ -85,23 +122,30 @@ class RuleProcessor(object):
             has_reappeared=self.has_reappeared,
         )
 
-    def apply_rule(self, rule):
-        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
-        condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-
+    def is_rule_applicable(self, rule):
         # XXX(dcramer): if theres no condition should we really skip it,
         # or should we just apply it blindly?
-        if not condition_list:
-            return
+        if not rule.data.get("conditions", ()):
+            return False
 
         if (
             rule.environment_id is not None
             and self.event.get_environment().id != rule.environment_id
         ):
+            return False
+
+        return True
+
+    def apply_rule(self, rule, status=None):
+        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
+        condition_list = rule.data.get("conditions", ())
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+
+        if not self.is_rule_applicable(rule):
             return
 
-        status = self.get_rule_status(rule)
+        if status is None:
+            status = self.get_rule_status(rule)
 
         now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
@@ -111,7 +155,13 @@ class RuleProcessor(object):
 
         state = self.get_state()
 
-        condition_iter = (self.condition_matches(c, state, rule) for c in condition_list)
+        # Frequency conditions need to query the TSDB, so they are evaluated
+        # last, in case the other conditions already decide the outcome.
+        # (The order does not matter for the result.)
+        conditions = [self.get_condition(c, rule) for c in condition_list]
+        conditions.sort(key=lambda c: isinstance(c, BaseEventFrequencyCondition))
+
+        condition_iter = (self.condition_matches(c, state) for c in conditions)
 
         if match == "all":
             passed = all(condition_iter)
@@ -158,6 +208,10 @@ class RuleProcessor(object):
 
     def apply(self):
         self.grouped_futures.clear()
-        for rule in self.get_rules():
-            self.apply_rule(rule)
+        self.rates.clear()
+
+        rules = [rule for rule in self.get_rules() if self.is_rule_applicable(rule)]
+        statuses = self.get_rule_statuses(rules)
+        for rule in rules:
+            self.apply_rule(rule, statuses[rule.id])
         return six.itervalues(self.grouped_futures)
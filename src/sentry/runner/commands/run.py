@@ -295,6 +295,19 @@ def cron(**options):
     type=click.Choice(["earliest", "latest"]),
     help="Position in the commit log topic to begin reading from when no prior offset has been recorded.",
 )
+@click.option(
+    "--max-batch-size",
+    default=1,
+    type=int,
+    help="How many messages to consume and dispatch tasks for at once.",
+)
+@click.option(
+    "--max-batch-time-ms",
+    "max_batch_time",
+    default=100,
+    type=int,
+    help="How long to wait for a batch of messages to fill up.",
+)
 @log_options()
 @configuration
 def post_process_forwarder(**options):
@@ -308,6 +321,8 @@ def post_process_forwarder(**options):
             synchronize_commit_group=options["synchronize_commit_group"],
             commit_batch_size=options["commit_batch_size"],
             initial_offset_reset=options["initial_offset_reset"],
+            max_batch_size=options["max_batch_size"],
+            max_batch_time=options["max_batch_time"],
         )
     except ForwarderNotRequired:
         sys.stdout.write(
@@ -23,6 +23,13 @@ The public API consists of three main methods:
 - ESTIMATE: used to query the number of times a specific item has been seen,
 - RANKED: used to query the top N items that have been recorded in a sketch.
 
+Two batched variants of these methods allow many unrelated updates or queries
+to be performed with a single script invocation:
+
+- INCR_MULTI: used to record observations of different items in different
+  sketches, and set the expiration time of each sketch,
+- RANKED_MULTI: used to query the top N items for several groups of sketches.
+
 The named command to use is the first item passed as ``ARGV``.  The command is
 followed by the accuracy and storage parameters to use when initializing a new
 sketch:
@@ -53,6 +60,22 @@ To query the top 10 items from the first sketch:
 
     EVALSHA $SHA 2 1:i 1:e RANKED 5 64 50 10
 
+The arguments to INCR_MULTI are a sequence of batches. Each batch consists of
+the number of sketches the batch applies to (which are taken from the
+remaining ``KEYS`` in order), the number of items, the expiration timestamp
+for each sketch, and the score and value of each item. To add "foo" with a
+score of 1 to the two sketches above, and "bar" with a score of 2 to a third
+sketch:
+
+    EVALSHA $SHA 6 1:i 1:e 2:i 2:e 3:i 3:e INCR_MULTI 5 64 50 2 1 1500000000 1500003600 1 foo 1 1 1500000000 2 bar
+
+The arguments to RANKED_MULTI are the limit (a negative limit is treated as
+no limit) followed by the number of sketches in each group. The result is a
+sequence of RANKED results, one for each group. To query the top 10 items
+from the first two sketches combined, and from the third sketch:
+
+    EVALSHA $SHA 6 1:i 1:e 2:i 2:e 3:i 3:e RANKED_MULTI 5 64 50 10 2 1
+
 ]]--
 
 --[[ Helpers ]]--
@@ -429,6 +452,116 @@ function Sketch:import(payload)
 end
 
 
+local function parse_items(arguments, offset, count)
+    local items = {}
+    for i = offset, offset + (count * 2) - 1, 2 do
+        -- The increment value needs to be positive, since we're using the conservative
+        -- update strategy proposed by Estan and Varghese:
+        -- http://www.eecs.harvard.edu/~michaelm/CS223/mice.pdf
+        local delta = tonumber(arguments[i])
+        assert(delta > 0, 'The increment value must be positive and nonzero.')
+
+        local value = arguments[i + 1]
+        table.insert(items, {value, delta})
+    end
+    return items
+end
+
+local function ranked(sketches, limit)
+    -- We only care about sketches that actually exist.
+    sketches = filter(
+        function (sketch)
+            return sketch:exists()
+        end,
+        sketches
+    )
+
+    if #sketches == 0 then
+        return {}
+    end
+
+    -- TODO: There are probably a bunch of performance optimizations that could be made here.
+    -- If no limit is provided, use an implicit limit of the smallest index.
+    if limit == nil then
+        limit = reduce(
+            math.min,
+            map(
+                function (sketch)
+                    return sketch.configuration.index
+                end,
+                sketches
+            )
+        )
+    end
+
+    if #sketches == 1 then
+        local results = {}
+        -- Note that the ZREVRANGE bounds are *inclusive*, so the limit
+        -- needs to be reduced by one to act as a typical slice bound.
+        local members = redis.call('ZREVRANGE', sketches[1].index, 0, limit - 1, 'WITHSCORES')
+        for i=1, #members, 2 do
+            table.insert(
+                results,
+                {
+                    members[i],
+                    string.format('%s', members[i + 1])
+                }
+            )
+        end
+        return results
+    else
+        -- As the first pass, we need to find all of the items to look
+        -- up in all sketches.
+        local items = {}
+        for _, sketch in pairs(sketches) do
+            local members = redis.call('ZRANGE', sketch.index, 0, -1)
+            for _, member in pairs(members) do
+                items[member] = true
+            end
+        end
+
+        local results = {}
+        for value in pairs(items) do
+            table.insert(
+                results,
+                {
+                    value,
+                    sum(
+                        map(
+                            function (sketch)
+                                return sketch:estimate(value)
+                            end,
+                            sketches
+                        )
+                    ),
+                }
+            )
+        end
+
+        local function comparator(x, y)
+            if x[2] == y[2] then
+                return x[1] < y[1]  -- lexicographically by key ascending
+            else
+                return x[2] > y[2]  -- score descending
+            end
+        end
+
+        table.sort(results, comparator)
+
+        -- Trim the results to the limit.
+        local trimmed = {}
+        for i = 1, math.min(limit, #results) do
+            local item, score = unpack(results[i])
+            trimmed[i] = {
+                item,
+                string.format('%s', score)
+            }
+        end
+        return trimmed
+    end
+end
+
+
 --[[ Redis API ]]--
 
 local Command = {}
@@ -476,17 +609,7 @@ return Router:new({
     ]]--
     INCR = Command:new(
         function (sketches, arguments)
-            local items = {}
-            for i = 1, #arguments, 2 do
-                -- The increment value needs to be positive, since we're using the conservative
-                -- update strategy proposed by Estan and Varghese:
-                -- http://www.eecs.harvard.edu/~michaelm/CS223/mice.pdf
-                local delta = tonumber(arguments[i])
-                assert(delta > 0, 'The increment value must be positive and nonzero.')
-
-                local value = arguments[i + 1]
-                table.insert(items, {value, delta})
-            end
+            local items = parse_items(arguments, 1, #arguments / 2)
 
             return map(
                 function (sketch)
@@ -497,6 +620,34 @@ return Router:new({
         end
     ),
 
+    --[[
+    Increment the number of observations for each batch of items in the
+    sketches of that batch, and update the expiration time of the sketches.
+    ]]--
+    INCR_MULTI = Command:new(
+        function (sketches, arguments)
+            local s = 1
+            local i = 1
+            while i <= #arguments do
+                local count = tonumber(arguments[i])
+                local length = tonumber(arguments[i + 1])
+                local expirations = {i + 2, i + 1 + count}
+                i = i + 2 + count
+
+                local items = parse_items(arguments, i, length)
+                i = i + (length * 2)
+
+                for j = expirations[1], expirations[2] do
+                    local sketch = sketches[s]
+                    sketch:increment(items)
+                    redis.call('EXPIREAT', sketch.index, arguments[j])
+                    redis.call('EXPIREAT', sketch.estimates, arguments[j])
+                    s = s + 1
+                end
+            end
+        end
+    ),
+
     --[[
     Estimate the number of observations for each item in all sketches,
     returning a sequence containing scores for items in the order that they
@@ -528,98 +679,32 @@ return Router:new({
     RANKED = Command:new(
         function (sketches, arguments)
             local limit = unpack(arguments)
+            return ranked(sketches, limit)
+        end
+    ),
 
-            -- We only care about sketches that actually exist.
-            sketches = filter(
-                function (sketch)
-                    return sketch:exists()
-                end,
-                sketches
-            )
-
-            if #sketches == 0 then
-                return {}
-            end
-
-            -- TODO: There are probably a bunch of performance optimizations that could be made here.
-            -- If no limit is provided, use an implicit limit of the smallest index.
-            if limit == nil then
-                limit = reduce(
-                    math.min,
-                    map(
-                        function (sketch)
-                            return sketch.configuration.index
-                        end,
-                        sketches
-                    )
-                )
+    --[[
+    Find the most frequently observed items across the sketches of each
+    group, returning a sequence of RANKED results (one for each group.)
+    ]]--
+    RANKED_MULTI = Command:new(
+        function (sketches, arguments)
+            local limit = tonumber(arguments[1])
+            if limit < 0 then
+                limit = nil
             end
 
-            if #sketches == 1 then
-                local results = {}
-                -- Note that the ZREVRANGE bounds are *inclusive*, so the limit
-                -- needs to be reduced by one to act as a typical slice bound.
-                local members = redis.call('ZREVRANGE', sketches[1].index, 0, limit - 1, 'WITHSCORES')
-                for i=1, #members, 2 do
-                    table.insert(
-                        results,
-                        {
-                            members[i],
-                            string.format('%s', members[i + 1])
-                        }
-                    )
-                end
-                return results
-            else
-                -- As the first pass, we need to find all of the items to look
-                -- up in all sketches.
-                local items = {}
-                for _, sketch in pairs(sketches) do
-                    local members = redis.call('ZRANGE', sketch.index, 0, -1)
-                    for _, member in pairs(members) do
-                        items[member] = true
-                    end
-                end
-
-                local results = {}
-                for value in pairs(items) do
-                    table.insert(
-                        results,
-                        {
-                            value,
-                            sum(
-                                map(
-                                    function (sketch)
-                                        return sketch:estimate(value)
-                                    end,
-                                    sketches
-                                )
-                            ),
-                        }
-                    )
-                end
-
-                local function comparator(x, y)
-                    if x[2] == y[2] then
-                        return x[1] < y[1]  -- lexicographically by key ascending
-                    else
-                        return x[2] > y[2]  -- score descending
-                    end
-                end
-
-                table.sort(results, comparator)
-
-                -- Trim the results to the limit.
-                local trimmed = {}
-                for i = 1, math.min(limit, #results) do
-                    local item, score = unpack(results[i])
-                    trimmed[i] = {
-                        item,
-                        string.format('%s', score)
-                    }
+            local results = {}
+            local s = 1
+            for i = 2, #arguments do
+                local group = {}
+                for j = s, s + tonumber(arguments[i]) - 1 do
+                    table.insert(group, sketches[j])
                 end
-                return trimmed
+                s = s + #group
+                table.insert(results, ranked(group, limit))
             end
+            return results
         end
     ),
 
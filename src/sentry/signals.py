@@ -54,8 +54,10 @@ class BetterSignal(Signal):
 buffer_incr_complete = BetterSignal(providing_args=["model", "columns", "extra", "result"])
 event_accepted = BetterSignal(providing_args=["ip", "data", "project"])
 event_discarded = BetterSignal(providing_args=["project"])
-event_dropped = BetterSignal(providing_args=["ip", "data", "project", "reason_code"])
-event_filtered = BetterSignal(providing_args=["ip", "data", "project"])
+# ``count`` is the number of events the signal is sent for (when omitted, it
+# is sent for a single event.)
+event_dropped = BetterSignal(providing_args=["ip", "data", "project", "reason_code", "count"])
+event_filtered = BetterSignal(providing_args=["ip", "data", "project", "count"])
 event_received = BetterSignal(providing_args=["ip", "project"])
 pending_delete = BetterSignal(providing_args=["instance", "actor"])
 event_processed = BetterSignal(providing_args=["project", "event"])
@@ -70,9 +70,21 @@ def _make_index_backend(cluster=None):
             logger.info(u"No redis cluster provided for similarity, using {!r}.".format(index))
             return index
 
+    # Signatures built in compatible mode match the ones that were written to
+    # the original index, while signatures built with a single hash per
+    # feature are kept in a separate namespace so that they are never
+    # compared with each other.
+    compatible = settings.SENTRY_SIMILARITY_COMPATIBLE_SIGNATURES
+
     return MetricsWrapper(
         RedisScriptMinHashIndexBackend(
-            cluster, "sim:1", MinHashSignatureBuilder(16, 0xFFFF), 8, 60 * 60 * 24 * 30, 3, 5000
+            cluster,
+            "sim:1" if compatible else "sim:2",
+            MinHashSignatureBuilder(16, 0xFFFF, compatible=compatible),
+            8,
+            60 * 60 * 24 * 30,
+            3,
+            5000,
         ),
         scope_tag_name="project_id",
     )
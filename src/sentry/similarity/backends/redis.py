@@ -32,14 +32,24 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
         self.retention = retention
         self.candidate_set_limit = candidate_set_limit
 
-    def _build_signature_arguments(self, features):
-        if not features:
-            return [0] * self.bands
-
-        arguments = []
-        for bucket in band(self.bands, self.signature_builder(features)):
-            arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
-        return arguments
+    def _build_signature_arguments(self, feature_sets):
+        # Signatures for all of the (non-empty) feature sets are built with a
+        # single call, since the signature builder is able to batch them.
+        signatures = iter(
+            self.signature_builder.build_many([features for features in feature_sets if features])
+        )
+
+        results = []
+        for features in feature_sets:
+            if not features:
+                results.append([0] * self.bands)
+                continue
+
+            arguments = []
+            for bucket in band(self.bands, next(signatures)):
+                arguments.extend([1, ",".join(map("{}".format, bucket)), 1])
+            results.append(arguments)
+        return results
 
     def __index(self, scope, args):
         # scope must be passed into the script call as a key to allow the
@@ -90,9 +100,12 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
             limit if limit is not None else -1,
         ]
 
-        for idx, threshold, features in items:
+        signature_arguments = self._build_signature_arguments(
+            [features for _, _, features in items]
+        )
+        for (idx, threshold, _), signature in zip(items, signature_arguments):
             arguments.extend([idx, threshold])
-            arguments.extend(self._build_signature_arguments(features))
+            arguments.extend(signature)
 
         return self._as_search_result(self.__index(scope, arguments))
 
@@ -137,9 +150,10 @@ class RedisScriptMinHashIndexBackend(AbstractIndexBackend):
             key,
         ]
 
-        for idx, features in items:
+        signature_arguments = self._build_signature_arguments([features for _, features in items])
+        for (idx, _), signature in zip(items, signature_arguments):
             arguments.append(idx)
-            arguments.extend(self._build_signature_arguments(features))
+            arguments.extend(signature)
 
         return self.__index(scope, arguments)
 
@@ -2,16 +2,98 @@ from __future__ import absolute_import
 
 import mmh3
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def get_base_hash(feature):
+    return mmh3.hash64(feature)[0] & MASK
+
 
 class MinHashSignatureBuilder(object):
-    def __init__(self, columns, rows):
+    """\
+    Builds MinHash signatures for sets of features.
+
+    By default, every feature is hashed once per column, using the column as
+    the ``mmh3`` seed.
+
+    With ``compatible=False``, each feature is hashed once to a 64-bit value
+    instead, and the value for each column is derived from that hash with
+    multiply-shift universal hashing. This is only faster when it can be
+    vectorized with NumPy (which is part of the optional requirements), and
+    the signatures are not comparable with the default ones.
+    """
+
+    def __init__(self, columns, rows, compatible=True):
         self.columns = columns
         self.rows = rows
+        self.compatible = compatible
+
+        # The multipliers need to be odd for multiply-shift hashing.
+        self.coefficients = [
+            (
+                mmh3.hash64(u"a:{}".format(column))[0] & MASK | 1,
+                mmh3.hash64(u"b:{}".format(column))[0] & MASK,
+            )
+            for column in range(columns)
+        ]
+
+        if np is not None:
+            self.__multipliers = np.array([a for a, b in self.coefficients], dtype=np.uint64)
+            self.__increments = np.array([b for a, b in self.coefficients], dtype=np.uint64)
 
     def __call__(self, features):
-        return map(
-            lambda column: min(
-                map(lambda feature: mmh3.hash(feature, column) % self.rows, features)
-            ),
-            range(self.columns),
-        )
+        return self.build_many([features])[0]
+
+    def build_many(self, feature_sets):
+        """\
+        Build signatures for a sequence of feature sets, returning a list of
+        signatures (each a list of ``columns`` integers) in the same order.
+        """
+        feature_sets = [list(features) for features in feature_sets]
+        if not feature_sets:
+            return []
+
+        for features in feature_sets:
+            if not features:
+                raise ValueError("Cannot build a signature for an empty feature set.")
+
+        if self.compatible:
+            return [self.__build_compatible(features) for features in feature_sets]
+        elif np is not None:
+            return self.__build_vectorized(feature_sets)
+        else:
+            return [self.__build(features) for features in feature_sets]
+
+    def __build_compatible(self, features):
+        return [
+            min(mmh3.hash(feature, column) % self.rows for feature in features)
+            for column in range(self.columns)
+        ]
+
+    def __build(self, features):
+        hashes = [get_base_hash(feature) for feature in features]
+        return [
+            min((((a * x + b) & MASK) >> 32) % self.rows for x in hashes)
+            for a, b in self.coefficients
+        ]
+
+    def __build_vectorized(self, feature_sets):
+        offsets = []
+        hashes = []
+        for features in feature_sets:
+            offsets.append(len(hashes))
+            hashes.extend(get_base_hash(feature) for feature in features)
+
+        # Unsigned integer arithmetic wraps around, which gives us the modulo
+        # 2 ** 64 required by the hash family for free.
+        values = np.array(hashes, dtype=np.uint64)[:, np.newaxis]
+        values = (values * self.__multipliers + self.__increments) >> np.uint64(32)
+        values %= np.uint64(self.rows)
+
+        return np.minimum.reduceat(values, offsets, axis=0).tolist()
@@ -1,12 +1,14 @@
 from __future__ import absolute_import
 
+import time
 from uuid import uuid4
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import get_model
+from django.db.models import Max, Min, get_model
 from django.utils import timezone
 
+from sentry import options
 from sentry.constants import ObjectStatus
 from sentry.exceptions import DeleteAborted
 from sentry.signals import pending_delete
@@ -17,6 +19,9 @@ from sentry.tasks.base import instrumented_task, retry
 MAX_RETRIES = 1 if settings.DEBUG else None
 MAX_RETRIES = 1
 
+# Shards of a deletion reschedule themselves after working for this long.
+SHARD_TIME_LIMIT = 60
+
 
 @instrumented_task(name="sentry.tasks.deletion.run_scheduled_deletions", queue="cleanup")
 def run_scheduled_deletions():
@@ -68,12 +73,183 @@ def run_deletion(deletion_id):
         transaction_id=deletion.guid,
         actor_id=deletion.actor_id,
     )
+
+    num_shards = options.get("deletions.shards")
+    if num_shards > 1 and not run_sharded_relations(deletion, task, num_shards):
+        # The shards schedule this task again once they are done.
+        return
+
     has_more = task.chunk()
     if has_more:
         run_deletion.apply_async(kwargs={"deletion_id": deletion_id}, countdown=15)
     deletion.delete()
 
 
+def _get_relation_task(deletion, relation, **kwargs):
+    from sentry import deletions
+
+    params = dict(relation.params, **kwargs)
+    return deletions.get(
+        transaction_id=deletion.guid,
+        actor_id=deletion.actor_id,
+        task=relation.task,
+        target_latency=options.get("deletions.chunk-latency"),
+        **params
+    )
+
+
+def _is_shardable(task):
+    from sentry.deletions import BulkModelDeletionTask, ModelDeletionTask
+
+    # Bulk deletions are single statements with equality filters, which
+    # can't be restricted to a range of ids.
+    return isinstance(task, ModelDeletionTask) and not isinstance(task, BulkModelDeletionTask)
+
+
+def _count_rows(relation):
+    model = relation.params.get("model")
+    if model is None:
+        return None
+    return model.objects.filter(**relation.params["query"]).count()
+
+
+def _get_relation_name(relation):
+    model = relation.params.get("model")
+    if model is None:
+        return relation.task.__name__
+    return u"{}.{}".format(model._meta.app_label, model.__name__)
+
+
+def run_sharded_relations(deletion, task, num_shards):
+    """
+    Deletes the relations of a scheduled deletion's object one after another.
+    Relations that are deleted row by row are split into ``num_shards``
+    ranges of primary keys, which are deleted in parallel by
+    ``run_deletion_shard`` tasks. Other relations are deleted inline for up
+    to ``SHARD_TIME_LIMIT`` seconds before ``run_deletion`` is rescheduled.
+
+    Returns ``True`` once all relations are deleted, or ``False`` if the
+    deletion continues in other tasks.
+    """
+    from sentry.deletions.progress import DeletionProgress
+
+    try:
+        instance = deletion.get_instance()
+    except deletion.get_model().DoesNotExist:
+        # The object itself has been deleted already.
+        return True
+
+    relations = task.get_relations(instance)
+
+    progress = DeletionProgress(deletion.guid)
+    if not progress.exists():
+        task.mark_deletion_in_progress([instance])
+        progress.start([_get_relation_name(relation) for relation in relations])
+
+    deadline = time.time() + SHARD_TIME_LIMIT
+    phase = progress.get_phase()
+    while phase < len(relations):
+        relation = relations[phase]
+        progress.start_relation(phase, lambda: _count_rows(relation))
+        relation_task = _get_relation_task(deletion, relation)
+        if _is_shardable(relation_task):
+            queryset = getattr(relation_task.model, relation_task.manager_name).filter(
+                **relation_task.query
+            )
+            bounds = queryset.aggregate(min_id=Min("id"), max_id=Max("id"))
+            if bounds["min_id"] is not None:
+                min_id, max_id = bounds["min_id"], bounds["max_id"]
+                size = (max_id - min_id) // num_shards + 1
+                ranges = [
+                    (start, min(start + size - 1, max_id))
+                    for start in range(min_id, max_id + 1, size)
+                ]
+                progress.start_shards(phase, len(ranges))
+                for shard_id, (start, end) in enumerate(ranges):
+                    run_deletion_shard.delay(
+                        deletion_id=deletion.id,
+                        phase=phase,
+                        shard_id=shard_id,
+                        min_id=start,
+                        max_id=end,
+                    )
+                return False
+            progress.finish_relation(phase)
+        else:
+            has_more = True
+            while has_more and time.time() < deadline:
+                has_more = relation_task.chunk()
+            if has_more:
+                run_deletion.delay(deletion_id=deletion.id)
+                return False
+            progress.finish_relation(phase)
+        phase += 1
+
+    progress.finish()
+    return True
+
+
+@instrumented_task(
+    name="sentry.tasks.deletion.run_deletion_shard",
+    queue="cleanup",
+    default_retry_delay=60 * 5,
+    max_retries=MAX_RETRIES,
+)
+@retry(exclude=(DeleteAborted,))
+def run_deletion_shard(deletion_id, phase, shard_id, min_id, max_id, query_limit=None, **kwargs):
+    """
+    Deletes the rows of a relation of a scheduled deletion (see
+    ``run_sharded_relations``) with a primary key between ``min_id`` and
+    ``max_id``.
+    """
+    from sentry import deletions
+    from sentry.deletions.progress import DeletionProgress
+    from sentry.models import ScheduledDeletion
+
+    try:
+        deletion = ScheduledDeletion.objects.get(id=deletion_id)
+    except ScheduledDeletion.DoesNotExist:
+        return
+
+    if deletion.aborted:
+        raise DeleteAborted
+
+    task = deletions.get(
+        model=deletion.get_model(),
+        query={"id": deletion.object_id},
+        transaction_id=deletion.guid,
+        actor_id=deletion.actor_id,
+    )
+    try:
+        instance = deletion.get_instance()
+    except deletion.get_model().DoesNotExist:
+        return
+
+    relation = task.get_relations(instance)[phase]
+    query = dict(relation.params["query"], id__gte=min_id, id__lte=max_id)
+    relation_task = _get_relation_task(deletion, relation, query=query, query_limit=query_limit)
+
+    progress = DeletionProgress(deletion.guid)
+    deadline = time.time() + SHARD_TIME_LIMIT
+    has_more = True
+    while has_more and time.time() < deadline:
+        rows_deleted = relation_task.rows_deleted
+        has_more = relation_task.chunk()
+        progress.record(phase, relation_task.rows_deleted - rows_deleted)
+
+    if has_more:
+        run_deletion_shard.delay(
+            deletion_id=deletion_id,
+            phase=phase,
+            shard_id=shard_id,
+            min_id=min_id,
+            max_id=max_id,
+            query_limit=relation_task.query_limit,
+        )
+    elif progress.finish_shard(phase):
+        run_deletion.delay(deletion_id=deletion_id)
+
+
 @instrumented_task(
     name="sentry.tasks.deletion.revoke_api_tokens",
     queue="cleanup",
@@ -1,14 +1,21 @@
 from __future__ import absolute_import
 
 import logging
+import six
+import sys
 import time
 
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from sentry import options
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
-from sentry.digests.notifications import build_digest, split_key
+from sentry.digests.notifications import build_digest, fetch_state_bulk, split_key
 from sentry.models import Project, ProjectOption
 from sentry.tasks.base import instrumented_task
 from sentry.utils import snuba
+from sentry.utils.locking import UnableToAcquireLock
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +37,20 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
+    batch_size = options.get("digests.delivery-batch-size")
+    if batch_size <= 1:
+        for entry in digests.schedule(deadline):
+            deliver_digest.delay(entry.key, entry.timestamp)
+        return
+
+    keys = []
     for entry in digests.schedule(deadline):
-        deliver_digest.delay(entry.key, entry.timestamp)
+        keys.append(entry.key)
+        if len(keys) >= batch_size:
+            deliver_digests.delay(keys)
+            keys = []
+    if keys:
+        deliver_digests.delay(keys)
 
 
 @instrumented_task(name="sentry.tasks.digests.deliver_digest", queue="digests.delivery")
@@ -59,3 +78,103 @@ def deliver_digest(key, schedule_timestamp=None):
 
         if digest:
             plugin.notify_digest(project, digest)
+
+
+@contextmanager
+def open_digests(digests, entries):
+    """
+    Opens the digests for a sequence of ``(key, minimum_delay)`` pairs,
+    yielding an ordered mapping of key to the records of every digest that
+    could be opened. Digests that are locked or not ready are skipped.
+
+    All opened digests are closed when the block exits. If the block raises,
+    they are closed with the exception, so that their records are kept. Keys
+    of digests that fail to close are removed from the mapping.
+    """
+    opened = OrderedDict()
+    contexts = []
+    try:
+        for key, minimum_delay in entries:
+            context = digests.digest(key, minimum_delay=minimum_delay)
+            try:
+                records = list(context.__enter__())
+            except (InvalidState, UnableToAcquireLock) as error:
+                logger.info("Skipped digest delivery: %s", error, exc_info=True)
+                continue
+            contexts.append((key, context))
+            opened[key] = records
+
+        yield opened
+    except Exception:
+        exc_info = sys.exc_info()
+        for key, context in contexts:
+            try:
+                context.__exit__(*exc_info)
+            except Exception:
+                logger.exception("Failed to close digest %r", key)
+        six.reraise(*exc_info)
+    else:
+        for key, context in contexts:
+            try:
+                context.__exit__(None, None, None)
+            except Exception:
+                logger.exception("Failed to close digest %r", key)
+                del opened[key]
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(keys):
+    """
+    Delivers a batch of digests, fetching the state (groups, rules and event
+    and user counts) for all of them with combined queries. Like
+    ``deliver_digest``, every digest is closed before it is delivered.
+    """
+    from sentry import digests
+    from sentry.plugins import plugins
+
+    entries = []
+    for key in keys:
+        plugin_slug, _, project_id = key.split(":", 2)
+        entries.append((key, plugins.get(plugin_slug), int(project_id)))
+    projects = Project.objects.in_bulk(set(project_id for _, _, project_id in entries))
+
+    with snuba.options_override({"consistent": True}):
+        targets = {}
+        minimum_delays = OrderedDict()
+        for key, plugin, project_id in entries:
+            project = projects.get(project_id)
+            if project is None:
+                logger.info("Cannot deliver digest %r due to missing project", key)
+                digests.delete(key)
+                continue
+
+            targets[key] = (plugin, project)
+            minimum_delays[key] = ProjectOption.objects.get_value(
+                project, get_option_key(plugin.get_conf_key(), "minimum_delay")
+            )
+
+        # The digests of the batch are kept open (and locked) until all of
+        # them are built, since their records are only removed when they close.
+        digests_by_key = OrderedDict()
+        with open_digests(digests, minimum_delays.items()) as opened:
+            pending_keys = []
+            pending = []
+            for key, records in opened.items():
+                if records:
+                    pending_keys.append(key)
+                    pending.append((targets[key][1], records))
+
+            states = fetch_state_bulk(pending)
+            for key, (project, records), state in zip(pending_keys, pending, states):
+                digests_by_key[key] = build_digest(project, records, state)
+
+        for key, digest in six.iteritems(digests_by_key):
+            # Digests that failed to close may not have been removed, so they
+            # are not delivered.
+            if not digest or key not in opened:
+                continue
+            plugin, project = targets[key]
+            try:
+                plugin.notify_digest(project, digest)
+            except Exception:
+                logger.exception("Failed to deliver digest %r", key)
@@ -0,0 +1,70 @@
+from __future__ import absolute_import
+
+from sentry.tasks.base import instrumented_task
+from sentry.utils.cache import cache
+
+# Changes to multiple options of a project (or organization) in quick
+# succession only schedule a single update of the cached configs.
+DEBOUNCE_TTL = 60
+
+# Configs are rebuilt with a delay, since they are usually scheduled to be
+# rebuilt from within the transaction that changes them. Configs that were
+# cached from uncommitted rows before then are overwritten by the rebuild.
+UPDATE_DELAY = 10
+
+
+def _get_debounce_key(project_id, organization_id):
+    return u"relay-projectconfig-debounce:{}:{}".format(project_id, organization_id)
+
+
+def schedule_update_config_cache(project_id=None, organization_id=None):
+    """
+    Removes the cached relay configs of a project, or of all projects of an
+    organization, and schedules them to be rebuilt.
+
+    The cached configs are removed immediately, so that configs fetched
+    after this call (and after the change was committed) reflect the change
+    even before the task has run. Configs that are fetched before the change
+    was committed are replaced once the task has run.
+    """
+    from sentry.models import Project
+    from sentry.relay.config import invalidate_project_configs
+
+    if project_id is not None:
+        project_ids = [project_id]
+    else:
+        project_ids = list(
+            Project.objects.filter(organization_id=organization_id).values_list("id", flat=True)
+        )
+
+    if not project_ids:
+        return
+
+    invalidate_project_configs(project_ids)
+
+    if cache.add(_get_debounce_key(project_id, organization_id), True, DEBOUNCE_TTL):
+        update_config_cache.apply_async(
+            kwargs={"project_id": project_id, "organization_id": organization_id},
+            countdown=UPDATE_DELAY,
+        )
+
+
+@instrumented_task(name="sentry.tasks.relay.update_config_cache", queue="relay_config")
+def update_config_cache(project_id=None, organization_id=None, **kwargs):
+    """
+    Rebuilds the cached relay configs of a project, or of all projects of an
+    organization.
+    """
+    from sentry.models import Project
+    from sentry.relay.config import update_project_configs
+
+    # Clear the debounce key first, so that changes made while the configs
+    # are being rebuilt schedule another update.
+    cache.delete(_get_debounce_key(project_id, organization_id))
+
+    if project_id is not None:
+        queryset = Project.objects.filter(id=project_id)
+    else:
+        queryset = Project.objects.filter(organization_id=organization_id)
+
+    update_project_configs(list(queryset))
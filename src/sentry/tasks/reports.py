@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 import pytz
 from django.utils import dateformat, timezone
 
+from sentry import options
 from sentry.app import tsdb
 from sentry.models import (
     Activity,
@@ -40,6 +41,10 @@ logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 30000
 
+# Daily statistics are only stored once the day has been over for this long,
+# so that they include buffered counters and outcomes that are recorded late.
+STATISTICS_DELAY = timedelta(hours=3)
+
 
 def _get_organization_queryset():
     return Organization.objects.filter(status=OrganizationStatus.VISIBLE)
@@ -169,7 +174,72 @@ def _query_tsdb_chunked(func, issue_ids, start, stop, rollup):
     return combined
 
 
-def prepare_project_series(start__stop, project, rollup=60 * 60 * 24):
+DailyStatistics = namedtuple("DailyStatistics", "total blacklisted rejected")
+
+
+def _get_day_timestamps(start, stop, rollup=60 * 60 * 24):
+    return range(int(to_timestamp(start)), int(to_timestamp(stop)), rollup)
+
+
+def query_daily_statistics(start, stop, project_ids):
+    """
+    Query the ``DailyStatistics`` of a set of projects for every day between
+    ``start`` (inclusive) and ``stop`` (exclusive), returning a mapping of
+    project ID to a mapping of day timestamp to statistics. Both bounds must
+    be aligned to UTC days.
+    """
+    rollup = 60 * 60 * 24
+    # The range ends with the last second of the last day, so that it
+    # doesn't include the (incomplete) bucket starting at ``stop``.
+    end = stop - timedelta(seconds=1)
+
+    results = []
+    for model in (
+        tsdb.models.project,
+        tsdb.models.project_total_blacklisted,
+        tsdb.models.project_total_rejected,
+    ):
+        values = {}
+        for chunk in chunked(project_ids, BATCH_SIZE):
+            values.update(tsdb.get_range(model, chunk, start, end, rollup=rollup))
+        results.append({key: dict(points) for key, points in values.items()})
+
+    timestamps = _get_day_timestamps(start, stop)
+    return {
+        project_id: {
+            timestamp: DailyStatistics(
+                *[result.get(project_id, {}).get(timestamp, 0) for result in results]
+            )
+            for timestamp in timestamps
+        }
+        for project_id in project_ids
+    }
+
+
+def _get_daily_series(statistics, field, start, stop):
+    return [
+        (timestamp, getattr(statistics[timestamp], field))
+        for timestamp in _get_day_timestamps(start, stop)
+    ]
+
+
+def _get_daily_sum(statistics, field, start, stop):
+    return sum(value for _, value in _get_daily_series(statistics, field, start, stop))
+
+
+def get_statistics_range(interval):
+    """
+    Returns the range of days that the daily statistics used to prepare the
+    report for ``interval`` need to cover.
+    """
+    start, stop = interval
+    return (
+        min(start, stop - timedelta(days=7 * 4), get_calendar_query_range(interval, 3)[0]),
+        stop,
+    )
+
+
+def prepare_project_series(start__stop, project, rollup=60 * 60 * 24, statistics=None):
     start, stop = start__stop
     resolution, series = tsdb.get_optimal_rollup_series(start, stop, rollup)
     assert resolution == rollup, "resolution does not match requested value"
@@ -180,22 +250,27 @@ def prepare_project_series(start__stop, project, rollup=60 * 60 * 24):
 
     tsdb_range = _query_tsdb_chunked(tsdb.get_range, issue_ids, start, stop, rollup)
 
+    if statistics is not None and rollup == 60 * 60 * 24:
+        totals = _get_daily_series(statistics, "total", start, stop)
+    else:
+        totals = clean(
+            tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
+                project.id
+            ]
+        )
+
     return merge_series(
         reduce(
             merge_series,
             map(clean, tsdb_range.values()),
             clean([(timestamp, 0) for timestamp in series]),
         ),
-        clean(
-            tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
-                project.id
-            ]
-        ),
+        totals,
         lambda resolved, total: (resolved, total - resolved),  # unresolved
     )
 
 
-def prepare_project_aggregates(ignore__stop, project):
+def prepare_project_aggregates(ignore__stop, project, statistics=None):
     # TODO: This needs to return ``None`` for periods that don't have any data
     # (because the project is not old enough) and possibly extrapolate for
     # periods that only have partial periods.
@@ -205,6 +280,8 @@ def prepare_project_aggregates(ignore__stop, project):
     start = stop - (period * segments)
 
     def get_aggregate_value(start, stop):
+        if statistics is not None:
+            return _get_daily_sum(statistics, "total", start, stop)
         return tsdb.get_sums(tsdb.models.project, (project.id,), start, stop, rollup=60 * 60 * 24)[
             project.id
         ]
@@ -215,7 +292,7 @@ def prepare_project_aggregates(ignore__stop, project):
     ]
 
 
-def prepare_project_issue_summaries(interval, project):
+def prepare_project_issue_summaries(interval, project, statistics=None):
     start, stop = interval
 
     queryset = project.group_set.exclude(status=GroupStatus.IGNORED)
@@ -254,18 +331,25 @@ def prepare_project_issue_summaries(interval, project):
 
     new_issue_count = sum(event_counts[id] for id in new_issue_ids)
     reopened_issue_count = sum(event_counts[id] for id in reopened_issue_ids)
-    existing_issue_count = max(
-        tsdb.get_sums(tsdb.models.project, [project.id], start, stop, rollup=rollup)[project.id]
-        - new_issue_count
-        - reopened_issue_count,
-        0,
-    )
+    if statistics is not None:
+        total = _get_daily_sum(statistics, "total", start, stop)
+    else:
+        total = tsdb.get_sums(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
+            project.id
+        ]
+    existing_issue_count = max(total - new_issue_count - reopened_issue_count, 0)
 
     return [new_issue_count, reopened_issue_count, existing_issue_count]
 
 
-def prepare_project_usage_summary(start__stop, project):
+def prepare_project_usage_summary(start__stop, project, statistics=None):
     start, stop = start__stop
+    if statistics is not None:
+        return (
+            _get_daily_sum(statistics, "blacklisted", start, stop),
+            _get_daily_sum(statistics, "rejected", start, stop),
+        )
+
     return (
         tsdb.get_sums(
             tsdb.models.project_total_blacklisted, [project.id], start, stop, rollup=60 * 60 * 24
@@ -316,13 +400,16 @@ def clean_calendar_data(project, series, start, stop, rollup, timestamp=None):
     return map(remove_invalid_values, clean_series(start, stop, rollup, series))
 
 
-def prepare_project_calendar_series(interval, project):
+def prepare_project_calendar_series(interval, project, statistics=None):
     start, stop = get_calendar_query_range(interval, 3)
 
     rollup = 60 * 60 * 24
-    series = tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
-        project.id
-    ]
+    if statistics is not None:
+        series = _get_daily_series(statistics, "total", start, stop)
+    else:
+        series = tsdb.get_range(tsdb.models.project, [project.id], start, stop, rollup=rollup)[
+            project.id
+        ]
 
     return clean_calendar_data(project, series, start, stop, rollup)
 
@@ -332,8 +419,8 @@ def build(name, fields):
 
     cls = namedtuple(name, names)
 
-    def prepare(*args):
-        return cls(*[f(*args) for f in prepare_fields])
+    def prepare(*args, **kwargs):
+        return cls(*[f(*args, **kwargs) for f in prepare_fields])
 
     def merge(target, other):
         return cls(*[f(target[i], other[i]) for i, f in enumerate(merge_fields)])
@@ -366,8 +453,20 @@ Report, prepare_project_report, merge_reports = build(
 
 
 class ReportBackend(object):
-    def build(self, timestamp, duration, project):
-        return prepare_project_report(_to_interval(timestamp, duration), project)
+    def build(self, timestamp, duration, project, statistics=None):
+        return prepare_project_report(
+            _to_interval(timestamp, duration), project, statistics=statistics
+        )
+
+    def fetch_statistics(self, start, stop, organization, projects):
+        """
+        Fetch the daily statistics for a set of projects in the organization
+        for the days between ``start`` and ``stop``, returning a mapping of
+        day timestamp to ``DailyStatistics`` for each project in the order
+        that they were requested.
+        """
+        results = query_daily_statistics(start, stop, [project.id for project in projects])
+        return [results[project.id] for project in projects]
 
     def prepare(self, timestamp, duration, organization):
         """
@@ -395,16 +494,84 @@ class DummyReportBackend(ReportBackend):
 class RedisReportBackend(ReportBackend):
     version = 1
 
-    def __init__(self, cluster, ttl, namespace="r"):
+    def __init__(self, cluster, ttl, namespace="r", statistics_ttl=60 * 60 * 24 * 100):
         self.cluster = cluster
         self.ttl = ttl
         self.namespace = namespace
+        # Daily statistics are kept for as long as any report may use them
+        # (the calendar series cover up to three months.)
+        self.statistics_ttl = statistics_ttl
 
     def __make_key(self, timestamp, duration, organization):
         return u"{}:{}:{}:{}:{}".format(
             self.namespace, self.version, organization.id, int(timestamp), int(duration)
         )
 
+    def __make_statistics_key(self, timestamp, organization):
+        return u"{}:{}:s:{}:{}".format(
+            self.namespace, self.version, organization.id, int(timestamp)
+        )
+
+    def fetch_statistics(self, start, stop, organization, projects):
+        """
+        Fetch the daily statistics for a set of projects, as stored by
+        earlier calls. Any statistics that are missing are queried together
+        and stored for all days that are complete, so that every day only
+        has to be queried once.
+        """
+        if not projects:
+            return []
+
+        project_ids = [project.id for project in projects]
+        with self.cluster.map() as client:
+            responses = [
+                (
+                    timestamp,
+                    client.hmget(self.__make_statistics_key(timestamp, organization), project_ids),
+                )
+                for timestamp in _get_day_timestamps(start, stop)
+            ]
+
+        statistics = {project_id: {} for project_id in project_ids}
+        missing_timestamps = set()
+        missing_project_ids = set()
+        for timestamp, response in responses:
+            for project_id, value in zip(project_ids, response.value):
+                if value is None:
+                    missing_timestamps.add(timestamp)
+                    missing_project_ids.add(project_id)
+                else:
+                    statistics[project_id][timestamp] = DailyStatistics(*json.loads(value))
+
+        if missing_project_ids:
+            results = query_daily_statistics(
+                to_datetime(min(missing_timestamps)),
+                to_datetime(max(missing_timestamps) + 60 * 60 * 24),
+                list(missing_project_ids),
+            )
+            for project_id, values in results.items():
+                for timestamp, value in values.items():
+                    statistics[project_id].setdefault(timestamp, value)
+            self.__store_statistics(organization, results)
+
+        return [statistics[project_id] for project_id in project_ids]
+
+    def __store_statistics(self, organization, results):
+        # Statistics for the current day (and shortly after it) are still
+        # changing, so only days that have been over for a while are stored.
+        cutoff = to_timestamp(timezone.now() - STATISTICS_DELAY)
+        days = {}
+        for project_id, values in results.items():
+            for timestamp, value in values.items():
+                if timestamp + 60 * 60 * 24 <= cutoff:
+                    days.setdefault(timestamp, {})[project_id] = json.dumps(list(value))
+
+        with self.cluster.map() as client:
+            for timestamp, values in days.items():
+                key = self.__make_statistics_key(timestamp, organization)
+                client.hmset(key, values)
+                client.expire(key, self.statistics_ttl)
+
     def __encode(self, report):
         return zlib.compress(json.dumps(list(report)))
 
@@ -415,9 +582,15 @@ class RedisReportBackend(ReportBackend):
         return Report(*json.loads(zlib.decompress(value)))
 
     def prepare(self, timestamp, duration, organization):
+        projects = list(organization.project_set.all())
+        start, stop = get_statistics_range(_to_interval(timestamp, duration))
+        statistics = self.fetch_statistics(start, stop, organization, projects)
+
         reports = {}
-        for project in organization.project_set.all():
-            reports[project.id] = self.__encode(self.build(timestamp, duration, project))
+        for project, project_statistics in zip(projects, statistics):
+            reports[project.id] = self.__encode(
+                self.build(timestamp, duration, project, statistics=project_statistics)
+            )
 
         if not reports:
             # XXX: HMSET requires at least one key/value pair, so we need to
@@ -443,13 +616,62 @@ class RedisReportBackend(ReportBackend):
 backend = RedisReportBackend(redis.clusters.get("default"), 60 * 60 * 3)
 
 
+def _schedule_organization_tasks(task, args, kwargs=None):
+    """
+    Schedules ``task`` for every organization (with the organization ID
+    appended to ``args``.) If ``reports.prepare-batch-size`` is set, only that
+    many tasks become ready every ``reports.prepare-batch-interval`` seconds,
+    which limits how many organizations are processed concurrently.
+    """
+    batch_size = options.get("reports.prepare-batch-size")
+    batch_interval = options.get("reports.prepare-batch-interval")
+
+    organization_ids = _get_organization_queryset().values_list("id", flat=True)
+    for i, organization_id in enumerate(organization_ids):
+        countdown = (i // batch_size) * batch_interval if batch_size > 0 else None
+        task.apply_async(
+            args=tuple(args) + (organization_id,), kwargs=kwargs or {}, countdown=countdown
+        )
+
+
 @instrumented_task(name="sentry.tasks.reports.prepare_reports", queue="reports.prepare")
 def prepare_reports(dry_run=False, *args, **kwargs):
     timestamp, duration = _fill_default_parameters(*args, **kwargs)
+    _schedule_organization_tasks(
+        prepare_organization_report, (timestamp, duration), {"dry_run": dry_run}
+    )
 
-    organization_ids = _get_organization_queryset().values_list("id", flat=True)
-    for organization_id in organization_ids:
-        prepare_organization_report.delay(timestamp, duration, organization_id, dry_run=dry_run)
+
+@instrumented_task(name="sentry.tasks.reports.prepare_statistics", queue="reports.prepare")
+def prepare_statistics(timestamp=None):
+    """
+    Stores the daily statistics of the day before ``timestamp`` for all
+    organizations, so that preparing the weekly reports only has to query
+    the statistics of individual issues.
+    """
+    timestamp, _ = _fill_default_parameters(timestamp=timestamp)
+    _schedule_organization_tasks(prepare_organization_statistics, (timestamp,))
+
+
+@instrumented_task(
+    name="sentry.tasks.reports.prepare_organization_statistics", queue="reports.prepare"
+)
+def prepare_organization_statistics(timestamp, organization_id):
+    try:
+        organization = _get_organization_queryset().get(id=organization_id)
+    except Organization.DoesNotExist:
+        logger.warning(
+            "reports.organization.missing",
+            extra={"timestamp": timestamp, "organization_id": organization_id},
+        )
+        return
+
+    backend.fetch_statistics(
+        to_datetime(timestamp - 60 * 60 * 24),
+        to_datetime(timestamp),
+        organization,
+        list(organization.project_set.all()),
+    )
 
 
 @instrumented_task(name="sentry.tasks.reports.prepare_organization_report", queue="reports.prepare")
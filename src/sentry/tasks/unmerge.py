@@ -5,7 +5,7 @@ from collections import defaultdict, OrderedDict
 
 from django.db import transaction
 
-from sentry import eventstore, eventstream
+from sentry import eventstore, eventstream, options
 from sentry.app import tsdb
 from sentry.constants import DEFAULT_LOGGER_NAME, LOG_LEVELS_MAP
 from sentry.event_manager import generate_culprit
@@ -24,6 +24,10 @@ from sentry.models import (
 )
 from sentry.similarity import features
 from sentry.tasks.base import instrumented_task
+from sentry.utils import json, redis
+from sentry.utils.dates import to_datetime
+from sentry.utils.hashlib import md5_text
+from sentry.utils.iterators import chunked
 from six.moves import reduce
 
 
@@ -329,18 +333,35 @@ def collect_release_data(caches, project, events):
 
 
 def repair_group_release_data(caches, project, events):
-    attributes = collect_release_data(caches, project, events).items()
-    for (group_id, environment, release_id), (first_seen, last_seen) in attributes:
-        instance, created = GroupRelease.objects.get_or_create(
+    attributes = collect_release_data(caches, project, events)
+    if not attributes:
+        return
+
+    # Fetch the existing instances for the batch with a single query, so that
+    # only the missing ones have to be created one by one.
+    existing = {
+        (instance.group_id, instance.environment, instance.release_id): instance
+        for instance in GroupRelease.objects.filter(
             project_id=project.id,
-            group_id=group_id,
-            environment=environment,
-            release_id=release_id,
-            defaults={"first_seen": first_seen, "last_seen": last_seen},
+            group_id__in=set(key[0] for key in attributes),
+            release_id__in=set(key[2] for key in attributes),
         )
+    }
+
+    for (group_id, environment, release_id), (first_seen, last_seen) in attributes.items():
+        instance = existing.get((group_id, environment, release_id))
+        if instance is None:
+            instance, created = GroupRelease.objects.get_or_create(
+                project_id=project.id,
+                group_id=group_id,
+                environment=environment,
+                release_id=release_id,
+                defaults={"first_seen": first_seen, "last_seen": last_seen},
+            )
+            if created:
+                continue
 
-        if not created:
-            instance.update(first_seen=first_seen)
+        instance.update(first_seen=first_seen)
 
 
 def get_event_user_from_interface(value):
@@ -359,18 +380,24 @@ def collect_tsdb_data(caches, project, events):
 
     frequencies = defaultdict(lambda: defaultdict(lambda: defaultdict(lambda: defaultdict(int))))
 
+    # Events are aggregated by the start of the smallest rollup interval they
+    # fall into, which is contained in the same interval of every (larger)
+    # rollup, rather than by their exact timestamp.
+    resolution = min(tsdb.get_rollups())
+
     for event in events:
         environment = caches["Environment"](project.organization_id, get_environment_name(event))
+        timestamp = to_datetime(tsdb.normalize_to_epoch(event.datetime, resolution))
 
-        counters[event.datetime][tsdb.models.group][(event.group_id, environment.id)] += 1
+        counters[timestamp][tsdb.models.group][(event.group_id, environment.id)] += 1
 
         user = event.data.get("user")
         if user:
-            sets[event.datetime][tsdb.models.users_affected_by_group][
+            sets[timestamp][tsdb.models.users_affected_by_group][
                 (event.group_id, environment.id)
             ].add(get_event_user_from_interface(user).tag_value)
 
-        frequencies[event.datetime][tsdb.models.frequent_environments_by_group][event.group_id][
+        frequencies[timestamp][tsdb.models.frequent_environments_by_group][event.group_id][
             environment.id
         ] += 1
 
@@ -384,7 +411,7 @@ def collect_tsdb_data(caches, project, events):
                 caches["Release"](project.organization_id, release).id,
             )
 
-            frequencies[event.datetime][tsdb.models.frequent_releases_by_group][event.group_id][
+            frequencies[timestamp][tsdb.models.frequent_releases_by_group][event.group_id][
                 grouprelease.id
             ] += 1
 
@@ -394,16 +421,25 @@ def collect_tsdb_data(caches, project, events):
 def repair_tsdb_data(caches, project, events):
     counters, sets, frequencies = collect_tsdb_data(caches, project, events)
 
+    # Writes are grouped by their arguments, so that every group of keys is
+    # written with a single (pipelined) call.
+    increments = defaultdict(list)
     for timestamp, data in counters.items():
         for model, keys in data.items():
             for (key, environment_id), value in keys.items():
-                tsdb.incr(model, key, timestamp, value, environment_id=environment_id)
+                increments[(timestamp, environment_id, value)].append((model, key))
+
+    for (timestamp, environment_id, value), items in increments.items():
+        tsdb.incr_multi(items, timestamp, value, environment_id=environment_id)
 
+    records = defaultdict(list)
     for timestamp, data in sets.items():
         for model, keys in data.items():
             for (key, environment_id), values in keys.items():
-                # TODO: This should use `record_multi` rather than `record`.
-                tsdb.record(model, key, values, timestamp, environment_id=environment_id)
+                records[(timestamp, environment_id)].append((model, key, values))
+
+    for (timestamp, environment_id), items in records.items():
+        tsdb.record_multi(items, timestamp, environment_id=environment_id)
 
     for timestamp, data in frequencies.items():
         tsdb.record_frequency_multi(data.items(), timestamp)
@@ -414,8 +450,14 @@ def repair_denormalizations(caches, project, events):
     repair_group_release_data(caches, project, events)
     repair_tsdb_data(caches, project, events)
 
+    # Features can be recorded for many events at once, as long as they all
+    # belong to the same group.
+    events_by_group = OrderedDict()
     for event in events:
-        features.record([event])
+        events_by_group.setdefault(event.group_id, []).append(event)
+
+    for group_events in events_by_group.values():
+        features.record(group_events)
 
 
 def lock_hashes(project_id, source_id, fingerprints):
@@ -441,6 +483,64 @@ def unlock_hashes(project_id, fingerprints):
     ).update(state=GroupHash.State.UNLOCKED)
 
 
+class UnmergeCheckpoint(object):
+    """
+    Persists the state of an unmerge (the destination, the fingerprints that
+    were locked and the last event that was processed) in Redis after every
+    batch, so that a failed unmerge can be resumed (see ``resume_unmerge``)
+    where it left off rather than starting over.
+
+    The checkpoint is identified by the fingerprints that were requested to be
+    unmerged, which every task of the unmerge is passed.
+    """
+
+    ttl = 60 * 60 * 24 * 7
+
+    def __init__(self, project_id, source_id, fingerprints, cluster=None):
+        self.key = u"unmerge:{}:{}:{}".format(
+            project_id, source_id, md5_text(*sorted(fingerprints)).hexdigest()
+        )
+        self.cluster = cluster if cluster is not None else redis.clusters.get("default")
+
+    def _get_client(self):
+        return self.cluster.get_local_client_for_key(self.key)
+
+    def get(self):
+        value = self._get_client().get(self.key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, state):
+        self._get_client().setex(self.key, self.ttl, json.dumps(state))
+
+    def delete(self):
+        self._get_client().delete(self.key)
+
+
+def resume_unmerge(project_id, source_id, fingerprints):
+    """
+    Restarts an unmerge that stopped (e.g. because a task failed) from its
+    last checkpoint, returning whether there was one.
+
+    The batch that was being processed when the unmerge stopped is processed
+    again. Its events are not migrated twice, but the denormalizations that
+    were already repaired for it (such as TSDB counters) may be counted again.
+    """
+    state = UnmergeCheckpoint(project_id, source_id, fingerprints).get()
+    if state is None:
+        return False
+
+    unmerge.delay(
+        project_id,
+        source_id,
+        state["destination_id"],
+        fingerprints,
+        state["actor_id"],
+        last_event=state["page"],
+        batch_size=state["batch_size"],
+    )
+    return True
+
+
 @instrumented_task(name="sentry.tasks.unmerge", queue="unmerge")
 def unmerge(
     project_id,
@@ -453,19 +553,59 @@ def unmerge(
     source_fields_reset=False,
     eventstream_state=None,
 ):
-    # XXX: The queryset chunking logic below is awfully similar to
-    # ``RangeQuerySetWrapper``. Ideally that could be refactored to be able to
-    # be run without iteration by passing around a state object and we could
-    # just use that here instead.
+    # Events are requested from Snuba in pages of (at least) ``unmerge.page-size``
+    # events, which are processed in batches of ``batch_size`` events. Each
+    # task processes one page, and the state of the unmerge is checkpointed
+    # after every batch. ``last_event`` is the event the page starts after.
 
     source = Group.objects.get(project_id=project_id, id=source_id)
 
-    # On the first iteration of this loop, we clear out all of the
-    # denormalizations from the source group so that we can have a clean slate
-    # for the new, repaired data.
-    if last_event is None:
-        fingerprints = lock_hashes(project_id, source_id, fingerprints)
-        truncate_denormalizations(source)
+    checkpoint = UnmergeCheckpoint(project_id, source_id, fingerprints)
+    state = checkpoint.get()
+
+    # Hashes that are still locked by an earlier unmerge of these fingerprints.
+    previous_fingerprints = []
+    if state is not None and last_event is None and state["page"] is not None:
+        # This is a new unmerge of fingerprints whose earlier unmerge stopped
+        # before it completed. It starts over and takes over the locked hashes.
+        logger.info(
+            "unmerge.restarted",
+            extra={"project_id": project_id, "source_id": source_id, "page": state["page"]},
+        )
+        previous_fingerprints = state["fingerprints"]
+        state = None
+
+    if state is None:
+        # On the first iteration of this loop, we clear out all of the
+        # denormalizations from the source group so that we can have a clean
+        # slate for the new, repaired data. (If there is no checkpoint for a
+        # later iteration, it has expired and the task arguments are used.)
+        if last_event is None:
+            locked_fingerprints = set(lock_hashes(project_id, source_id, fingerprints))
+            locked_fingerprints.update(previous_fingerprints)
+            truncate_denormalizations(source)
+        else:
+            locked_fingerprints = fingerprints
+
+        state = {
+            "destination_id": destination_id,
+            "fingerprints": list(locked_fingerprints),
+            "actor_id": actor_id,
+            "batch_size": batch_size,
+            "page": last_event,
+            "cursor": last_event,
+            "source_fields_reset": source_fields_reset,
+            "eventstream_state": eventstream_state,
+        }
+        checkpoint.set(state)
+    elif state["page"] != last_event:
+        # The page this task was scheduled for has already been processed,
+        # so this is a duplicate of a task that already completed.
+        logger.info(
+            "unmerge.page-processed",
+            extra={"project_id": project_id, "source_id": source_id, "last_event": last_event},
+        )
+        return state["destination_id"]
 
     caches = get_caches()
 
@@ -485,18 +625,21 @@ def unmerge(
     # have missed an event with the same timestamp as the last item in the
     # previous batch.
 
+    # A resumed task continues after the last batch that was completed, which
+    # may be in the middle of its page.
+    cursor = state["cursor"]
+
     conditions = []
-    if last_event is not None:
+    if cursor is not None:
         conditions.extend(
             [
-                ["timestamp", "<=", last_event["timestamp"]],
-                [
-                    ["timestamp", "<", last_event["timestamp"]],
-                    ["event_id", "<", last_event["event_id"]],
-                ],
+                ["timestamp", "<=", cursor["timestamp"]],
+                [["timestamp", "<", cursor["timestamp"]], ["event_id", "<", cursor["event_id"]]],
             ]
         )
 
+    page_size = max(options.get("unmerge.page-size"), batch_size)
+
     events = eventstore.get_events(
         filter=eventstore.Filter(
             project_ids=[project_id], group_ids=[source.id], conditions=conditions
@@ -504,58 +647,74 @@ def unmerge(
         # We need the text-only "search message" from Snuba, not the raw message
         # dict field from nodestore.
         additional_columns=[eventstore.Columns.MESSAGE],
-        limit=batch_size,
+        limit=page_size,
         referrer="unmerge",
         orderby=["-timestamp", "-event_id"],
     )
 
-    # If there are no more events to process, we're done with the migration.
-    if not events:
-        unlock_hashes(project_id, fingerprints)
-        logger.warning("Unmerge complete (eventstream state: %s)", eventstream_state)
-        if eventstream_state:
-            eventstream.end_unmerge(eventstream_state)
+    locked_fingerprints = set(state["fingerprints"])
 
-        return destination_id
+    for batch in chunked(events, batch_size):
+        # Node data is only fetched for one batch at a time.
+        Event.objects.bind_nodes(batch, "data")
 
-    Event.objects.bind_nodes(events, "data")
+        source_events = []
+        destination_events = []
 
-    source_events = []
-    destination_events = []
+        for event in batch:
+            (
+                destination_events
+                if get_fingerprint(event) in locked_fingerprints
+                else source_events
+            ).append(event)
 
-    for event in events:
-        (destination_events if get_fingerprint(event) in fingerprints else source_events).append(
-            event
+        if source_events:
+            if not state["source_fields_reset"]:
+                source.update(**get_group_creation_attributes(caches, source_events))
+                state["source_fields_reset"] = True
+            else:
+                source.update(**get_group_backfill_attributes(caches, source, source_events))
+
+        (state["destination_id"], state["eventstream_state"]) = migrate_events(
+            caches,
+            project,
+            source_id,
+            state["destination_id"],
+            state["fingerprints"],
+            destination_events,
+            state["actor_id"],
+            state["eventstream_state"],
         )
+        # The destination has to be checkpointed as soon as it exists, so that
+        # a resumed unmerge doesn't create another one.
+        checkpoint.set(state)
 
-    if source_events:
-        if not source_fields_reset:
-            source.update(**get_group_creation_attributes(caches, source_events))
-            source_fields_reset = True
-        else:
-            source.update(**get_group_backfill_attributes(caches, source, source_events))
+        repair_denormalizations(caches, project, batch)
 
-    (destination_id, eventstream_state) = migrate_events(
-        caches,
-        project,
-        source_id,
-        destination_id,
-        fingerprints,
-        destination_events,
-        actor_id,
-        eventstream_state,
-    )
+        state["cursor"] = {"timestamp": batch[-1].timestamp, "event_id": batch[-1].event_id}
+        checkpoint.set(state)
+
+    # If there are no more events to process, we're done with the migration.
+    if len(events) < page_size:
+        unlock_hashes(project_id, state["fingerprints"])
+        logger.warning("Unmerge complete (eventstream state: %s)", state["eventstream_state"])
+        if state["eventstream_state"]:
+            eventstream.end_unmerge(state["eventstream_state"])
+
+        checkpoint.delete()
+        return state["destination_id"]
 
-    repair_denormalizations(caches, project, events)
+    state["page"] = state["cursor"]
+    checkpoint.set(state)
 
     unmerge.delay(
         project_id,
         source_id,
-        destination_id,
-        fingerprints,
-        actor_id,
-        last_event={"timestamp": events[-1].timestamp, "event_id": events[-1].event_id},
+        state["destination_id"],
+        list(fingerprints),
+        state["actor_id"],
+        last_event=state["page"],
         batch_size=batch_size,
-        source_fields_reset=source_fields_reset,
-        eventstream_state=eventstream_state,
+        source_fields_reset=state["source_fields_reset"],
+        eventstream_state=state["eventstream_state"],
     )
@@ -36,8 +36,11 @@ def Feature(names):
     elif not isinstance(names, collections.Mapping):
         names = {k: True for k in names}
 
-    with patch("sentry.features.has") as features_has:
+    with patch("sentry.features.has") as features_has, patch(
+        "sentry.features.has_many"
+    ) as features_has_many:
         features_has.side_effect = lambda x, *a, **k: names.get(x, False)
+        features_has_many.side_effect = lambda xs, *a, **k: {x: names.get(x, False) for x in xs}
         yield
 
 
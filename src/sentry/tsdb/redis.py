@@ -110,6 +110,10 @@ class RedisTSDB(BaseTSDB):
 
     DEFAULT_SKETCH_PARAMETERS = SketchParameters(3, 128, 50)
 
+    # The maximum number of keys and arguments passed to a single batched
+    # frequency table script invocation.
+    frequency_batch_size = 1000
+
     def __init__(self, prefix="ts:", vnodes=64, **options):
         self.cluster, options = get_cluster_from_options("SENTRY_TSDB_OPTIONS", options)
         self.prefix = prefix
@@ -307,7 +311,10 @@ class RedisTSDB(BaseTSDB):
                         for environment_id, promises in results.items():
                             total = sum([int(p.value) for p in promises if p.value])
                             if total:
-                                destination_hash_key, destination_hash_field = self.make_counter_key(
+                                (
+                                    destination_hash_key,
+                                    destination_hash_field,
+                                ) = self.make_counter_key(
                                     model, rollup, timestamp, destination, environment_id
                                 )
                                 client.hincrby(destination_hash_key, destination_hash_field, total)
@@ -615,6 +622,54 @@ class RedisTSDB(BaseTSDB):
         prefix = self.make_key(model, rollup, timestamp, key, environment_id)
         return map(operator.methodcaller("format", prefix), ("{}:i", "{}:e"))
 
+    def execute_frequency_batches(self, cluster, command, parameters, requests):
+        """\
+        Execute a sequence of ``(routing key, keys, arguments)`` requests to
+        the frequency table script as batched ``command`` invocations, so that
+        all of the requests routed to the same host are performed with as few
+        script calls as possible.
+
+        Returns a list containing the result of each request, in the same
+        order as the requests were provided.
+        """
+        router = cluster.get_router()
+
+        # Requests are accumulated into batches for each host. Since the
+        # arguments are unpacked onto the Lua stack when they are parsed, a
+        # batch is split when it would grow beyond ``frequency_batch_size``.
+        batches = {}
+        commands = defaultdict(list)
+        indices = defaultdict(list)
+        for index, (key, keys, arguments) in enumerate(requests):
+            host = router.get_host_for_key(key)
+            batch = batches.get(host)
+            if (
+                batch is None
+                or len(batch[1]) + len(batch[2]) + len(keys) + len(arguments)
+                > self.frequency_batch_size
+            ):
+                batch = batches[host] = (
+                    key,
+                    [],
+                    [command] + list(self.DEFAULT_SKETCH_PARAMETERS) + parameters,
+                    [],
+                )
+                commands[key].append((CountMinScript, batch[1], batch[2]))
+                indices[key].append(batch[3])
+
+            batch[1].extend(keys)
+            batch[2].extend(arguments)
+            batch[3].append(index)
+
+        results = [None] * len(requests)
+        for key, responses in cluster.execute_commands(commands).items():
+            for batch, response in zip(indices[key], responses):
+                if response.value is not None:
+                    for index, value in zip(batch, response.value):
+                        results[index] = value
+
+        return results
+
     def record_frequency_multi(self, requests, timestamp=None, environment_id=None):
         self.validate_arguments([model for model, request in requests], [environment_id])
 
@@ -629,39 +684,36 @@ class RedisTSDB(BaseTSDB):
         for (cluster, durable), environment_ids in self.get_cluster_groups(
             set([None, environment_id])
         ):
-            commands = {}
+            batch = []
 
             for model, request in requests:
                 for key, items in six.iteritems(request):
+                    if not items:
+                        continue
+
                     keys = []
-                    expirations = {}
+                    expirations = []
 
                     # Figure out all of the keys we need to be incrementing, as
                     # well as their expiration policies.
                     for rollup, max_values in six.iteritems(self.rollups):
+                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
                         for environment_id in environment_ids:
-                            chunk = self.make_frequency_table_keys(
-                                model, rollup, ts, key, environment_id
+                            keys.extend(
+                                self.make_frequency_table_keys(
+                                    model, rollup, ts, key, environment_id
+                                )
                             )
-                            keys.extend(chunk)
+                            expirations.append(expiry)
 
-                        expiry = self.calculate_expiry(rollup, max_values, timestamp)
-                        for k in chunk:
-                            expirations[k] = expiry
-
-                    arguments = ["INCR"] + list(self.DEFAULT_SKETCH_PARAMETERS)
+                    arguments = [len(expirations), len(items)] + expirations
                     for member, score in items.items():
                         arguments.extend((score, member))
 
-                    # Since we're essentially merging dictionaries, we need to
-                    # append this to any value that already exists at the key.
-                    cmds = commands.setdefault(key, [])
-                    cmds.append((CountMinScript, keys, arguments))
-                    for k, t in expirations.items():
-                        cmds.append(("EXPIREAT", k, t))
+                    batch.append((key, keys, arguments))
 
             try:
-                cluster.execute_commands(commands)
+                self.execute_frequency_batches(cluster, "INCR_MULTI", [], batch)
             except Exception:
                 if durable:
                     raise
@@ -676,23 +728,24 @@ class RedisTSDB(BaseTSDB):
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
 
-        arguments = ["RANKED"] + list(self.DEFAULT_SKETCH_PARAMETERS)
-        if limit is not None:
-            arguments.append(int(limit))
-
-        commands = {}
+        keys = list(keys)
+        requests = []
         for key in keys:
             ks = []
             for timestamp in series:
                 ks.extend(
                     self.make_frequency_table_keys(model, rollup, timestamp, key, environment_id)
                 )
-            commands[key] = [(CountMinScript, ks, arguments)]
+            requests.append((key, ks, [len(series)]))
 
-        results = {}
         cluster, _ = self.get_cluster(environment_id)
-        for key, responses in cluster.execute_commands(commands).items():
-            results[key] = [(member, float(score)) for member, score in responses[0].value]
+        responses = self.execute_frequency_batches(
+            cluster, "RANKED_MULTI", [int(limit) if limit is not None else -1], requests
+        )
+
+        results = {}
+        for key, response in zip(keys, responses):
+            results[key] = [(member, float(score)) for member, score in response]
 
         return results
 
@@ -706,28 +759,33 @@ class RedisTSDB(BaseTSDB):
 
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
 
-        arguments = ["RANKED"] + list(self.DEFAULT_SKETCH_PARAMETERS)
-        if limit is not None:
-            arguments.append(int(limit))
-
-        commands = {}
+        keys = list(keys)
+        requests = []
         for key in keys:
-            commands[key] = [
-                (
-                    CountMinScript,
-                    self.make_frequency_table_keys(model, rollup, timestamp, key, environment_id),
-                    arguments,
+            for timestamp in series:
+                requests.append(
+                    (
+                        key,
+                        self.make_frequency_table_keys(
+                            model, rollup, timestamp, key, environment_id
+                        ),
+                        [1],
+                    )
                 )
-                for timestamp in series
-            ]
+
+        cluster, _ = self.get_cluster(environment_id)
+        responses = self.execute_frequency_batches(
+            cluster, "RANKED_MULTI", [int(limit) if limit is not None else -1], requests
+        )
 
         def unpack_response(response):
-            return {item: float(score) for item, score in response.value}
+            return {item: float(score) for item, score in response}
 
         results = {}
-        cluster, _ = self.get_cluster(environment_id)
-        for key, responses in cluster.execute_commands(commands).items():
-            results[key] = zip(series, map(unpack_response, responses))
+        for i, key in enumerate(keys):
+            results[key] = zip(
+                series, map(unpack_response, responses[i * len(series) : (i + 1) * len(series)]),
+            )
 
         return results
 
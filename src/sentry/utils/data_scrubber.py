@@ -2,12 +2,30 @@ from __future__ import absolute_import
 
 import re
 import six
+from functools32 import lru_cache
 from six.moves.urllib.parse import urlsplit, urlunsplit
 
 from sentry.constants import DEFAULT_SCRUBBED_FIELDS, FILTER_MASK, NOT_SCRUBBED_VALUES
 from sentry.utils.safe import get_path
 
 
+# Sensitive fields are configured per project, so only few distinct sets of
+# them are in use at any time.
+FIELDS_RE_CACHE_SIZE = 1000
+
+
+@lru_cache(maxsize=FIELDS_RE_CACHE_SIZE)
+def compile_fields_re(fields):
+    """
+    Compiles a (frozen) set of sensitive fields into a single pattern that
+    matches strings containing any of them, or returns ``None`` if the set is
+    empty.
+    """
+    if not fields:
+        return None
+    return re.compile(u"|".join(re.escape(field) for field in sorted(fields)))
+
+
 def varmap(func, var, context=None, name=None):
     """
     Executes ``func(key_name, value)`` on all values
@@ -66,6 +84,7 @@ class SensitiveDataFilter(object):
             fields += DEFAULT_SCRUBBED_FIELDS
         self.exclude_fields = {f.lower() for f in exclude_fields}
         self.fields = set(fields)
+        self.fields_re = compile_fields_re(frozenset(self.fields))
 
     def apply(self, data):
         # TODO(dcramer): move this into each interface
@@ -122,16 +141,15 @@ class SensitiveDataFilter(object):
             if "//" in value and "@" in value:
                 value = self.URL_PASSWORD_RE.sub(r"\1" + FILTER_MASK + "@", value)
 
-        if isinstance(value, six.string_types):
-            str_value = value.lower()
-        else:
-            str_value = ""
+        if self.fields_re is None:
+            return value
 
-        for field in self.fields:
-            if field in str_value:
-                return FILTER_MASK
-            if field in key and value not in NOT_SCRUBBED_VALUES:
+        if isinstance(value, six.string_types):
+            if self.fields_re.search(value.lower()):
                 return FILTER_MASK
+
+        if key and self.fields_re.search(key) and value not in NOT_SCRUBBED_VALUES:
+            return FILTER_MASK
         return value
 
     def filter_stacktrace(self, data):
@@ -4,8 +4,8 @@ import re
 from functools32 import lru_cache
 
 
-@lru_cache(maxsize=500)
-def _translate(pat, doublestar=False):
+def translate(pat, doublestar=False):
+    """Translates a glob pattern into an unanchored regular expression."""
     i, n = 0, len(pat)
     res = []
     while i < n:
@@ -42,8 +42,12 @@ def _translate(pat, doublestar=False):
                 res.append("[%s]" % stuff)
         else:
             res.append(re.escape(c))
-    res.append("\Z(?ms)")
-    return re.compile("".join(res))
+    return "".join(res)
+
+
+@lru_cache(maxsize=500)
+def _translate(pat, doublestar=False):
+    return re.compile(translate(pat, doublestar=doublestar) + "\Z(?ms)")
 
 
 def glob_match(value, pat, doublestar=False, ignorecase=False, path_normalize=False):
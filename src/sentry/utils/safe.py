@@ -58,40 +58,71 @@ def trim(
 
     The method of truncation depends on the type of value.
     """
-    options = {
-        "max_depth": max_depth,
-        "max_size": max_size,
-        "object_hook": object_hook,
-        "_depth": _depth + 1,
-    }
+    return _trim(value, max_size, max_depth, object_hook, _depth, _size)[0]
 
+
+def _measure(value, size):
+    """
+    Returns the length of ``value`` as text and as it appears in the text of
+    a container, given the size returned for it by ``_trim``.
+    """
+    if size is not None:
+        return size, size
+    if isinstance(value, six.text_type):
+        return len(value), len(repr(value))
+    return len(force_text(value)), len(repr(value))
+
+
+def _trim(value, max_size, max_depth, object_hook, _depth, _size):
+    """
+    Returns the trimmed value along with the length of its text, so that the
+    size of a container can be computed from the sizes of its items instead
+    of serializing all of them again at every level.
+
+    The length is only known for the containers built here (where it equals
+    the length of their ``repr``), and ``None`` otherwise.
+    """
     if _depth > max_depth:
         if not isinstance(value, six.string_types):
             value = json.dumps(value)
-        return trim(value, _size=_size, max_size=max_size)
+        return _trim(value, max_size, 6, None, 0, _size)
 
-    elif isinstance(value, dict):
+    size = None
+
+    if isinstance(value, dict):
         result = {}
+        size = 2
         _size += 2
         for k in sorted(value.keys()):
             v = value[k]
-            trim_v = trim(v, _size=_size, **options)
+            trim_v, trim_size = _trim(v, max_size, max_depth, object_hook, _depth + 1, _size)
             result[k] = trim_v
-            _size += len(force_text(trim_v)) + 1
+            text_size, repr_size = _measure(trim_v, trim_size)
+            size += len(repr(k)) + 2 + repr_size
+            _size += text_size + 1
             if _size >= max_size:
                 break
+        if result:
+            size += 2 * (len(result) - 1)
 
     elif isinstance(value, (list, tuple)):
         result = []
+        size = 2
         _size += 2
         for v in value:
-            trim_v = trim(v, _size=_size, **options)
+            trim_v, trim_size = _trim(v, max_size, max_depth, object_hook, _depth + 1, _size)
             result.append(trim_v)
-            _size += len(force_text(trim_v))
+            text_size, repr_size = _measure(trim_v, trim_size)
+            size += repr_size
+            _size += text_size
             if _size >= max_size:
                 break
+        if result:
+            size += 2 * (len(result) - 1)
         if isinstance(value, tuple):
             result = tuple(result)
+            if len(result) == 1:
+                size += 1
 
     elif isinstance(value, six.string_types):
         result = truncatechars(value, max_size - _size)
@@ -100,8 +131,8 @@ def trim(
         result = value
 
     if object_hook is None:
-        return result
-    return object_hook(result)
+        return result, size
+    return object_hook(result), None
 
 
 def trim_pairs(iterable, max_items=settings.SENTRY_MAX_DICTIONARY_ITEMS, **kwargs):
@@ -10,12 +10,14 @@ import os
 import pytz
 import re
 import six
+import threading
 import time
 import urllib3
 import uuid
 
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from django.conf import settings
+from django.core.cache import cache
 
 from sentry import quotas
 from sentry.models import (
@@ -30,6 +32,7 @@ from sentry.models import (
 from sentry.net.http import connection_from_url
 from sentry.utils import metrics, json
 from sentry.utils.dates import to_timestamp
+from sentry.utils.hashlib import md5_text
 
 # TODO remove this when Snuba accepts more than 500 issues
 MAX_ISSUES = 500
@@ -297,6 +300,11 @@ _snuba_pool = connection_from_url(
 )
 _query_thread_pool = ThreadPoolExecutor(max_workers=10)
 
+# Queries that are currently being sent to snuba by this process, keyed by
+# their cache key, so that identical concurrent queries share one request.
+_inflight_queries = {}
+_inflight_queries_lock = threading.Lock()
+
 
 epoch_naive = datetime(1970, 1, 1, tzinfo=None)
 
@@ -853,47 +861,112 @@ def raw_query(
     return bulk_raw_query([snuba_params], referrer=referrer)[0]
 
 
+def _get_query_cache_key(body):
+    return u"snuba:query:{}".format(md5_text(body).hexdigest())
+
+
+def _get_query_cache_ttl(query_params):
+    """
+    Returns how long (in seconds) the result of a query may be cached. The
+    further the end of the queried time window lies in the past, the less
+    likely its results are to change.
+    """
+    end = parse_datetime(query_params["to_date"])
+    age = (datetime.utcnow() - end).total_seconds()
+    for max_age, ttl in settings.SENTRY_SNUBA_CACHE_TTLS:
+        if max_age is None or age < max_age:
+            return ttl
+
+
+def _coalesce_query(key, func):
+    """
+    Calls `func`, unless a query with the same key is already in flight, in
+    which case its result (or exception) is shared instead.
+    """
+    with _inflight_queries_lock:
+        future = _inflight_queries.get(key)
+        coalesced = future is not None
+        if not coalesced:
+            future = _inflight_queries[key] = Future()
+
+    if coalesced:
+        return future.result(), True
+
+    try:
+        result = func()
+    except Exception as error:
+        future.set_exception(error)
+        raise
+    else:
+        future.set_result(result)
+        return result, False
+    finally:
+        with _inflight_queries_lock:
+            del _inflight_queries[key]
+
+
 def bulk_raw_query(snuba_param_list, referrer=None):
     headers = {}
     if referrer:
         headers["referer"] = referrer
 
     query_param_list = map(_prepare_query_params, snuba_param_list)
+    bodies = [json.dumps(query_params) for query_params, _, _ in query_param_list]
+
+    use_cache = settings.SENTRY_SNUBA_CACHE_ENABLED
+    if use_cache:
+        cache_keys = map(_get_query_cache_key, bodies)
+        cached_results = cache.get_many(cache_keys)
+    metric_tags = {"referrer": referrer or "unknown"}
 
-    def snuba_query(params):
-        query_params, forward, reverse = params
+    def send_query(body):
         try:
             with timer("snuba_query"):
-                return (
-                    _snuba_pool.urlopen(
-                        "POST", "/query", body=json.dumps(query_params), headers=headers
-                    ),
-                    forward,
-                    reverse,
-                )
+                response = _snuba_pool.urlopen("POST", "/query", body=body, headers=headers)
         except urllib3.exceptions.HTTPError as err:
             raise SnubaError(err)
+        return response.status, response.data
+
+    def snuba_query(index):
+        query_params, forward, reverse = query_param_list[index]
+        body = bodies[index]
+        if not use_cache:
+            return send_query(body), forward, reverse
+
+        key = cache_keys[index]
+        result = cached_results.get(key)
+        if result is not None:
+            metrics.incr("snuba.client.cache.hit", tags=metric_tags)
+            return result, forward, reverse
+
+        result, coalesced = _coalesce_query(key, lambda: send_query(body))
+        if coalesced:
+            metrics.incr("snuba.client.cache.coalesced", tags=metric_tags)
+        else:
+            metrics.incr("snuba.client.cache.miss", tags=metric_tags)
+            status, _ = result
+            if status == 200:
+                cache.set(key, result, _get_query_cache_ttl(query_params))
+        return result, forward, reverse
 
     if len(snuba_param_list) > 1:
-        query_results = _query_thread_pool.map(snuba_query, query_param_list)
+        query_results = _query_thread_pool.map(snuba_query, range(len(snuba_param_list)))
     else:
         # No need to submit to the thread pool if we're just performing a
         # single query
-        query_results = [snuba_query(query_param_list[0])]
+        query_results = [snuba_query(0)]
 
     results = []
-    for response, _, reverse in query_results:
+    for (status, data), _, reverse in query_results:
         try:
-            body = json.loads(response.data)
+            body = json.loads(data)
         except ValueError:
-            raise UnexpectedResponseError(
-                u"Could not decode JSON response: {}".format(response.data)
-            )
+            raise UnexpectedResponseError(u"Could not decode JSON response: {}".format(data))
 
-        if response.status != 200:
+        if status != 200:
             if body.get("error"):
                 error = body["error"]
-                if response.status == 429:
+                if status == 429:
                     raise RateLimitExceeded(error["message"])
                 elif error["type"] == "schema":
                     raise SchemaValidationError(error["message"])
@@ -904,7 +977,7 @@ def bulk_raw_query(snuba_param_list, referrer=None):
                 else:
                     raise SnubaError(error["message"])
             else:
-                raise SnubaError(u"HTTP {}".format(response.status))
+                raise SnubaError(u"HTTP {}".format(status))
 
         # Forward and reverse translation maps from model ids to snuba keys, per column
         body["data"] = [reverse(d) for d in body["data"]]
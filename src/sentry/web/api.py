@@ -37,6 +37,7 @@ from sentry.coreapi import (
     Auth,
     APIError,
     APIForbidden,
+    APIPayloadTooLarge,
     APIRateLimited,
     ClientApiHelper,
     ClientAuthHelper,
@@ -645,17 +646,22 @@ class StoreView(APIView):
 
         remote_addr = request.META["REMOTE_ADDR"]
 
-        event_manager = EventManager(
-            data,
-            project=project,
-            key=key,
-            auth=auth,
-            client_ip=remote_addr,
-            user_agent=helper.context.agent,
-            version=auth.version,
-            content_encoding=request.META.get("HTTP_CONTENT_ENCODING", ""),
-            project_config=project_config,
-        )
+        try:
+            event_manager = EventManager(
+                data,
+                project=project,
+                key=key,
+                auth=auth,
+                client_ip=remote_addr,
+                user_agent=helper.context.agent,
+                version=auth.version,
+                content_encoding=request.META.get("HTTP_CONTENT_ENCODING", ""),
+                project_config=project_config,
+                max_decompressed_size=options.get("store.max-decompressed-size"),
+            )
+        except APIPayloadTooLarge:
+            track_outcome(organization_id, project_id, key.id, Outcome.INVALID, "too_large")
+            raise
         del data
 
         self.pre_normalize(event_manager, helper)
@@ -10,6 +10,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 
 from sentry.api.event_search import (
+    _parse_query_cached,
     convert_endpoint_params,
     event_search_grammar,
     get_filter,
@@ -580,6 +581,77 @@ class ParseSearchQueryTest(unittest.TestCase):
         assert parse_search_query("") == []
 
 
+class ParseSimpleQueryTest(unittest.TestCase):
+    def test_matches_grammar(self):
+        queries = [
+            "",
+            "hello",
+            "hello world",
+            "user.email:foo@example.com",
+            "!user.email:foo@example.com",
+            "hello user.email:foo@example.com world again",
+            "url:http://example.com/?a=b release:1.2.3 random:",
+            "key:value:with:colons random:*wild*",
+            "assigned:me firstSeen:foo",
+        ]
+        for query in queries:
+            expected = SearchVisitor().visit(event_search_grammar.parse(query))
+            assert SearchVisitor().parse_simple_query(query) == expected
+
+    def test_invalid(self):
+        for query in ("timestamp:hello", "transaction.duration:hello"):
+            with pytest.raises(InvalidSearchQuery):
+                SearchVisitor().parse_simple_query(query)
+
+    def test_fallback(self):
+        queries = [
+            "has:user.email",
+            "is:unresolved",
+            "tags[foo]:bar",
+            "random:123",
+            "timestamp:>2015-05-18",
+            "timestamp:-24h",
+            "timestamp:2015-05-18",
+            "timestamp>2015-05-18",
+            'user.email:"foo bar"',
+            "(a:b OR c:d)",
+            "a:b OR c:d",
+            "a:b ORc:d",
+            "a:b  c:d",
+            " a:b",
+            "a:b\tc:d",
+        ]
+        for query in queries:
+            assert SearchVisitor().parse_simple_query(query) is None, query
+
+
+class ParseSearchQueryCacheTest(unittest.TestCase):
+    def setUp(self):
+        _parse_query_cached.cache_clear()
+
+    def test_cached(self):
+        query = "hello user.email:foo@example.com"
+        result = parse_search_query(query)
+        result.append(None)
+        assert parse_search_query(query) == result[:-1]
+        assert _parse_query_cached.cache_info().hits == 1
+
+    def test_relative_dates_not_cached(self):
+        query = "timestamp:-24h"
+        with freeze_time("2019-01-01"):
+            first = parse_search_query(query)
+        with freeze_time("2019-01-02"):
+            second = parse_search_query(query)
+        assert first[0].value.raw_value != second[0].value.raw_value
+        assert _parse_query_cached.cache_info().currsize == 0
+
+    def test_errors_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(InvalidSearchQuery):
+                parse_search_query("timestamp:hello")
+        assert _parse_query_cached.cache_info().currsize == 0
+
+
 class ParseBooleanSearchQueryTest(unittest.TestCase):
     def setUp(self):
         super(ParseBooleanSearchQueryTest, self).setUp()
@@ -2,7 +2,6 @@
 
 from __future__ import absolute_import
 
-import pytest
 import mock
 
 from datetime import datetime
@@ -89,8 +88,6 @@ class RedisBufferTest(TestCase):
         self.buf.process("foo")
         process.assert_called_once_with(Group, columns, filters, extra)
 
-    # this test should be passing once we no longer serialize using pickle
-    @pytest.mark.xfail
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr", mock.Mock())
     def test_incr_saves_to_redis(self):
@@ -123,6 +120,35 @@ class RedisBufferTest(TestCase):
         pending = client.zrange("b:p", 0, -1)
         assert pending == ["foo"]
 
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_incr_multi(self, process):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        # Values that can't be represented in JSON are pickled.
+        data = {"foo": ("bar", 1)}
+        self.buf.incr_multi(
+            [
+                (Group, {"times_seen": 1}, {"pk": 1}, {"last_seen": now, "score": 1.5}),
+                (Project, {"times_seen": 2}, {"pk": 2}, None),
+                (Group, {"times_seen": 1}, {"pk": 1}, {"culprit": u"f\xf6o", "data": data}),
+            ]
+        )
+
+        client = self.buf.cluster.get_routing_client()
+        group_key = self.buf._make_key(Group, {"pk": 1})
+        project_key = self.buf._make_key(Project, {"pk": 2})
+        assert sorted(client.zrange("b:p", 0, -1)) == sorted([group_key, project_key])
+        assert client.hget(group_key, "f") == '{"pk":["i","1"]}'
+        assert client.hget(group_key, "e+last_seen") == '["d","1493791566.000000"]'
+
+        self.buf.process(batch_keys=[group_key, project_key])
+        process.assert_any_call(
+            Group,
+            {"times_seen": 2},
+            {"pk": 1},
+            {"last_seen": now, "score": 1.5, "culprit": u"f\xf6o", "data": data},
+        )
+        process.assert_any_call(Project, {"times_seen": 2}, {"pk": 2}, {})
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr")
     @mock.patch("sentry.buffer.redis.process_pending")
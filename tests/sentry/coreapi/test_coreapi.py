@@ -2,16 +2,25 @@
 
 from __future__ import absolute_import
 
+import base64
+import gzip
 import six
 import pytest
+import zlib
+
+from six import BytesIO
 
 from sentry.coreapi import (
     APIError,
+    APIPayloadTooLarge,
     APIUnauthorized,
     Auth,
     ClientApiHelper,
     ClientAuthHelper,
+    decode_and_decompress_data,
     decode_data,
+    decompress_deflate,
+    decompress_gzip,
     safely_load_json_string,
 )
 from sentry.interfaces.base import get_interface
@@ -81,6 +90,55 @@ def test_invalid_data():
         decode_data("\x99")
 
 
+def gzip_compress(data):
+    fp = BytesIO()
+    f = gzip.GzipFile(fileobj=fp, mode="wb")
+    f.write(data)
+    f.close()
+    return fp.getvalue()
+
+
+def test_decompress_deflate():
+    assert decompress_deflate(zlib.compress(b'{"foo": "bar"}')) == u'{"foo": "bar"}'
+
+    with pytest.raises(APIError):
+        decompress_deflate(b"foo")
+    with pytest.raises(APIError):
+        decompress_deflate(zlib.compress(b'{"foo": "bar"}')[:-4])
+
+
+def test_decompress_gzip():
+    assert decompress_gzip(gzip_compress(b'{"foo": "bar"}')) == u'{"foo": "bar"}'
+    # Concatenated members are read like a single file.
+    assert decompress_gzip(gzip_compress(b"foo") + gzip_compress(b"bar") + b"\x00") == u"foobar"
+
+    with pytest.raises(APIError):
+        decompress_gzip(b"foo")
+    with pytest.raises(APIError):
+        decompress_gzip(gzip_compress(b'{"foo": "bar"}')[:-4])
+    with pytest.raises(APIError):
+        decompress_gzip(b"")
+
+
+def test_decode_and_decompress_data():
+    encoded = base64.b64encode(zlib.compress(b'{"foo": "bar"}'))
+    assert decode_and_decompress_data(encoded) == u'{"foo": "bar"}'
+    assert decode_and_decompress_data(base64.b64encode(b"foo")) == u"foo"
+
+
+def test_decompress_max_size():
+    data = b"x" * 10000
+    assert decompress_deflate(zlib.compress(data), max_size=10000) == data.decode("utf-8")
+    assert decompress_gzip(gzip_compress(data), max_size=10000) == data.decode("utf-8")
+
+    with pytest.raises(APIPayloadTooLarge):
+        decompress_deflate(zlib.compress(data), max_size=9999)
+    with pytest.raises(APIPayloadTooLarge):
+        decompress_gzip(gzip_compress(data[:5000]) + gzip_compress(data), max_size=10000)
+    with pytest.raises(APIPayloadTooLarge):
+        decode_and_decompress_data(base64.b64encode(zlib.compress(data)), max_size=100)
+
+
 def test_get_interface_does_not_let_through_disallowed_name():
     with pytest.raises(ValueError):
         get_interface("subprocess")
@@ -0,0 +1,60 @@
+from __future__ import absolute_import
+
+from django.core.cache import cache
+
+from sentry.db.models.manager import BaseManager
+from sentry.models import Organization, Project
+from sentry.testutils import TestCase
+
+
+class GetManyFromCacheTest(TestCase):
+    def test_pk(self):
+        projects = [self.create_project(), self.create_project(), self.create_project()]
+        ids = [projects[2].id, projects[0].id, 0]
+        cache.clear()
+
+        # The first lookup populates the cache with a single query.
+        with self.assertNumQueries(1):
+            assert Project.objects.get_many_from_cache("id", ids) == [projects[2], projects[0]]
+
+        # Values that do not exist are not cached.
+        with self.assertNumQueries(0):
+            assert Project.objects.get_many_from_cache("pk", ids[:2]) == [projects[2], projects[0]]
+            assert Project.objects.get_from_cache(id=projects[0].id) == projects[0]
+
+        # Missing values are fetched with a single query.
+        with self.assertNumQueries(1):
+            assert Project.objects.get_many_from_cache("id", [p.id for p in projects]) == projects
+
+    def test_cache_field(self):
+        orgs = [self.create_organization(), self.create_organization()]
+        slugs = [orgs[1].slug, orgs[0].slug, "missing"]
+        cache.clear()
+
+        with self.assertNumQueries(1):
+            assert Organization.objects.get_many_from_cache("slug", slugs) == [orgs[1], orgs[0]]
+
+        with self.assertNumQueries(0):
+            assert Organization.objects.get_many_from_cache("slug", slugs[:2]) == [
+                orgs[1],
+                orgs[0],
+            ]
+            assert Organization.objects.get_from_cache(slug=orgs[0].slug) == orgs[0]
+
+    def test_local_cache(self):
+        project = self.create_project()
+        Project.objects.get_many_from_cache("id", [project.id])
+
+        with BaseManager.local_cache():
+            with self.assertNumQueries(0):
+                assert Project.objects.get_many_from_cache("id", [project.id]) == [project]
+
+            project.update(name="foo")
+            # The request local cache is not invalidated.
+            assert Project.objects.get_many_from_cache("id", [project.id])[0].name != "foo"
+
+        assert Project.objects.get_many_from_cache("id", [project.id])[0].name == "foo"
+
+    def test_uncached_field(self):
+        project = self.create_project()
+        assert Project.objects.get_many_from_cache("slug", [project.slug, "missing"]) == [project]
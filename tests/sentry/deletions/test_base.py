@@ -0,0 +1,56 @@
+from __future__ import absolute_import
+
+from sentry import deletions
+from sentry.deletions import BulkModelDeletionTask, ModelDeletionTask
+from sentry.models import Group
+from sentry.testutils import TestCase
+
+
+class AdaptChunkSizeTest(TestCase):
+    def get_task(self, task=ModelDeletionTask, **kwargs):
+        return deletions.get(task=task, model=Group, query={"id": 1}, **kwargs)
+
+    def test_without_target_latency(self):
+        task = self.get_task()
+        assert task.adapt_chunk_size(100, 10.0) == 100
+        assert task.adapt_chunk_size(100, 0.001) == 100
+
+    def test_scales_to_target_latency(self):
+        task = self.get_task(target_latency=1.0)
+        assert task.adapt_chunk_size(100, 0.8) == 125
+        assert task.adapt_chunk_size(100, 1.25) == 80
+        # by at most a factor of two at a time
+        assert task.adapt_chunk_size(100, 0.001) == 200
+        assert task.adapt_chunk_size(100, 0) == 200
+        assert task.adapt_chunk_size(100, 60.0) == 50
+
+    def test_bounds(self):
+        task = self.get_task(target_latency=1.0)
+        assert task.adapt_chunk_size(1, 60.0) == 1
+        assert task.adapt_chunk_size(1000, 0.001) == 1000
+
+        task = self.get_task(task=BulkModelDeletionTask, target_latency=1.0)
+        assert task.adapt_chunk_size(1000, 60.0) == 1000
+        assert task.adapt_chunk_size(100000, 0.001) == 100000
+
+    def test_chunk(self):
+        project = self.create_project()
+        groups = [self.create_group(project=project) for _ in range(4)]
+        task = deletions.get(
+            task=ModelDeletionTask,
+            model=Group,
+            query={"project_id": project.id},
+            query_limit=1,
+            chunk_size=1,
+            target_latency=60.0,
+        )
+        assert task.chunk()
+        assert task.query_limit == 2
+        assert task.rows_deleted == 1
+        assert task.chunk()
+        assert task.query_limit == 4
+        assert task.rows_deleted == 3
+        assert task.chunk()
+        assert task.rows_deleted == 4
+        assert not task.chunk()
+        assert not Group.objects.filter(id__in=[g.id for g in groups]).exists()
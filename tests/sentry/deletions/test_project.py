@@ -1,5 +1,7 @@
 from __future__ import absolute_import
 
+import mock
+
 from sentry.models import (
     Commit,
     CommitAuthor,
@@ -21,6 +23,7 @@ from sentry.models import (
 )
 from sentry.tasks.deletion import run_deletion
 from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
 
 
 class DeleteProjectTest(TestCase):
@@ -89,3 +92,61 @@ class DeleteProjectTest(TestCase):
         assert Commit.objects.filter(id=commit.id).exists()
         assert not ProjectDebugFile.objects.filter(id=dif.id).exists()
         assert not File.objects.filter(id=file.id).exists()
+
+    def test_sharded(self):
+        project = self.create_project(name="test")
+        groups = [self.create_group(project=project) for _ in range(5)]
+        for group in groups:
+            self.create_event(group=group)
+            GroupMeta.objects.create(group=group, key="foo", value="bar")
+        env = Environment.objects.create(
+            organization_id=project.organization_id, project_id=project.id, name="foo"
+        )
+        env.add_project(project)
+
+        deletion = ScheduledDeletion.schedule(project, days=0)
+        deletion.update(in_progress=True)
+
+        with self.tasks(), override_options({"deletions.shards": 3}):
+            run_deletion(deletion.id)
+
+        assert not Project.objects.filter(id=project.id).exists()
+        assert not EnvironmentProject.objects.filter(project_id=project.id).exists()
+        assert not Group.objects.filter(project_id=project.id).exists()
+        assert not Event.objects.filter(project_id=project.id).exists()
+        assert not GroupMeta.objects.filter(group__in=groups).exists()
+        assert not ScheduledDeletion.objects.filter(id=deletion.id).exists()
+
+        status = deletion.get_progress()
+        assert status["finished"]
+        assert status["eta"] == 0
+        assert status["deleted"] == status["total"]
+        relations = {r["name"]: r for r in status["relations"]}
+        assert relations["sentry.Group"]["total"] == 5
+        assert relations["sentry.Group"]["deleted"] == 5
+        assert relations["sentry.Group"]["shards"] == 3
+        assert relations["sentry.Group"]["shards_done"] == 3
+        assert relations["sentry.Event"]["deleted"] == 5
+
+    def test_sharded_time_limit(self):
+        project = self.create_project(name="test")
+        deletion = ScheduledDeletion.schedule(project, days=0)
+        deletion.update(in_progress=True)
+
+        with override_options({"deletions.shards": 3}), mock.patch(
+            "sentry.tasks.deletion.SHARD_TIME_LIMIT", 0
+        ), mock.patch.object(run_deletion, "delay") as delay:
+            run_deletion(deletion.id)
+
+        # Relations that can't be sharded are deleted until the time limit,
+        # then the deletion continues in another task.
+        delay.assert_called_once_with(deletion_id=deletion.id)
+        assert Project.objects.filter(id=project.id).exists()
+        assert ScheduledDeletion.objects.filter(id=deletion.id).exists()
+
+        status = deletion.get_progress()
+        assert not status["finished"]
+        assert status["phase"] == 0
+        # Rows are only counted once their relation is started.
+        assert status["relations"][0]["total"] == 1
+        assert all(r["total"] is None for r in status["relations"][1:])
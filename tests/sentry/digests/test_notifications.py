@@ -1,6 +1,8 @@
 from __future__ import absolute_import
 
 from collections import OrderedDict, defaultdict
+from datetime import timedelta
+from django.utils import timezone
 from exam import fixture
 from six.moves import reduce
 
@@ -8,13 +10,17 @@ from sentry.digests import Record
 from sentry.digests.notifications import (
     Notification,
     event_to_record,
+    fetch_state,
+    fetch_state_bulk,
     rewrite_record,
     group_records,
     sort_group_contents,
     sort_rule_groups,
 )
+from sentry.app import tsdb
 from sentry.models import Rule
 from sentry.testutils import TestCase
+from sentry.utils.dates import to_timestamp
 
 
 class RewriteRecordTestCase(TestCase):
@@ -102,3 +108,50 @@ class SortRecordsTestCase(TestCase):
                 (rules[0], OrderedDict(((groups[0], []),))),
             )
         )
+
+
+class FetchStateBulkTestCase(TestCase):
+    def test_matches_fetch_state(self):
+        digests = []
+        for i in range(3):
+            project = self.create_project()
+            rule = project.rule_set.all()[0]
+            records = []
+            for j in range(i + 1):
+                group = self.create_group(project=project)
+                event = self.create_event(
+                    group=group, datetime=timezone.now() - timedelta(hours=j * 3, minutes=i)
+                )
+                tsdb.incr(tsdb.models.group, group.id, timestamp=event.datetime, count=j + 1)
+                tsdb.record(
+                    tsdb.models.users_affected_by_group,
+                    group.id,
+                    ["user:%d" % k for k in range(i + 2)],
+                    timestamp=event.datetime,
+                )
+                records.append(
+                    Record(
+                        event.event_id, Notification(event, [rule.id]), to_timestamp(event.datetime)
+                    ),
+                )
+            # Records are returned in reverse chronological order.
+            records.sort(key=lambda record: record.timestamp, reverse=True)
+            digests.append((project, records))
+
+        states = fetch_state_bulk(digests)
+        assert len(states) == len(digests)
+        for (project, records), state in zip(digests, states):
+            assert state == fetch_state(project, records)
+            assert state["event_counts"]
+
+    def test_groups_are_copied(self):
+        rule = self.project.rule_set.all()[0]
+        event = self.create_event(group=self.group)
+        records = [
+            Record(event.event_id, Notification(event, [rule.id]), to_timestamp(event.datetime))
+        ]
+        first, second = fetch_state_bulk([(self.project, records), (self.project, records)])
+        assert first["groups"][self.group.id] is not second["groups"][self.group.id]
+
+    def test_empty(self):
+        assert fetch_state_bulk([]) == []
@@ -9,9 +9,11 @@ import uuid
 
 from collections import namedtuple
 from datetime import datetime, timedelta
+from django.db import IntegrityError
 from django.utils import timezone
 from time import time
 
+from sentry import buffer
 from sentry.app import tsdb
 from sentry.constants import MAX_VERSION_LENGTH
 from sentry.event_manager import HashDiscarded, EventManager, EventUser
@@ -99,6 +101,23 @@ class EventManagerTest(TestCase):
 
         assert Event.objects.count() == 1
 
+    @mock.patch("sentry.event_manager.eventstream.insert")
+    def test_duplicate_event_increments_group(self, eventstream_insert):
+        manager = EventManager(make_event(message="foo", checksum="a" * 32))
+        manager.normalize()
+        group = manager.save(1).group
+
+        # The group is incremented before the event is saved, so that an event
+        # that was saved concurrently still counts once.
+        manager = EventManager(make_event(message="foo", checksum="a" * 32))
+        manager.normalize()
+        with mock.patch.object(Event, "save", side_effect=IntegrityError), mock.patch.object(
+            buffer, "incr"
+        ) as incr:
+            manager.save(1)
+
+        assert incr.call_args[0][:3] == (Group, {"times_seen": 1}, {"id": group.id})
+
     def test_updates_group(self):
         timestamp = time() - 300
         manager = EventManager(
@@ -7,7 +7,9 @@ from datetime import datetime
 from django.conf import settings
 
 from sentry.constants import MAX_CULPRIT_LENGTH, DEFAULT_LOGGER_NAME
+from sentry.coreapi import APIError
 from sentry.event_manager import EventManager
+from sentry.utils import json
 
 
 def make_event(**kwargs):
@@ -223,3 +225,56 @@ def test_environment_tag_removed(environment):
     data = manager.get_data()
     assert "environment" not in dict(data.get("tags") or ())
     assert data["environment"] == "production"
+
+
+@pytest.mark.parametrize(
+    "event",
+    [
+        make_event(),
+        make_event(tags={"foo": "bar"}, **{"sentry.interfaces.User": {"id": "1"}}),
+        make_event(message=u"\u2603", extra={"foo": [1, 2.5, None]}),
+        make_event(logentry={"message": "Hello %s", "params": ["foo"]}),
+    ],
+)
+def test_normalizes_raw_json(event):
+    manager = EventManager(event)
+    manager.normalize()
+    expected = dict(manager.get_data())
+    expected.pop("received")
+
+    manager = EventManager(json.dumps(event).encode("utf-8"))
+    manager.normalize()
+    data = dict(manager.get_data())
+    data.pop("received")
+
+    assert data == expected
+
+
+def test_raw_json_with_legacy_message():
+    payload = (
+        b'{"message": "Hello foo", '
+        b'"sentry.interfaces.Message": {"message": "Hello %s", "params": ["foo"]}}'
+    )
+    manager = EventManager(payload)
+    manager.normalize()
+    assert manager.get_data()["logentry"] == {"formatted": "Hello foo"}
+
+    expected = EventManager(json.loads(payload))
+    expected.normalize()
+    assert manager.get_data()["logentry"] == expected.get_data()["logentry"]
+
+
+def test_raw_json_is_parsed_on_access():
+    manager = EventManager(json.dumps(make_event()).encode("utf-8"))
+    assert manager.get_data()["event_id"] == "a" * 32
+    manager.normalize()
+    assert manager.get_data()["logentry"] == {"formatted": "foo"}
+
+
+def test_invalid_raw_json():
+    with pytest.raises(APIError):
+        EventManager(b'{"message": "\xff"}')
+
+    manager = EventManager(b'{"message": ')
+    with pytest.raises(APIError):
+        manager.normalize()
@@ -1,6 +1,9 @@
 from __future__ import absolute_import
 
-from sentry import eventstore
+import mock
+
+from sentry import eventstore, nodestore
+from sentry.models import SnubaEvent
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import iso_format, before_now
 from sentry.eventstore.base import EventStorage
@@ -36,3 +39,27 @@ class EventStorageTest(TestCase):
         self.eventstorage.bind_nodes([event, event2], "data")
         assert event.data._node_data is not None
         assert event.data["user"]["id"] == u"user1"
+
+    def test_defer_nodes(self):
+        events = []
+        for event_id in ("a" * 32, "b" * 32):
+            event = SnubaEvent(
+                {
+                    "event_id": event_id,
+                    "group_id": 1,
+                    "project_id": self.project.id,
+                    "timestamp": iso_format(before_now(minutes=1)),
+                }
+            )
+            nodestore.set(event.data.id, {"user": {"id": event_id}})
+            events.append(event)
+
+        self.eventstorage.defer_nodes(events, "data")
+        assert all(event.data._node_data is None for event in events)
+
+        with mock.patch.object(nodestore, "get_multi", wraps=nodestore.get_multi) as get_multi:
+            assert events[1].data["user"]["id"] == "b" * 32
+            assert events[0].data["user"]["id"] == "a" * 32
+
+        assert get_multi.call_count == 1
+        assert all(event.data.batch is None for event in events)
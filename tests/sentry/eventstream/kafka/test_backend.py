@@ -0,0 +1,63 @@
+from __future__ import absolute_import
+
+import mock
+import pytest
+from confluent_kafka import TopicPartition
+
+from sentry.eventstream.kafka.backend import KafkaEventStream
+from tests.sentry.eventstream.kafka.test_consumer import MockMessage
+
+
+@pytest.fixture
+def consumer():
+    with mock.patch(
+        "sentry.eventstream.kafka.backend.SynchronizedConsumer"
+    ) as SynchronizedConsumer:
+        consumer = SynchronizedConsumer.return_value
+
+        def subscribe(topics, on_assign=None, on_revoke=None):
+            on_assign(consumer, [TopicPartition("events", 0), TopicPartition("events", 1)])
+
+        consumer.subscribe.side_effect = subscribe
+        consumer.commit.return_value = []
+        consumer.get_lag.return_value = 0
+        yield consumer
+
+
+@mock.patch("sentry.eventstream.kafka.backend.get_task_kwargs_for_message")
+@mock.patch.object(KafkaEventStream, "_dispatch_post_process_group_tasks")
+def test_forwarder_batches(dispatch, get_task_kwargs_for_message, consumer):
+    consumer.consume.side_effect = [
+        [
+            MockMessage("events", 0, 10, "a"),
+            MockMessage("events", 1, 20, "b"),
+            MockMessage("events", 0, 11, "c"),
+        ],
+        [],
+        [MockMessage("events", 1, 21, "d")],
+        KeyboardInterrupt(),
+    ]
+    get_task_kwargs_for_message.side_effect = lambda value: (
+        None if value == "c" else {"value": value}
+    )
+
+    KafkaEventStream().run_post_process_forwarder(
+        "consumer",
+        "commit-log",
+        "synchronize",
+        commit_batch_size=3,
+        max_batch_size=3,
+        max_batch_time=500,
+    )
+
+    assert consumer.consume.call_args_list[0] == mock.call(3, 0.5)
+    assert dispatch.call_args_list == [
+        mock.call([{"value": "a"}, {"value": "b"}]),
+        mock.call([{"value": "d"}]),
+    ]
+
+    # Offsets are committed after the first batch, as well as on shutdown.
+    assert [
+        sorted((i.topic, i.partition, i.offset) for i in call[1]["offsets"])
+        for call in consumer.commit.call_args_list
+    ] == [[("events", 0, 12), ("events", 1, 21)], [("events", 0, 12), ("events", 1, 22)]]
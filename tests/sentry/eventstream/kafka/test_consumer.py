@@ -6,6 +6,7 @@ import uuid
 from collections import defaultdict
 from contextlib import contextmanager
 
+import mock
 import pytest
 
 from six.moves import xrange
@@ -620,3 +621,69 @@ def test_consumer_rebalance_from_uncommitted_offset(requires_kafka):
         assert (
             message is None or message.error() is KafkaError._PARTITION_EOF
         ), "there should be no more messages to recieve"
+
+
+class MockMessage(object):
+    def __init__(self, topic, partition, offset, value=None):
+        self.__topic = topic
+        self.__partition = partition
+        self.__offset = offset
+        self.__value = value
+
+    def error(self):
+        return None
+
+    def topic(self):
+        return self.__topic
+
+    def partition(self):
+        return self.__partition
+
+    def offset(self):
+        return self.__offset
+
+    def value(self):
+        return self.__value
+
+
+@mock.patch("sentry.eventstream.kafka.consumer.execute")
+@mock.patch("sentry.eventstream.kafka.consumer.Consumer")
+def test_consume_rewinds_paused_partitions(Consumer, execute):
+    def start_commit_log_consumer(function):
+        function.keywords["start_event"].set()
+        return mock.Mock()
+
+    execute.side_effect = start_commit_log_consumer
+
+    consumer = SynchronizedConsumer(
+        bootstrap_servers="localhost:9092",
+        consumer_group="consumer",
+        commit_log_topic="commit-log",
+        synchronize_commit_group="synchronize",
+    )
+    state_manager = consumer._SynchronizedConsumer__partition_state_manager
+    state_manager.set_local_offset("events", 0, 0)
+    state_manager.set_remote_offset("events", 0, 2)
+    state_manager.set_local_offset("events", 1, 0)
+    state_manager.set_remote_offset("events", 1, 5)
+    assert consumer.get_lag("events", 0) == 2
+    assert consumer.get_lag("events", 2) is None
+
+    Consumer.return_value.consume.return_value = [
+        MockMessage("events", 0, 0),
+        MockMessage("events", 1, 0),
+        MockMessage("events", 0, 1),
+        MockMessage("events", 0, 2),
+        MockMessage("events", 1, 1),
+        MockMessage("events", 0, 3),
+    ]
+
+    messages = consumer.consume(10, 0.1)
+    assert [(m.partition(), m.offset()) for m in messages] == [(0, 0), (1, 0), (0, 1), (1, 1)]
+
+    # The partition was caught up with the commit log in the middle of the
+    # batch, so it is paused and rewound to the first discarded message.
+    Consumer.return_value.pause.assert_called_with([TopicPartition("events", 0, 2)])
+    Consumer.return_value.seek.assert_called_once_with(TopicPartition("events", 0, 2))
+    assert consumer.get_lag("events", 0) == 0
+    assert consumer.get_lag("events", 1) == 3
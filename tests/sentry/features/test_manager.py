@@ -0,0 +1,64 @@
+from __future__ import absolute_import
+
+import mock
+from django.http import HttpRequest
+
+from sentry import features
+from sentry.app import env
+from sentry.features.base import OrganizationFeature
+from sentry.testutils import TestCase
+
+
+class FeatureManagerTest(TestCase):
+    def setUp(self):
+        self.manager = features.FeatureManager()
+        self.manager.add("organizations:feature1", OrganizationFeature)
+        self.manager.add("organizations:feature2", OrganizationFeature)
+        self.manager.add("organizations:feature3", OrganizationFeature)
+        self.org = self.create_organization()
+        self.user = self.create_user()
+
+        self.handler = mock.Mock(
+            side_effect=lambda feature, actor: {"organizations:feature1": True}.get(feature.name)
+        )
+        plugin = mock.Mock()
+        plugin.get_feature_hooks.return_value = [self.handler]
+        patcher = mock.patch("sentry.features.manager.plugins")
+        self.plugins = patcher.start()
+        self.plugins.all.return_value = [plugin]
+        self.addCleanup(patcher.stop)
+
+    def test_has_many(self):
+        names = ["organizations:feature1", "organizations:feature2", "organizations:feature3"]
+        with self.settings(SENTRY_FEATURES={"organizations:feature2": True}):
+            assert self.manager.has_many(names, self.org, actor=self.user) == {
+                "organizations:feature1": True,
+                "organizations:feature2": True,
+                "organizations:feature3": False,
+            }
+            assert self.manager.has("organizations:feature2", self.org, actor=self.user)
+
+        # The plugin handlers are only resolved once for all features.
+        assert self.plugins.all.call_count == 2
+        assert self.handler.call_count == 4
+
+    def test_request_memo(self):
+        env.request = HttpRequest()
+        self.addCleanup(setattr, env, "request", None)
+
+        for _ in range(3):
+            assert self.manager.has("organizations:feature1", self.org, actor=self.user)
+            assert not self.manager.has("organizations:feature3", self.org, actor=self.user)
+
+        assert self.plugins.all.call_count == 1
+        assert self.handler.call_count == 2
+
+        # Checks for another actor or object are not shared.
+        assert self.manager.has("organizations:feature1", self.org, actor=None)
+        assert self.manager.has("organizations:feature1", self.create_organization())
+        assert self.handler.call_count == 4
+
+        # Nor are checks outside of the request.
+        env.request = None
+        assert self.manager.has("organizations:feature1", self.org, actor=self.user)
+        assert self.handler.call_count == 5
@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+
+import mmap
+import os
+import shutil
+import tempfile
+
+from hashlib import sha1
+
+import mock
+from django.core.files.base import ContentFile
+
+from sentry.filestore.cache import LocalBlobCache
+from sentry.models import File, FileBlob
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+
+
+def checksum(contents):
+    return sha1(contents).hexdigest()
+
+
+class LocalBlobCacheTest(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.cache = LocalBlobCache(self.path, 12)
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_open(self):
+        fetch = mock.Mock(side_effect=lambda: ContentFile(b"foo"))
+
+        with self.cache.open(checksum(b"foo"), fetch) as f:
+            assert f.read() == b"foo"
+        with self.cache.open(checksum(b"foo"), fetch) as f:
+            assert f.read() == b"foo"
+            # Cached files are regular files on disk.
+            assert mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)[:] == b"foo"
+
+        assert fetch.call_count == 1
+        assert os.listdir(os.path.dirname(self.cache.get_path(checksum(b"foo")))) == [
+            checksum(b"foo")
+        ]
+
+    def test_checksum_mismatch(self):
+        fetch = mock.Mock(side_effect=lambda: ContentFile(b"bar"))
+
+        with self.cache.open(checksum(b"foo"), fetch) as f:
+            assert f.read() == b"bar"
+
+        assert fetch.call_count == 2
+        assert not os.path.exists(self.cache.get_path(checksum(b"foo")))
+        assert os.listdir(os.path.dirname(self.cache.get_path(checksum(b"foo")))) == []
+
+    def test_eviction(self):
+        for i, contents in enumerate((b"aaaa", b"bbbb", b"cccc")):
+            self.cache.open(checksum(contents), lambda: ContentFile(contents)).close()
+            # Make sure the entries have distinct modification times.
+            os.utime(self.cache.get_path(checksum(contents)), (i, i))
+
+        # Reading an entry marks it as recently used.
+        self.cache.open(checksum(b"aaaa"), None).close()
+        self.cache.open(checksum(b"dddd"), lambda: ContentFile(b"dddd")).close()
+
+        assert not os.path.exists(self.cache.get_path(checksum(b"bbbb")))
+        assert not os.path.exists(self.cache.get_path(checksum(b"cccc")))
+        assert os.path.exists(self.cache.get_path(checksum(b"aaaa")))
+        assert os.path.exists(self.cache.get_path(checksum(b"dddd")))
+        assert self.cache.size == 8
+
+    def test_evicted_on_publish(self):
+        # Blobs larger than the eviction target are evicted right after they
+        # have been published.
+        contents = b"x" * 16
+        fetch = mock.Mock(side_effect=lambda: ContentFile(contents))
+
+        with self.cache.open(checksum(contents), fetch) as f:
+            assert f.read() == contents
+
+        assert fetch.call_count == 1
+        assert not os.path.exists(self.cache.get_path(checksum(contents)))
+        assert self.cache.size == 0
+
+    def test_file_blob(self):
+        fileobj = ContentFile(b"foo bar")
+        file = File.objects.create(name="baz.js", type="default", size=7)
+        file.putfile(fileobj, 3)
+
+        with override_options({"filestore.cache-path": self.path}):
+            with file.getfile(prefetch=True) as f:
+                assert f.read() == b"foo bar"
+
+            # All blobs are now read from the local cache.
+            with mock.patch(
+                "django.core.files.storage.FileSystemStorage.open", side_effect=AssertionError
+            ):
+                with file.getfile() as f:
+                    assert f.read() == b"foo bar"
+
+        for blob in FileBlob.objects.all():
+            assert os.path.exists(os.path.join(self.path, blob.checksum[:2], blob.checksum))
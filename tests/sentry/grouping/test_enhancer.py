@@ -12,6 +12,8 @@ def dump_obj(obj):
         return obj
     rv = {}
     for (key, value) in six.iteritems(obj.__dict__):
+        if key.startswith("_"):
+            continue
         if isinstance(value, list):
             rv[key] = [dump_obj(x) for x in value]
         elif isinstance(value, dict):
@@ -199,3 +201,55 @@ def test_package_matching():
     assert not bool(
         bundled_rule.get_matching_frame_actions({"package": "/usr/lib/linux-gate.so"}, "native")
     )
+
+
+def test_compiled_matching_is_equivalent():
+    enhancement = Enhancements.from_config_string(
+        """
+        family:native package:/usr/lib/**                 -app
+        family:native function:std::*                     -app
+        family:native app:no function:panic*              ^-group
+        family:javascript path:**/node_modules/**         -app
+        family:javascript path:**/vendor.js app:yes       +app
+        family:javascript module:react-dom/*              -group
+        family:javascript app:yes function:handle*        v-group
+        path:**/src/**                                    +app
+        family:native                                     max-frames=3
+    """
+    )
+
+    def make_frames():
+        return [
+            {"package": "/usr/lib/libc.so", "function": "start", "platform": "native"},
+            {"package": "/usr/lib/libstd.so", "function": "std::rt::lang_start"},
+            {"package": "/app/bin/app", "function": "panic_impl", "in_app": False},
+            {"abs_path": "http://example.com/node_modules/react-dom/index.js", "in_app": True},
+            {"abs_path": "http://example.com/vendor.js", "function": "handleClick"},
+            {"module": "react-dom/server", "function": "render", "platform": "javascript"},
+            {"filename": "C:\\Users\\src\\main.c", "function": "main", "platform": "native"},
+            {"abs_path": "/src/app.js", "function": "handleEvent", "in_app": True},
+        ]
+
+    for platform in ("native", "javascript"):
+        naive_frames = make_frames()
+        for rule in enhancement.rules:
+            for idx, frame in enumerate(naive_frames):
+                for action in rule.get_matching_frame_actions(frame, platform) or ():
+                    action.apply_modifications_to_frame(naive_frames, idx)
+
+        compiled_frames = make_frames()
+        enhancement.apply_modifications_to_frame(compiled_frames, platform)
+
+        assert compiled_frames == naive_frames
+
+        naive_matches = [
+            (rule, idx)
+            for rule in enhancement.rules
+            for idx, frame in enumerate(compiled_frames)
+            if rule.get_matching_frame_actions(frame, platform)
+        ]
+        compiled_matches = [
+            (rule, idx)
+            for rule, idx, _ in enhancement.iter_matching_frame_actions(compiled_frames, platform)
+        ]
+        assert compiled_matches == naive_matches
@@ -3,13 +3,15 @@ from __future__ import absolute_import
 import datetime
 import time
 import logging
+import mock
 import msgpack
 import pytest
 
 from django.conf import settings
 
+from sentry.cache import default_cache
 from sentry.event_manager import EventManager
-from sentry.ingest.ingest_consumer import ConsumerType, get_ingest_consumer
+from sentry.ingest.ingest_consumer import ConsumerType, IngestConsumerWorker, get_ingest_consumer
 from sentry.models.event import Event
 from sentry.utils import json
 from sentry.testutils.factories import Factories
@@ -43,7 +45,7 @@ def _get_test_message(project):
         "ty": (0, ()),
         "start_time": time.time(),
         "event_id": event_id,
-        "project_id": 1,
+        "project_id": project_id,
         "payload": json.dumps(normalized_event),
     }
 
@@ -116,3 +118,26 @@ def test_ingest_consumer_reads_from_topic_and_calls_celery_task(
         assert message is not None
         # check that the data has not been scrambled
         assert message.data["extra"]["the_id"] == event_id
+
+
+@pytest.mark.django_db
+@mock.patch("sentry.ingest.ingest_consumer.preprocess_event")
+def test_ingest_consumer_worker_deduplicates_batch(mock_preprocess_event):
+    organization = Factories.create_organization()
+    project = Factories.create_project(organization=organization)
+
+    message, event_id = _get_test_message(project)
+    kafka_message = mock.Mock()
+    kafka_message.value.return_value = message
+
+    worker = IngestConsumerWorker()
+    worker.flush_batch([worker.process_message(kafka_message) for _ in range(2)])
+
+    # the second flush is dropped by the deduplication cache
+    worker.flush_batch([worker.process_message(kafka_message)])
+
+    assert mock_preprocess_event.call_count == 1
+    kwargs = mock_preprocess_event.call_args[1]
+    assert kwargs["event_id"] == event_id
+    assert kwargs["data"]["extra"]["the_id"] == event_id
+    assert default_cache.get(kwargs["cache_key"]) == kwargs["data"]
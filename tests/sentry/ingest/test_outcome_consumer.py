@@ -4,7 +4,12 @@ import logging
 import pytest
 import six.moves
 
-from sentry.ingest.outcomes_consumer import get_outcomes_consumer, mark_signal_sent, is_signal_sent
+from sentry.ingest.outcomes_consumer import (
+    OutcomesConsumerWorker,
+    get_outcomes_consumer,
+    mark_signal_sent,
+    is_signal_sent,
+)
 from sentry.signals import event_filtered, event_dropped
 from sentry.testutils.factories import Factories
 from sentry.utils.outcomes import Outcome
@@ -331,3 +336,68 @@ def test_outcome_consumer_handles_rate_limited_outcomes(
     assert set(event_dropped_sink) == set(
         [("127.33.44.1", "reason_1"), ("127.33.44.2", "reason_2")]
     )
+
+
+@pytest.mark.django_db
+def test_outcome_consumer_aggregates_signals():
+    project = Factories.create_project(organization=Factories.create_organization())
+    other_project = Factories.create_project(organization=project.organization)
+
+    def outcome(event_id, project_id, outcome, ip, reason=None):
+        return json.loads(
+            _get_outcome(
+                event_id=event_id,
+                project_id=project_id,
+                outcome=outcome,
+                reason=reason,
+                remote_addr=ip,
+            )
+        )
+
+    mark_signal_sent(project_id=project.id, event_id=_get_event_id(0))
+    batch = [
+        # already processed before
+        outcome(0, project.id, Outcome.FILTERED, "127.0.0.1"),
+        outcome(1, project.id, Outcome.FILTERED, "127.0.0.1"),
+        outcome(2, project.id, Outcome.FILTERED, "127.0.0.1"),
+        # emitted twice in the same batch
+        outcome(2, project.id, Outcome.FILTERED, "127.0.0.1"),
+        outcome(3, project.id, Outcome.FILTERED, "127.0.0.2"),
+        outcome(4, other_project.id, Outcome.RATE_LIMITED, "127.0.0.1", "quota"),
+        outcome(5, other_project.id, Outcome.RATE_LIMITED, "127.0.0.1", "quota"),
+        outcome(6, other_project.id, Outcome.INVALID, "127.0.0.1"),
+        outcome(7, 0, Outcome.FILTERED, "127.0.0.1"),
+        # the project does not exist
+        outcome(8, 424242, Outcome.FILTERED, "127.0.0.1"),
+    ]
+
+    event_filtered_sink = []
+    event_dropped_sink = []
+
+    def event_filtered_receiver(**kwargs):
+        event_filtered_sink.append((kwargs["project"].id, kwargs["ip"], kwargs["count"]))
+
+    def event_dropped_receiver(**kwargs):
+        event_dropped_sink.append(
+            (kwargs["project"].id, kwargs["ip"], kwargs["reason_code"], kwargs["count"])
+        )
+
+    event_filtered.connect(event_filtered_receiver)
+    event_dropped.connect(event_dropped_receiver)
+    try:
+        OutcomesConsumerWorker(concurrency=1).flush_batch(batch)
+    finally:
+        event_filtered.disconnect(event_filtered_receiver)
+        event_dropped.disconnect(event_dropped_receiver)
+
+    assert sorted(event_filtered_sink) == [
+        (project.id, "127.0.0.1", 2),
+        (project.id, "127.0.0.2", 1),
+    ]
+    assert event_dropped_sink == [(other_project.id, "127.0.0.1", "quota", 2)]
+
+    for i in (1, 2, 3):
+        assert is_signal_sent(project_id=project.id, event_id=_get_event_id(i))
+    for i in (4, 5):
+        assert is_signal_sent(project_id=other_project.id, event_id=_get_event_id(i))
+    assert not is_signal_sent(project_id=other_project.id, event_id=_get_event_id(6))
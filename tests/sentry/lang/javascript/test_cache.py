@@ -1,6 +1,6 @@
 from __future__ import absolute_import
 
-from sentry.lang.javascript.cache import SourceCache
+from sentry.lang.javascript.cache import ParsedSourceCache, SourceCache, parsed_source_cache
 from unittest import TestCase
 
 
@@ -38,3 +38,37 @@ class BasicCacheTest(TestCase):
         # fall back to utf-8
         cache.add(url, "foobar".encode("utf-32"), encoding="utf-32")
         assert cache.get(url)[0] == u"foobar"
+
+    def test_shares_parsed_sources(self):
+        url = "http://example.com/foo.js"
+        source = b"shared\nsource"
+
+        cache = SourceCache()
+        cache.add(url, source)
+
+        other_cache = SourceCache()
+        other_cache.add(url, source)
+
+        assert cache.get(url) is other_cache.get(url)
+        assert parsed_source_cache.size >= len(source)
+
+
+class ParsedSourceCacheTest(TestCase):
+    def test_eviction(self):
+        cache = ParsedSourceCache(max_size=10)
+
+        cache.set("a", "A", 4)
+        cache.set("b", "B", 4)
+        assert cache.get("a") == "A"
+
+        # b is the least recently used entry now
+        cache.set("c", "C", 4)
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert cache.size == 8
+
+        # entries larger than the entire cache are never stored
+        cache.set("d", "D", 11)
+        assert cache.get("d") is None
+        assert len(cache) == 2
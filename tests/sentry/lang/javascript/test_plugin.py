@@ -137,8 +137,8 @@ class JavascriptIntegrationTest(TestCase, SnubaTestCase):
             "brand": "Sony",
         }
 
-    @patch("sentry.lang.javascript.processor.fetch_file")
-    def test_source_expansion(self, mock_fetch_file):
+    @responses.activate
+    def test_source_expansion(self):
         data = {
             "timestamp": self.min_ago,
             "message": "hello",
@@ -168,19 +168,18 @@ class JavascriptIntegrationTest(TestCase, SnubaTestCase):
             },
         }
 
-        mock_fetch_file.return_value.body = "\n".join("hello world")
-        mock_fetch_file.return_value.encoding = None
+        responses.add(
+            responses.GET,
+            "http://example.com/foo.js",
+            body="\n".join("hello world"),
+            content_type="application/javascript",
+        )
 
         resp = self._postWithHeader(data)
         assert resp.status_code, 200
 
-        mock_fetch_file.assert_called_once_with(
-            "http://example.com/foo.js",
-            project=self.project,
-            release=None,
-            dist=None,
-            allow_scraping=True,
-        )
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.url == "http://example.com/foo.js"
 
         event = self.get_event(json.loads(resp.content)["id"])
         exception = event.interfaces["exception"]
@@ -199,9 +198,9 @@ class JavascriptIntegrationTest(TestCase, SnubaTestCase):
         # no source map means no raw_stacktrace
         assert exception.values[0].raw_stacktrace is None
 
-    @patch("sentry.lang.javascript.processor.fetch_file")
+    @responses.activate
     @patch("sentry.lang.javascript.processor.discover_sourcemap")
-    def test_inlined_sources(self, mock_discover_sourcemap, mock_fetch_file):
+    def test_inlined_sources(self, mock_discover_sourcemap):
         data = {
             "timestamp": self.min_ago,
             "message": "hello",
@@ -227,20 +226,18 @@ class JavascriptIntegrationTest(TestCase, SnubaTestCase):
 
         mock_discover_sourcemap.return_value = BASE64_SOURCEMAP
 
-        mock_fetch_file.return_value.url = "http://example.com/test.min.js"
-        mock_fetch_file.return_value.body = "\n".join("<generated source>")
-        mock_fetch_file.return_value.encoding = None
+        responses.add(
+            responses.GET,
+            "http://example.com/test.min.js",
+            body="\n".join("generated source"),
+            content_type="application/javascript",
+        )
 
         resp = self._postWithHeader(data)
         assert resp.status_code, 200
 
-        mock_fetch_file.assert_called_once_with(
-            "http://example.com/test.min.js",
-            project=self.project,
-            release=None,
-            dist=None,
-            allow_scraping=True,
-        )
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.url == "http://example.com/test.min.js"
 
         event = self.get_event(json.loads(resp.content)["id"])
         exception = event.interfaces["exception"]
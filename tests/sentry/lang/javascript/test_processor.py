@@ -4,6 +4,8 @@ import pytest
 import re
 import responses
 import six
+import threading
+import time
 import unittest
 from symbolic import SourceMapTokenMatch
 
@@ -26,7 +28,7 @@ from sentry.lang.javascript.processor import (
     CACHE_CONTROL_MIN,
 )
 from sentry.lang.javascript.errormapping import rewrite_exception, REACT_MAPPING_URL
-from sentry.models import File, Release, ReleaseFile, EventError
+from sentry.models import File, Project, Release, ReleaseFile, EventError
 from sentry.testutils import TestCase
 from sentry.utils.strings import truncatechars
 
@@ -58,6 +60,70 @@ class JavaScriptStacktraceProcessorTest(TestCase):
         r = JavaScriptStacktraceProcessor({}, None, project)
         assert not r.allow_scraping
 
+    @responses.activate
+    def test_cache_sources_concurrently(self):
+        for i in range(3):
+            responses.add(
+                responses.GET,
+                "http://example.com/%d.js" % i,
+                body="console.log(%d);" % i,
+                content_type="application/javascript",
+            )
+        responses.add(responses.GET, "http://example.com/missing.js", status=404)
+
+        r = JavaScriptStacktraceProcessor({}, None, self.project)
+        r.max_fetches = 3
+        urls = ["http://example.com/%d.js" % i for i in range(3)]
+        r.cache_sources(urls + ["http://example.com/missing.js"])
+
+        for i, url in enumerate(urls):
+            assert r.cache.get(url)[0] == u"console.log(%d);" % i
+            assert r.cache.get_errors(url) == []
+
+        assert r.cache.get("http://example.com/missing.js") is None
+        assert r.cache.get_errors("http://example.com/missing.js") == [
+            {"type": EventError.JS_TOO_MANY_REMOTE_SOURCES}
+        ]
+        assert r.fetch_deadline is not None
+
+    @patch("sentry.http.fetch_file")
+    def test_cache_sources_deadline(self, mock_fetch_file):
+        r = JavaScriptStacktraceProcessor({}, None, self.project)
+        r.fetch_deadline = time.time() - 1
+        r.cache_sources(["http://example.com/foo.js"])
+
+        assert not mock_fetch_file.called
+        assert r.cache.get("http://example.com/foo.js") is None
+        (error,) = r.cache.get_errors("http://example.com/foo.js")
+        assert error["type"] == EventError.FETCH_TIMEOUT
+        assert error["url"] == "http://example.com/foo.js"
+
+    @responses.activate
+    def test_cache_sources_resolves_options(self):
+        responses.add(
+            responses.GET,
+            "http://example.com/foo.js",
+            body="console.log(1);",
+            content_type="application/javascript",
+        )
+        self.project.update_option("sentry:token", "secret")
+        r = JavaScriptStacktraceProcessor({}, None, self.project)
+
+        threads = set()
+        get_option = Project.get_option
+
+        def record_thread(project, *args, **kwargs):
+            threads.add(threading.current_thread())
+            return get_option(project, *args, **kwargs)
+
+        with patch.object(Project, "get_option", record_thread):
+            r.cache_sources(["http://example.com/foo.js"])
+
+        # Only the request itself is sent on the fetch pool.
+        assert threads == {threading.current_thread()}
+        assert r.cache.get("http://example.com/foo.js")[0] == u"console.log(1);"
+        assert responses.calls[0].request.headers["X-Sentry-Token"] == "secret"
+
 
 class FetchReleaseFileTest(TestCase):
     def test_unicode(self):
@@ -1,10 +1,12 @@
 from __future__ import absolute_import
 
+import mock
 import os
 
 from django.core.files.base import ContentFile
 
 from sentry.models import File, FileBlob
+from sentry.models.file import blob_cache
 from sentry.testutils import TestCase
 
 
@@ -83,3 +85,29 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+    def test_read_range(self):
+        fileobj = ContentFile("foo bar baz".encode("utf-8"))
+        file = File.objects.create(name="baz.js", type="default", size=11)
+        file.putfile(fileobj, 3)
+        blob_cache.clear()
+
+        with file._get_chunked_blob() as fp:
+            fp.seek(5)
+            assert fp.read_range(0, 11) == b"foo bar baz"
+            assert fp.read_range(2, 5) == b"o bar"
+            assert fp.read_range(9, 100) == b"az"
+            assert fp.read_range(3, 0) == b""
+            # The current position is not changed.
+            assert fp.tell() == 5
+            assert fp.read(3) == b"ar "
+
+            with self.assertRaises(IOError):
+                fp.read_range(-1, 1)
+
+        # All blobs were read and cached, so sequential reads are served from
+        # the cache.
+        with mock.patch.object(FileBlob, "getfile", side_effect=AssertionError):
+            with file.getfile() as fp:
+                fp.seek(4)
+                assert fp.read() == b"bar baz"
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import mock
+
+from sentry.nodestore.cache import CachedNodeStorage
+from sentry.nodestore.django.models import Node
+from sentry.testutils import TestCase
+
+
+class CachedNodeStorageTest(TestCase):
+    def setUp(self):
+        self.ns = CachedNodeStorage(
+            backend="sentry.nodestore.django.DjangoNodeStorage", cache_size=2
+        )
+
+    def test_get(self):
+        node = Node.objects.create(id="a", data={"foo": "bar"})
+
+        with mock.patch.object(self.ns.backend, "get", wraps=self.ns.backend.get) as get:
+            assert self.ns.get(node.id) == {"foo": "bar"}
+            result = self.ns.get(node.id)
+            assert result == {"foo": "bar"}
+        assert get.call_count == 1
+
+        # Modifying the returned data should not modify the cached copy.
+        result["foo"] = "baz"
+        assert self.ns.get(node.id) == {"foo": "bar"}
+
+        assert self.ns.get("missing") is None
+
+    def test_get_multi(self):
+        self.ns.set("a", {"foo": "a"})
+        Node.objects.create(id="b", data={"foo": "b"})
+
+        with mock.patch.object(
+            self.ns.backend, "get_multi", wraps=self.ns.backend.get_multi
+        ) as get_multi:
+            assert self.ns.get_multi(["a", "b", "c"]) == {"a": {"foo": "a"}, "b": {"foo": "b"}}
+            get_multi.assert_called_once_with(["b", "c"])
+
+            assert self.ns.get_multi(["a", "b"]) == {"a": {"foo": "a"}, "b": {"foo": "b"}}
+            assert get_multi.call_count == 1
+
+    def test_set(self):
+        self.ns.set("a", {"foo": "bar"})
+        self.ns.set("a", {"foo": "baz"})
+        assert self.ns.get("a") == {"foo": "baz"}
+        assert Node.objects.get(id="a").data == {"foo": "baz"}
+
+        self.ns.set_multi({"b": {"foo": "b"}, "c": {"foo": "c"}})
+        assert Node.objects.get(id="c").data == {"foo": "c"}
+
+        # The least recently used entry should have been evicted.
+        assert sorted(self.ns._cache) == ["b", "c"]
+
+    def test_delete(self):
+        self.ns.set("a", {"foo": "a"})
+        self.ns.set("b", {"foo": "b"})
+
+        self.ns.delete("a")
+        assert self.ns.get("a") is None
+
+        self.ns.delete_multi(["b"])
+        assert self.ns.get("b") is None
+        assert not Node.objects.exists()
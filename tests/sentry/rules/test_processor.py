@@ -4,7 +4,9 @@ from __future__ import absolute_import
 
 from datetime import timedelta
 from django.utils import timezone
+from mock import patch
 
+from sentry import tsdb
 from sentry.models import GroupRuleStatus, Rule
 from sentry.plugins import plugins
 from sentry.testutils import TestCase
@@ -52,6 +54,58 @@ class RuleProcessorTest(TestCase):
         results = list(rp.apply())
         assert len(results) == 1
 
+    def test_batched_lookups(self):
+        event = self.create_event()
+        tsdb.incr(tsdb.models.group, event.group_id, count=5)
+
+        action_data = {"id": "sentry.rules.actions.notify_event.NotifyEventAction"}
+        frequency_data = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+            "value": "2",
+        }
+        first_seen_data = {"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"}
+
+        Rule.objects.filter(project=event.project).delete()
+        rules = [
+            Rule.objects.create(
+                project=event.project,
+                data={"conditions": [frequency_data], "actions": [action_data]},
+            )
+            for _ in range(3)
+        ]
+        # The frequency condition does not need to be evaluated, since the
+        # rule can never pass for an event that is not new.
+        Rule.objects.create(
+            project=event.project,
+            data={
+                "conditions": [frequency_data, first_seen_data],
+                "action_match": "all",
+                "actions": [action_data],
+            },
+        )
+
+        rp = RuleProcessor(
+            event,
+            is_new=False,
+            is_regression=False,
+            is_new_group_environment=False,
+            has_reappeared=False,
+        )
+        with patch.object(tsdb, "get_sums", wraps=tsdb.get_sums) as get_sums:
+            results = list(rp.apply())
+        assert get_sums.call_count == 1
+
+        assert len(results) == 1
+        _, futures = results[0]
+        assert set(future.rule for future in futures) == set(rules)
+        assert GroupRuleStatus.objects.filter(group=event.group).count() == 4
+
+        # Statuses are now cached.
+        rules = list(Rule.objects.filter(project=event.project))
+        with self.assertNumQueries(0):
+            assert len(rp.get_rule_statuses(rules)) == 4
+
 
 class EventCompatibilityProxyTest(TestCase):
     def test_simple(self):
@@ -3,14 +3,22 @@ from __future__ import absolute_import
 from collections import Counter
 from unittest import TestCase
 
-from sentry.similarity.signatures import MinHashSignatureBuilder
+import mmh3
+import pytest
+from mock import patch
+
+from sentry.similarity.signatures import MinHashSignatureBuilder, np
 
 
 class MinHashSignatureBuilderTestCase(TestCase):
     def test_signatures(self):
+        for compatible in (False, True):
+            self.check_signatures(compatible)
+
+    def check_signatures(self, compatible):
         n = 32
         r = 0xFFFF
-        get_signature = MinHashSignatureBuilder(n, r)
+        get_signature = MinHashSignatureBuilder(n, r, compatible=compatible)
         get_signature(set(["foo", "bar", "baz"])) == get_signature(set(["foo", "bar", "baz"]))
 
         assert len(get_signature("hello world")) == n
@@ -30,3 +38,36 @@ class MinHashSignatureBuilderTestCase(TestCase):
         self.assertAlmostEqual(
             similarity, estimation, delta=0.1  # totally made up constant, seems reasonable
         )
+
+    def test_compatible_signatures(self):
+        features = ["foo", "bar", "baz"]
+        assert MinHashSignatureBuilder(16, 0xFFFF)(features) == [
+            min(mmh3.hash(feature, column) % 0xFFFF for feature in features) for column in range(16)
+        ]
+
+    def test_build_many(self):
+        feature_sets = [["foo", "bar"], "hello world", ["baz"]]
+
+        get_signature = MinHashSignatureBuilder(16, 0xFFFF, compatible=False)
+        signatures = get_signature.build_many(feature_sets)
+        assert signatures == [get_signature(features) for features in feature_sets]
+        assert get_signature.build_many([]) == []
+
+        with self.assertRaises(ValueError):
+            get_signature.build_many([["foo"], []])
+
+    @pytest.mark.skipif(np is None, reason="requires numpy")
+    def test_build_many_vectorized(self):
+        feature_sets = [
+            ["foo", "bar"],
+            "hello world",
+            ["baz"],
+            ["feature-%d" % i for i in range(100)],
+        ]
+
+        signatures = MinHashSignatureBuilder(16, 0xFFFF, compatible=False).build_many(feature_sets)
+
+        # Without numpy, the signatures are built one by one in Python.
+        with patch("sentry.similarity.signatures.np", None):
+            get_signature = MinHashSignatureBuilder(16, 0xFFFF, compatible=False)
+            assert signatures == [get_signature(features) for features in feature_sets]
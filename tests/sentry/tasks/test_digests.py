@@ -0,0 +1,158 @@
+from __future__ import absolute_import
+
+import mock
+import pytest
+import time
+
+from contextlib import contextmanager
+
+import sentry
+from sentry.digests.backends.base import InvalidState
+from sentry.digests.backends.redis import RedisBackend
+from sentry.digests.notifications import event_to_record, unsplit_key
+from sentry.plugins import plugins
+from sentry.plugins.sentry_mail.models import MailPlugin
+from sentry.tasks.digests import deliver_digests, open_digests, schedule_digests
+from sentry.testutils import TestCase
+from sentry.testutils.helpers import override_options
+from sentry.utils.locking import UnableToAcquireLock
+
+
+class DeliverDigestsTest(TestCase):
+    def setUp(self):
+        self.backend = RedisBackend()
+        patcher = mock.patch.object(sentry.digests.backend, "_wrapped", self.backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.plugin = plugins.get("mail")
+
+    def add_digest(self, project):
+        rule = project.rule_set.all()[0]
+        key = unsplit_key(self.plugin, project)
+        for _ in range(2):
+            event = self.create_event(group=self.create_group(project=project))
+            self.backend.add(key, event_to_record(event, [rule]), increment_delay=0)
+        return key
+
+    @mock.patch.object(MailPlugin, "notify_digest")
+    def test_delivers_batch(self, notify_digest):
+        projects = [self.create_project() for _ in range(3)]
+        keys = [self.add_digest(project) for project in projects]
+
+        deliver_digests(keys)
+
+        assert sorted(call[0][0].id for call in notify_digest.call_args_list) == sorted(
+            project.id for project in projects
+        )
+        # Delivered timelines wait for the minimum delay before they are
+        # scheduled again.
+        assert set(entry.key for entry in self.backend.schedule(time.time() + 3600)) == set(keys)
+        for key in keys:
+            with self.backend.digest(key, 0) as records:
+                assert list(records) == []
+
+    @mock.patch.object(MailPlugin, "notify_digest")
+    def test_notifies_closed_digests(self, notify_digest):
+        projects = [self.create_project() for _ in range(2)]
+        keys = [self.add_digest(project) for project in projects]
+
+        def notify(project, digest):
+            # All digests are closed (and unlocked) before any is delivered.
+            for key in keys:
+                with self.backend._get_timeline_lock(key, duration=30).acquire():
+                    pass
+            if project.id == projects[0].id:
+                raise Exception("failed")
+
+        notify_digest.side_effect = notify
+        deliver_digests(keys)
+
+        # A failed delivery doesn't affect the other digests of the batch.
+        assert notify_digest.call_count == 2
+        for key in keys:
+            with self.backend.digest(key, 0) as records:
+                assert list(records) == []
+
+    @mock.patch.object(MailPlugin, "notify_digest")
+    def test_locked_digest(self, notify_digest):
+        projects = [self.create_project() for _ in range(2)]
+        keys = [self.add_digest(project) for project in projects]
+
+        with self.backend._get_timeline_lock(keys[0], duration=30).acquire():
+            deliver_digests(keys)
+
+        assert [call[0][0].id for call in notify_digest.call_args_list] == [projects[1].id]
+        with self.backend.digest(keys[0], 0) as records:
+            assert len(list(records)) == 2
+
+    @mock.patch.object(MailPlugin, "notify_digest")
+    def test_missing_project(self, notify_digest):
+        key = self.add_digest(self.project)
+        self.project.delete()
+
+        deliver_digests([key])
+
+        assert not notify_digest.called
+        with pytest.raises(InvalidState):
+            with self.backend.digest(key, 0):
+                pass
+
+    @mock.patch("sentry.tasks.digests.deliver_digests.delay")
+    @mock.patch("sentry.tasks.digests.deliver_digest.delay")
+    def test_schedule_batches(self, deliver_digest, deliver_digests):
+        projects = [self.create_project() for _ in range(3)]
+        keys = [self.add_digest(project) for project in projects]
+        # Timelines are only scheduled once they were digested before.
+        for key in keys:
+            with self.backend.digest(key, 0):
+                pass
+        for project in projects:
+            self.add_digest(project)
+
+        with override_options({"digests.delivery-batch-size": 2}):
+            schedule_digests()
+
+        assert not deliver_digest.called
+        batches = [call[0][0] for call in deliver_digests.call_args_list]
+        assert sorted(len(batch) for batch in batches) == [1, 2]
+        assert sorted(key for batch in batches for key in batch) == sorted(keys)
+
+
+class OpenDigestsTest(TestCase):
+    def get_digests(self, records):
+        self.closed = {}
+
+        @contextmanager
+        def digest(key, minimum_delay=None):
+            if records[key] is None:
+                raise UnableToAcquireLock("locked")
+            try:
+                yield iter(records[key])
+            except Exception:
+                self.closed[key] = False
+                raise
+            if key == "broken":
+                raise Exception("failed to close")
+            self.closed[key] = True
+
+        return mock.Mock(digest=digest)
+
+    def test_closes_digests(self):
+        digests = self.get_digests({"a": [1, 2], "locked": None, "broken": [3], "b": []})
+        entries = [(key, 0) for key in ("a", "locked", "broken", "b")]
+
+        with open_digests(digests, entries) as opened:
+            assert list(opened.items()) == [("a", [1, 2]), ("broken", [3]), ("b", [])]
+            assert self.closed == {}
+
+        assert self.closed == {"a": True, "b": True}
+        assert list(opened.keys()) == ["a", "b"]
+
+    def test_keeps_digests_on_error(self):
+        digests = self.get_digests({"a": [1], "b": [2]})
+
+        with pytest.raises(ValueError):
+            with open_digests(digests, [("a", 0), ("b", 0)]):
+                raise ValueError
+
+        assert self.closed == {"a": False, "b": False}
@@ -0,0 +1,110 @@
+from __future__ import absolute_import
+
+import mock
+
+from sentry.models import ProjectKey, ProjectOption
+from sentry.relay.config import (
+    get_project_config,
+    get_project_configs,
+    _get_project_config_cache_key,
+)
+from sentry.tasks.relay import UPDATE_DELAY, schedule_update_config_cache
+from sentry.testutils import TestCase
+from sentry.utils.cache import cache
+
+
+class ProjectConfigCacheTest(TestCase):
+    def test_cached(self):
+        project = self.create_project()
+        cache.clear()
+
+        cfg = get_project_config(project.id)
+        assert cache.get(_get_project_config_cache_key(project.id, True, False)) is not None
+
+        with self.assertNumQueries(0):
+            cached = get_project_config(project.id)
+        assert cached.to_dict()["rev"] == cfg.to_dict()["rev"]
+        assert cached.to_dict()["config"] == cfg.to_dict()["config"]
+        assert cached.project.organization == project.organization
+
+    def test_option_change(self):
+        project = self.create_project()
+        cache.clear()
+        rev = get_project_config(project.id).to_dict()["rev"]
+
+        with self.tasks():
+            project.update_option("sentry:origins", ["example.com"])
+
+        cfg = cache.get(_get_project_config_cache_key(project.id, True, False))
+        assert cfg["config"]["allowedDomains"] == ["example.com"]
+        assert cfg["rev"] != rev
+        assert get_project_config(project.id).config["allowedDomains"] == ["example.com"]
+
+        ProjectOption.objects.unset_value(project, "sentry:origins")
+        assert get_project_config(project.id).config["allowedDomains"] == ["*"]
+
+    def test_organization_option_change(self):
+        project = self.create_project()
+        assert get_project_config(project.id).config["trustedRelays"] == []
+
+        project.organization.update_option("sentry:trusted-relays", ["abc"])
+        assert get_project_config(project.id).config["trustedRelays"] == ["abc"]
+
+    def test_project_key_change(self):
+        project = self.create_project()
+        ProjectKey.objects.filter(project=project).delete()
+        assert get_project_config(project.id).to_dict()["publicKeys"] == []
+
+        key = self.create_project_key(project)
+        public_keys = get_project_config(project.id).to_dict()["publicKeys"]
+        assert [k["publicKey"] for k in public_keys] == [key.public_key]
+
+    def test_invalidate(self):
+        project = self.create_project()
+        cache.clear()
+        get_project_config(project.id, full_config=False)
+        cache_key = _get_project_config_cache_key(project.id, False, False)
+
+        with self.tasks():
+            schedule_update_config_cache(project_id=project.id)
+        assert cache.get(cache_key)["slug"] == project.slug
+
+        cache.delete(cache_key)
+        schedule_update_config_cache(organization_id=project.organization_id)
+        assert cache.get(cache_key) is None
+
+    def test_organization_change(self):
+        project = self.create_project()
+        cache.clear()
+        get_project_config(project.id)
+
+        project.organization.save()
+        assert cache.get(_get_project_config_cache_key(project.id, True, False)) is None
+
+    @mock.patch("sentry.tasks.relay.update_config_cache.apply_async")
+    def test_update_is_delayed(self, apply_async):
+        project = self.create_project()
+        cache.clear()
+        apply_async.reset_mock()
+
+        # The configs are rebuilt after the transaction of the change has
+        # been committed.
+        schedule_update_config_cache(project_id=project.id)
+        apply_async.assert_called_once_with(
+            kwargs={"project_id": project.id, "organization_id": None}, countdown=UPDATE_DELAY
+        )
+
+    def test_get_project_configs(self):
+        projects = [self.create_project(), self.create_project()]
+        cache.clear()
+        get_project_config(projects[0].id, full_config=False)
+
+        configs = get_project_configs(projects, full_config=False)
+        assert sorted(configs) == sorted(p.id for p in projects)
+        for project in projects:
+            assert configs[project.id].project == project
+            assert configs[project.id].to_dict()["slug"] == project.slug
+            assert "organization_id" not in configs[project.id].to_dict()
+
+        with self.assertNumQueries(0):
+            get_project_configs(projects, full_config=False)
@@ -9,11 +9,21 @@ import pytz
 import copy
 from django.core import mail
 from django.utils import timezone
+from freezegun import freeze_time
 
 from sentry.app import tsdb
-from sentry.models import Project, UserOption, GroupStatus
+from sentry.models import (
+    GroupStatus,
+    Organization,
+    OrganizationStatus,
+    Project,
+    UserOption,
+)
 from sentry.tasks.reports import (
     DISABLED_ORGANIZATIONS_USER_OPTION_KEY,
+    DailyStatistics,
+    DummyReportBackend,
+    RedisReportBackend,
     Report,
     Skipped,
     change,
@@ -22,13 +32,17 @@ from sentry.tasks.reports import (
     deliver_organization_user_report,
     get_calendar_range,
     get_percentile,
+    get_statistics_range,
     has_valid_aggregates,
     index_to_month,
     merge_mappings,
     merge_sequences,
     merge_series,
     month_to_index,
+    prepare_project_report,
     prepare_reports,
+    prepare_statistics,
+    query_daily_statistics,
     safe_add,
     user_subscribed_to_organization_reports,
     prepare_project_issue_summaries,
@@ -36,6 +50,8 @@ from sentry.tasks.reports import (
 )
 from sentry.testutils.cases import TestCase, SnubaTestCase
 from sentry.testutils.factories import DEFAULT_EVENT_DATA
+from sentry.testutils.helpers import override_options
+from sentry.utils import json, redis
 from sentry.utils.dates import to_datetime, to_timestamp, floor_to_utc_day
 from sentry.testutils.helpers.datetime import iso_format
 
@@ -345,3 +361,141 @@ class ReportTestCase(TestCase, SnubaTestCase):
         assert any(
             map(lambda x: x[1] == (2, 0), response)
         ), "must show two issues resolved in one rollup window"
+
+
+class DailyStatisticsTestCase(TestCase):
+    def record(self, project, now, days):
+        for i in days:
+            timestamp = now - timedelta(days=i, hours=1)
+            tsdb.incr(tsdb.models.project, project.id, timestamp, count=i + 1)
+            tsdb.incr(tsdb.models.project_total_blacklisted, project.id, timestamp, count=i % 3)
+            tsdb.incr(tsdb.models.project_total_rejected, project.id, timestamp, count=i % 2)
+
+    def test_query_daily_statistics(self):
+        now = floor_to_utc_day(timezone.now())
+        self.record(self.project, now, [1, 3])
+        # Events of the current day are not part of the statistics.
+        tsdb.incr(tsdb.models.project, self.project.id, now + timedelta(hours=1))
+
+        start = now - timedelta(days=4)
+        assert query_daily_statistics(start, now, [self.project.id]) == {
+            self.project.id: {
+                to_timestamp(start): DailyStatistics(4, 0, 1),
+                to_timestamp(start + timedelta(days=1)): DailyStatistics(0, 0, 0),
+                to_timestamp(start + timedelta(days=2)): DailyStatistics(2, 1, 1),
+                to_timestamp(start + timedelta(days=3)): DailyStatistics(0, 0, 0),
+            }
+        }
+
+    def test_prepare_project_report_with_statistics(self):
+        now = datetime(2016, 9, 12, tzinfo=pytz.utc)
+        project = self.create_project(date_added=now - timedelta(days=120))
+        self.record(project, now, range(1, 100, 4))
+        interval = (now - timedelta(days=7), now)
+
+        with mock.patch.object(tsdb, "get_earliest_timestamp") as get_earliest_timestamp:
+            get_earliest_timestamp.return_value = to_timestamp(now - timedelta(days=60))
+
+            start, stop = get_statistics_range(interval)
+            statistics = query_daily_statistics(start, stop, [project.id])[project.id]
+            report = prepare_project_report(interval, project, statistics=statistics)
+            assert report == prepare_project_report(interval, project)
+
+        assert any(report.aggregates)
+        assert report.usage_summary != (0, 0)
+
+    @freeze_time("2016-09-12 12:00:00")
+    def test_fetch_statistics(self):
+        backend = RedisReportBackend(redis.clusters.get("default"), 60)
+        now = floor_to_utc_day(timezone.now())
+        projects = [self.project, self.create_project()]
+        self.record(self.project, now, [0, 1, 2])
+        start = now - timedelta(days=3)
+
+        expected = [
+            query_daily_statistics(start, now + timedelta(days=1), [project.id])[project.id]
+            for project in projects
+        ]
+        assert (
+            backend.fetch_statistics(start, now + timedelta(days=1), self.organization, projects)
+            == expected
+        )
+
+        # Complete days are only queried once, the current day every time.
+        with mock.patch(
+            "sentry.tasks.reports.query_daily_statistics", side_effect=query_daily_statistics
+        ) as query:
+            assert backend.fetch_statistics(start, now, self.organization, projects) == [
+                {
+                    timestamp: value
+                    for timestamp, value in statistics.items()
+                    if timestamp < to_timestamp(now)
+                }
+                for statistics in expected
+            ]
+            assert not query.called
+
+            assert (
+                backend.fetch_statistics(
+                    start, now + timedelta(days=1), self.organization, projects
+                )
+                == expected
+            )
+            query.assert_called_once_with(now, now + timedelta(days=1), mock.ANY)
+
+    def test_fetch_statistics_delay(self):
+        backend = RedisReportBackend(redis.clusters.get("default"), 60)
+        now = datetime(2016, 9, 12, tzinfo=pytz.utc)
+        start = now - timedelta(days=1)
+        self.record(self.project, now, [1])
+
+        # The day before is only stored once it has been over for a while.
+        with mock.patch(
+            "sentry.tasks.reports.query_daily_statistics", side_effect=query_daily_statistics
+        ) as query:
+            for hours in (1, 1, 4, 4):
+                with freeze_time(now + timedelta(hours=hours)):
+                    assert backend.fetch_statistics(start, now, self.organization, [self.project])
+            assert query.call_count == 3
+
+    def test_prepare_with_statistics(self):
+        now = datetime(2016, 9, 12, tzinfo=pytz.utc)
+        timestamp, duration = to_timestamp(now), 60 * 60 * 24 * 7
+        projects = [
+            self.create_project(organization=self.organization, date_added=now - timedelta(days=90))
+            for _ in range(2)
+        ]
+        self.record(projects[0], now, range(1, 30, 2))
+
+        with mock.patch.object(tsdb, "get_earliest_timestamp") as get_earliest_timestamp:
+            get_earliest_timestamp.return_value = to_timestamp(now - timedelta(days=60))
+
+            backend = RedisReportBackend(redis.clusters.get("default"), 60)
+            backend.prepare(timestamp, duration, self.organization)
+            expected = DummyReportBackend().fetch(timestamp, duration, self.organization, projects)
+            # Stored reports are serialized as JSON, which turns tuples into lists.
+            assert backend.fetch(timestamp, duration, self.organization, projects) == [
+                Report(*json.loads(json.dumps(list(report)))) for report in expected
+            ]
+            assert any(expected[0].aggregates)
+
+    @mock.patch("sentry.tasks.reports.prepare_organization_statistics.apply_async")
+    def test_prepare_statistics_batches(self, apply_async):
+        self.create_organization()
+        organization_ids = Organization.objects.filter(
+            status=OrganizationStatus.VISIBLE
+        ).values_list("id", flat=True)
+        now = to_timestamp(floor_to_utc_day(timezone.now()))
+
+        with override_options(
+            {"reports.prepare-batch-size": 1, "reports.prepare-batch-interval": 30}
+        ):
+            prepare_statistics(timestamp=now)
+
+        calls = [call[1] for call in apply_async.call_args_list]
+        assert sorted(call["args"] for call in calls) == sorted(
+            (now, organization_id) for organization_id in organization_ids
+        )
+        assert [call["countdown"] for call in calls] == [
+            i * 30 for i in range(len(organization_ids))
+        ]
@@ -0,0 +1,193 @@
+from __future__ import absolute_import
+
+from datetime import timedelta
+
+import mock
+import pytest
+from django.utils import timezone
+
+from sentry.app import tsdb
+from sentry.models import Environment, GroupHash, GroupRelease, Release
+from sentry.tasks.unmerge import (
+    UnmergeCheckpoint,
+    get_caches,
+    repair_group_release_data,
+    repair_tsdb_data,
+    resume_unmerge,
+    unmerge,
+)
+from sentry.testutils import TestCase
+
+
+class UnmergeCheckpointTestCase(TestCase):
+    def test_checkpoint(self):
+        checkpoint = UnmergeCheckpoint(self.project.id, self.group.id, ["b", "a"])
+        assert checkpoint.get() is None
+
+        state = {"page": {"timestamp": "2019-01-01T00:00:00", "event_id": "a" * 32}}
+        checkpoint.set(state)
+        assert UnmergeCheckpoint(self.project.id, self.group.id, ["a", "b"]).get() == state
+        assert UnmergeCheckpoint(self.project.id, self.group.id, ["a"]).get() is None
+
+        checkpoint.delete()
+        assert checkpoint.get() is None
+
+
+class UnmergeTaskTestCase(TestCase):
+    def get_state(self, **kwargs):
+        state = {
+            "destination_id": None,
+            "fingerprints": ["a" * 32],
+            "actor_id": None,
+            "batch_size": 500,
+            "page": None,
+            "cursor": None,
+            "source_fields_reset": False,
+            "eventstream_state": None,
+        }
+        state.update(kwargs)
+        return state
+
+    @mock.patch("sentry.tasks.unmerge.eventstore.get_events")
+    def test_skips_processed_page(self, get_events):
+        page = {"timestamp": "2019-01-01T00:00:00", "event_id": "b" * 32}
+        checkpoint = UnmergeCheckpoint(self.project.id, self.group.id, ["a" * 32])
+        checkpoint.set(self.get_state(destination_id=1, page=page, cursor=page))
+
+        # A duplicate of the task that processed the previous page.
+        last_event = {"timestamp": "2019-01-02T00:00:00", "event_id": "c" * 32}
+        result = unmerge(self.project.id, self.group.id, None, ["a" * 32], None, last_event)
+        assert result == 1
+        assert not get_events.called
+
+    @mock.patch("sentry.tasks.unmerge.truncate_denormalizations")
+    @mock.patch("sentry.tasks.unmerge.eventstore.get_events", return_value=[])
+    def test_restarts_stopped_unmerge(self, get_events, truncate_denormalizations):
+        GroupHash.objects.create(
+            project=self.project,
+            group=self.group,
+            hash="a" * 32,
+            state=GroupHash.State.LOCKED_IN_MIGRATION,
+        )
+        page = {"timestamp": "2019-01-01T00:00:00", "event_id": "b" * 32}
+        checkpoint = UnmergeCheckpoint(self.project.id, self.group.id, ["a" * 32])
+        checkpoint.set(self.get_state(destination_id=1, page=page, cursor=page))
+
+        # A new unmerge request starts over instead of being ignored.
+        assert unmerge(self.project.id, self.group.id, None, ["a" * 32], None) is None
+
+        assert truncate_denormalizations.called
+        assert get_events.call_args[1]["filter"].conditions == []
+        assert checkpoint.get() is None
+        assert GroupHash.objects.get(hash="a" * 32).state == GroupHash.State.UNLOCKED
+
+    @mock.patch("sentry.tasks.unmerge.repair_denormalizations", side_effect=Exception("failed"))
+    @mock.patch("sentry.tasks.unmerge.migrate_events", return_value=(2, None))
+    @mock.patch("sentry.tasks.unmerge.truncate_denormalizations")
+    def test_checkpoints_destination(self, truncate_denormalizations, migrate_events, repair):
+        event = self.create_event(group=self.group)
+        checkpoint = UnmergeCheckpoint(self.project.id, self.group.id, ["a" * 32])
+
+        with mock.patch("sentry.tasks.unmerge.eventstore.get_events", return_value=[event]):
+            with pytest.raises(Exception):
+                unmerge(self.project.id, self.group.id, None, ["a" * 32], None)
+
+        # The batch is processed again when the unmerge is resumed, but into
+        # the destination that was already created.
+        state = checkpoint.get()
+        assert state["destination_id"] == 2
+        assert state["cursor"] is None
+
+    @mock.patch("sentry.tasks.unmerge.truncate_denormalizations")
+    @mock.patch("sentry.tasks.unmerge.eventstore.get_events", return_value=[])
+    def test_resumes_from_cursor(self, get_events, truncate_denormalizations):
+        GroupHash.objects.create(
+            project=self.project,
+            group=self.group,
+            hash="a" * 32,
+            state=GroupHash.State.LOCKED_IN_MIGRATION,
+        )
+        page = {"timestamp": "2019-01-02T00:00:00", "event_id": "c" * 32}
+        cursor = {"timestamp": "2019-01-01T00:00:00", "event_id": "b" * 32}
+        checkpoint = UnmergeCheckpoint(self.project.id, self.group.id, ["a" * 32])
+        checkpoint.set(self.get_state(page=page, cursor=cursor))
+
+        # A retried task continues after the last completed batch.
+        unmerge(self.project.id, self.group.id, None, ["a" * 32], None, last_event=page)
+
+        assert not truncate_denormalizations.called
+        conditions = get_events.call_args[1]["filter"].conditions
+        assert conditions[0] == ["timestamp", "<=", cursor["timestamp"]]
+
+        # There are no events left, so the unmerge is complete.
+        assert checkpoint.get() is None
+        assert GroupHash.objects.get(hash="a" * 32).state == GroupHash.State.UNLOCKED
+
+    @mock.patch("sentry.tasks.unmerge.unmerge.delay")
+    def test_resume_unmerge(self, delay):
+        assert resume_unmerge(self.project.id, self.group.id, ["a" * 32]) is False
+
+        page = {"timestamp": "2019-01-01T00:00:00", "event_id": "b" * 32}
+        UnmergeCheckpoint(self.project.id, self.group.id, ["a" * 32]).set(
+            self.get_state(destination_id=2, page=page, cursor=page)
+        )
+        assert resume_unmerge(self.project.id, self.group.id, ["a" * 32]) is True
+        delay.assert_called_once_with(
+            self.project.id, self.group.id, 2, ["a" * 32], None, last_event=page, batch_size=500,
+        )
+
+
+class RepairDenormalizationsTestCase(TestCase):
+    def test_repair_tsdb_data_aggregates_writes(self):
+        Environment.get_or_create(self.project, "")
+        now = timezone.now().replace(second=0, microsecond=0)
+        events = [
+            self.create_event(
+                group=self.group, datetime=now + timedelta(seconds=i), user={"id": "%s" % (i % 2)},
+            )
+            for i in range(5)
+        ]
+
+        with mock.patch.object(tsdb, "incr_multi") as incr_multi, mock.patch.object(
+            tsdb, "record_multi"
+        ) as record_multi:
+            repair_tsdb_data(get_caches(), self.project, events)
+
+        # All events fall into the same interval of the smallest rollup.
+        assert incr_multi.call_count == 1
+        items, timestamp, count = incr_multi.call_args[0]
+        assert items == [(tsdb.models.group, self.group.id)]
+        assert count == 5
+
+        assert record_multi.call_count == 1
+        ((model, key, values),) = record_multi.call_args[0][0]
+        assert (model, key) == (tsdb.models.users_affected_by_group, self.group.id)
+        assert values == set(["id:0", "id:1"])
+
+    def test_repair_group_release_data(self):
+        now = timezone.now().replace(microsecond=0)
+        release = Release.objects.create(organization_id=self.organization.id, version="1.0")
+        release.add_project(self.project)
+        existing = GroupRelease.objects.create(
+            project_id=self.project.id,
+            group_id=self.group.id,
+            environment="",
+            release_id=release.id,
+            first_seen=now,
+            last_seen=now,
+        )
+        other_group = self.create_group(project=self.project)
+
+        # Events are processed in reverse chronological order.
+        events = [
+            self.create_event(
+                group=group, datetime=now - timedelta(minutes=i), tags={"sentry:release": "1.0"}
+            )
+            for i, group in enumerate([self.group, other_group, self.group])
+        ]
+
+        repair_group_release_data(get_caches(), self.project, events)
+
+        assert GroupRelease.objects.get(id=existing.id).first_seen == now - timedelta(minutes=2)
+        created = GroupRelease.objects.get(group_id=other_group.id, release_id=release.id)
+        assert created.first_seen == created.last_seen == now - timedelta(minutes=1)
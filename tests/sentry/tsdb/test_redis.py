@@ -585,6 +585,59 @@ class RedisTSDBTest(TestCase):
             model, ("organization:1", "organization:2"), now, environment_id=1
         ) == {"organization:1": [], "organization:2": []}
 
+    def test_frequency_table_batches(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        model = TSDBModel.frequent_projects_by_organization
+        self.db.models_with_environment_support = self.db.models_with_environment_support | set(
+            [model]
+        )
+
+        # Force the requests to be split into several batches for each host.
+        self.db.frequency_batch_size = 50
+
+        keys = ["organization:{}".format(i) for i in range(20)]
+        self.db.record_frequency_multi(
+            ((model, {key: {"project:1": i + 2, "project:2": 1} for i, key in enumerate(keys)}),),
+            now,
+            environment_id=1,
+        )
+
+        expected = {
+            key: [("project:1", float(i + 2)), ("project:2", 1.0)] for i, key in enumerate(keys)
+        }
+        for environment_id in (None, 1):
+            assert (
+                self.db.get_most_frequent(
+                    model, keys, now, rollup=ONE_HOUR, environment_id=environment_id
+                )
+                == expected
+            )
+
+        assert self.db.get_most_frequent(model, keys, now, rollup=ONE_HOUR, limit=1) == {
+            key: [("project:1", float(i + 2))] for i, key in enumerate(keys)
+        }
+
+        results = self.db.get_most_frequent_series(
+            model, keys, now - timedelta(hours=1), now, rollup=ONE_HOUR
+        )
+        assert sorted(results) == sorted(keys)
+        for i, key in enumerate(keys):
+            (_, previous), (_, current) = results[key]
+            assert previous == {}
+            assert current == {"project:1": float(i + 2), "project:2": 1.0}
+
+        # Every sketch (for every environment) should have an expiration set.
+        # (The estimation matrix is not populated until the index is full.)
+        ts = int(to_timestamp(now))
+        for key in keys:
+            client = self.db.cluster.get_local_client_for_key(key)
+            for rollup in self.db.rollups:
+                for environment_id in (None, 1):
+                    index, _ = self.db.make_frequency_table_keys(
+                        model, rollup, ts, key, environment_id
+                    )
+                    assert client.ttl(index) > 0
+
     def test_frequency_table_import_export_no_estimators(self):
         client = self.db.cluster.get_local_client_for_key("key")
 
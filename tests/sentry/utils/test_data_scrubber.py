@@ -4,7 +4,7 @@ from __future__ import absolute_import
 
 from sentry.constants import FILTER_MASK
 from unittest import TestCase
-from sentry.utils.data_scrubber import SensitiveDataFilter
+from sentry.utils.data_scrubber import SensitiveDataFilter, compile_fields_re
 
 VARS = {
     "foo": "bar",
@@ -441,3 +441,21 @@ class SensitiveDataFilterTest(TestCase):
         proc.apply(data)
 
         assert data["breadcrumbs"]["values"][0]["message"] == FILTER_MASK
+
+    def test_fields_re_is_cached(self):
+        assert compile_fields_re(frozenset(["foo", "bar"])) is compile_fields_re(
+            frozenset(["bar", "foo"])
+        )
+        assert SensitiveDataFilter().fields_re is SensitiveDataFilter().fields_re
+
+    def test_fields_with_special_characters(self):
+        data = {"extra": {"card[number]": "4242", "cardnumber": "4242", "card(cvv)": "123"}}
+
+        proc = SensitiveDataFilter(fields=["card[number]", "card(cvv)"])
+        proc.apply(data)
+
+        assert data["extra"] == {
+            "card[number]": FILTER_MASK,
+            "cardnumber": "4242",
+            "card(cvv)": FILTER_MASK,
+        }
@@ -8,7 +8,15 @@ import unittest
 from mock import patch, Mock
 from sentry.testutils import TestCase
 from sentry.utils.canonical import CanonicalKeyDict
-from sentry.utils.safe import safe_execute, trim, trim_dict, get_path, set_path, setdefault_path
+from sentry.utils.safe import (
+    safe_execute,
+    trim,
+    trim_dict,
+    get_path,
+    set_path,
+    setdefault_path,
+    _trim,
+)
 
 a_very_long_string = "a" * 1024
 
@@ -55,6 +63,23 @@ class TrimTest(unittest.TestCase):
         a = {"a": {"b": {"c": []}}}
         assert trm(a) == {"a": {"b": {"c": "[]"}}}
 
+    def test_nested_size(self):
+        a = {
+            u"a": [1, 2.5, None, (u"b",), (), {"c": u"\xfc" * 10}],
+            "d": ({}, [True, 10 ** 20], u"e'f"),
+        }
+        result, size = _trim(a, 4096, 6, None, 0, 0)
+        assert result == a
+        assert size == len(repr(result))
+
+    def test_nested_size_limit(self):
+        a = {"a": [{"b": ["x" * 100] * 2}] * 2, "c": [[[a_very_long_string]]]}
+        # The sizes of nested containers are those of their text.
+        assert trim(a) == {
+            "a": a["a"],
+            "c": [[[a_very_long_string[: 512 - 3 - len(repr(a["a"])) - 6 - 3] + "..."]]],
+        }
+
 
 class TrimDictTest(unittest.TestCase):
     def test_large_dict(self):
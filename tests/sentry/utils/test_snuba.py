@@ -1,15 +1,22 @@
 from __future__ import absolute_import
 
+from concurrent.futures import Future
 from datetime import datetime
-from mock import patch
+from django.core.cache import cache
+from mock import Mock, patch
 import pytest
 import pytz
+import threading
+import time
 
 from sentry.models import GroupRelease, Release
 from sentry.testutils import TestCase, SnubaTestCase
 from sentry.testutils.helpers.datetime import iso_format, before_now
+from sentry.utils import json
 from sentry.utils.snuba import (
+    _coalesce_query,
     _prepare_query_params,
+    bulk_raw_query,
     get_snuba_translators,
     zerofill,
     get_json_type,
@@ -18,6 +25,7 @@ from sentry.utils.snuba import (
     transform_aliases_and_query,
     Dataset,
     SnubaQueryParams,
+    SnubaError,
     UnqualifiedQueryError,
 )
 
@@ -679,3 +687,76 @@ class PrepareQueryParamsTest(TestCase):
 
         with pytest.raises(UnqualifiedQueryError):
             _prepare_query_params(query_params)
+
+
+class BulkRawQueryCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.start = before_now(hours=1)
+        self.end = before_now(minutes=1)
+
+    def get_params(self, **kwargs):
+        return SnubaQueryParams(
+            start=self.start,
+            end=self.end,
+            filter_keys={"project_id": [self.project.id]},
+            aggregations=[["count()", "", "count"]],
+            **kwargs
+        )
+
+    @patch("sentry.utils.snuba._snuba_pool")
+    def test_cached_results(self, pool):
+        pool.urlopen.return_value = Mock(status=200, data=json.dumps({"data": [{"count": 1}]}))
+
+        with self.settings(SENTRY_SNUBA_CACHE_ENABLED=True):
+            first = bulk_raw_query([self.get_params()], referrer="test")
+            second = bulk_raw_query([self.get_params()], referrer="test")
+            assert first == second == [{"data": [{"count": 1}]}]
+            assert pool.urlopen.call_count == 1
+
+            bulk_raw_query([self.get_params(), self.get_params(groupby=["time"])])
+            assert pool.urlopen.call_count == 2
+
+        bulk_raw_query([self.get_params()])
+        assert pool.urlopen.call_count == 3
+
+    @patch("sentry.utils.snuba._snuba_pool")
+    def test_errors_are_not_cached(self, pool):
+        pool.urlopen.return_value = Mock(
+            status=500, data=json.dumps({"error": {"type": "x", "message": "oops"}})
+        )
+
+        with self.settings(SENTRY_SNUBA_CACHE_ENABLED=True):
+            for _ in range(2):
+                with pytest.raises(SnubaError):
+                    bulk_raw_query([self.get_params()])
+            assert pool.urlopen.call_count == 2
+
+    def test_coalesce_query(self):
+        finish = threading.Event()
+        calls = []
+
+        def query():
+            calls.append(1)
+            finish.wait()
+            return "result"
+
+        class WaitingFuture(Future):
+            def result(self, timeout=None):
+                # Only let the first query finish once the second one is
+                # waiting for its result.
+                finish.set()
+                return super(WaitingFuture, self).result(timeout)
+
+        results = []
+        with patch("sentry.utils.snuba.Future", WaitingFuture):
+            thread = threading.Thread(target=lambda: results.append(_coalesce_query("key", query)))
+            thread.start()
+            while not calls:
+                time.sleep(0.01)
+
+            results.append(_coalesce_query("key", query))
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(results) == [("result", False), ("result", True)]